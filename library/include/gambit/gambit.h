@@ -28,6 +28,7 @@
 #include <sstream>
 #include <iomanip>
 #include <cmath>
+#include <cstdlib>
 #include <config.h>
 
 namespace Gambit {
@@ -241,6 +241,12 @@ public:
     m_payoffs[pl] = p_value;
     //m_game->ClearComputedValues();
   }
+  /// Sets the payoff to player 'pl' from an exact rational value
+  void SetPayoff(int pl, const Rational &p_value)
+  { m_payoffs[pl] = p_value; }
+  /// Sets the payoff to player 'pl' from a floating-point value
+  void SetPayoff(int pl, double p_value)
+  { m_payoffs[pl] = p_value; }
 
   /// Map the outcome to the corresponding outcome in the unrestricted game
   GameOutcome Unrestrict(void) const 
@@ -839,6 +845,9 @@ template<> inline std::string PureBehaviorProfile::GetPayoff(int pl) const
 
 /// Reads a game in .efg or .nfg format from the input stream
 Game ReadGame(std::istream &) throw (InvalidFileException);
+/// Writes a game to the output stream in the compact binary format,
+/// which ReadGame() also reads
+void WriteBinaryGame(std::ostream &, const Game &);
 
 } // end namespace gambit
 
@@ -26,33 +26,105 @@
 namespace Gambit {
 
 /// This simple class stores a numerical datum.
+/// Values may be assigned either as text, which is parsed, or directly
+/// as a Rational or double; in the latter cases the text representation
+/// is only generated when it is first requested.  A double is taken to
+/// stand for the shortest decimal text which recovers it, and its
+/// rational value is that of the text, so that writing and reading
+/// back a game does not change it.
 class Number {
 private:
-  std::string m_text;
-  Rational m_rational;
+  mutable std::string m_text;
+  mutable bool m_textValid;
+  bool m_isDouble;
+  mutable Rational m_rational;
+  mutable bool m_rationalValid;
   double m_double;
 
 public:
   Number(void)
-    : m_text("0"), m_rational(0), m_double(0.0) { }
+    : m_text("0"), m_textValid(true), m_isDouble(false),
+      m_rational(0), m_rationalValid(true), m_double(0.0) { }
   Number(const std::string &p_text)
-    : m_text(p_text), m_rational(lexical_cast<Rational>(p_text)), 
+    : m_text(p_text), m_textValid(true), m_isDouble(false),
+      m_rational(lexical_cast<Rational>(p_text)), m_rationalValid(true),
       m_double((double) m_rational)
   { }
+  Number(const Rational &p_value)
+    : m_textValid(false), m_isDouble(false),
+      m_rational(p_value), m_rationalValid(true), m_double((double) p_value)
+  { }
   
   Number &operator=(const std::string &p_text)
   {
     // We call lexical_cast<Rational>() first because it throws a ValueException
     // if the conversion of the text fails
     m_rational = lexical_cast<Rational>(p_text);
+    m_rationalValid = true;
     m_text = p_text;
+    m_textValid = true;
+    m_isDouble = false;
     m_double = (double) m_rational;
     return *this; 
   }
 
+  Number &operator=(const Rational &p_value)
+  {
+    m_rational = p_value;
+    m_rationalValid = true;
+    m_double = (double) m_rational;
+    m_textValid = false;
+    m_isDouble = false;
+    return *this;
+  }
+
+  Number &operator=(double p_value)
+  {
+    // The text and rational value are only generated when requested
+    m_double = p_value;
+    m_textValid = false;
+    m_rationalValid = false;
+    m_isDouble = true;
+    return *this;
+  }
+
   operator const double &(void) const { return m_double; }
-  operator const Rational &(void) const { return m_rational; }
-  operator const std::string &(void) const { return m_text; }
+  operator const Rational &(void) const
+  {
+    if (!m_rationalValid) {
+      m_rational = lexical_cast<Rational>((const std::string &) *this);
+      m_rationalValid = true;
+    }
+    return m_rational;
+  }
+  operator const std::string &(void) const 
+  {
+    if (!m_textValid) {
+      if (m_isDouble) {
+	// Values assigned as doubles are written in decimal notation,
+	// with the fewest digits which recover the double exactly.  The
+	// sign of any exponent is dropped when positive, as the parser
+	// for rationals does not accept it.
+	for (int digits = 1; digits <= 17; digits++) {
+	  std::ostringstream s;
+	  s << std::setprecision(digits) << m_double;
+	  m_text = s.str();
+	  if (strtod(m_text.c_str(), 0) == m_double) {
+	    break;
+	  }
+	}
+	std::string::size_type plus = m_text.find('+');
+	if (plus != std::string::npos) {
+	  m_text.erase(plus, 1);
+	}
+      }
+      else {
+	m_text = lexical_cast<std::string>(m_rational);
+      }
+      m_textValid = true;
+    }
+    return m_text; 
+  }
 };
 
 }
@@ -25,6 +25,9 @@
 #include <iostream>
 #include <sstream>
 #include <map>
+#include <set>
+#include <utility>
+#include <algorithm>
 
 #include "gambit/gambit.h"
 
@@ -991,6 +994,427 @@ void ParseEfg(GameParserState &p_state, Game p_game, TreeData &p_treeData)
   ParseNode(p_state, p_game, p_game->GetRoot(), p_treeData);
 }
 
+//=========================================================================
+//                    Compact binary game format
+//=========================================================================
+//
+// The binary format is an alternative to the text formats, for passing
+// games between programs without the cost of formatting and parsing
+// text.  Data start with the four bytes in BinaryMagic, followed by a
+// version number and a byte 'N' (table) or 'E' (tree).
+//
+// Integers are little-endian; counts and indices take 32 bits.  A
+// string is a count followed by that many bytes.  An array of payoffs
+// or probabilities is a count, a byte giving the encoding, and the
+// values.  The encoding 'i' is for integers, and 'r' for pairs of
+// numerator and denominator; both are followed by a byte giving the
+// number of bytes (1, 2, 4, or 8) in each integer.  Writers only use
+// these for values of at most 32 bits.  The encoding 't', used for
+// values too large for the others, is for strings in the text format.
+//
+// After the header come the title, the comment, and the labels of the
+// players.  For a table, the labels of each player's strategies follow.
+// Then come the outcomes, as their labels followed by an array of the
+// payoffs of each player.  A table ends with the outcome index (zero
+// for none) of each contingency, with the strategy of the first player
+// varying fastest.  A tree ends with its nodes, in preorder: a byte 't',
+// 'c', or 'p' giving the type of node, its label, and its outcome index.
+// Chance and personal nodes continue with the player (zero for chance)
+// and the number of the information set.  At the first node in each
+// information set, these are followed by the label of the information
+// set, the number of actions and their labels, and, for chance, an
+// array of the action probabilities.
+//
+
+const char BinaryMagic[4] = { '\0', 'G', 'B', 'T' };
+const unsigned long BinaryVersion = 1;
+
+class BinaryWriter {
+private:
+  std::ostream &m_file;
+
+public:
+  BinaryWriter(std::ostream &p_file) : m_file(p_file) { }
+
+  void WriteByte(char p_value) { m_file.put(p_value); }
+  void WriteCount(unsigned long p_value)
+  {
+    for (int i = 0; i < 4; i++) {
+      m_file.put((char) ((p_value >> (8*i)) & 0xff));
+    }
+  }
+  void WriteLong(long p_value, int p_width)
+  {
+    unsigned long value = (unsigned long) p_value;
+    for (int i = 0; i < p_width; i++) {
+      if (i < (int) sizeof(long)) {
+	m_file.put((char) ((value >> (8*i)) & 0xff));
+      }
+      else {
+	// Sign-extend when long is narrower than the field
+	m_file.put((char) ((p_value < 0) ? 0xff : 0x00));
+      }
+    }
+  }
+  void WriteString(const std::string &p_value)
+  {
+    WriteCount(p_value.length());
+    m_file.write(p_value.data(), p_value.length());
+  }
+  void WriteNumbers(const Array<Rational> &p_values);
+};
+
+// Returns the number of bytes (1, 2, 4, or 8) needed to hold p_value
+// as a two's complement integer
+int IntegerWidth(long p_value)
+{
+  int width = 1;
+  while (width < (int) sizeof(long) &&
+	 (p_value >= (1L << (8*width-1)) ||
+	  p_value < -(1L << (8*width-1)))) {
+    width *= 2;
+  }
+  return width;
+}
+
+// Returns true if p_value fits in 32 bits.  Conversions between
+// Integer and long are not reliable for wider values, so only these
+// are written in the 'i' and 'r' encodings.
+bool FitsInt32(const Integer &p_value)
+{
+  static const Integer maxValue(2147483647L), minValue(-2147483647L - 1L);
+  return (p_value >= minValue && p_value <= maxValue);
+}
+
+void BinaryWriter::WriteNumbers(const Array<Rational> &p_values)
+{
+  char encoding = 'i';
+  int width = 1;
+  for (int i = 1; i <= p_values.Length(); i++) {
+    const Rational &value = p_values[i];
+    if (!FitsInt32(value.numerator()) || !FitsInt32(value.denominator())) {
+      encoding = 't';
+      break;
+    }
+    width = std::max(width, IntegerWidth(value.numerator().as_long()));
+    if (value.denominator().as_long() != 1) {
+      encoding = 'r';
+      width = std::max(width, IntegerWidth(value.denominator().as_long()));
+    }
+  }
+
+  WriteCount(p_values.Length());
+  WriteByte(encoding);
+  if (encoding != 't') {
+    WriteByte((char) width);
+  }
+  for (int i = 1; i <= p_values.Length(); i++) {
+    if (encoding == 't') {
+      WriteString(lexical_cast<std::string>(p_values[i]));
+    }
+    else {
+      WriteLong(p_values[i].numerator().as_long(), width);
+      if (encoding == 'r') {
+	WriteLong(p_values[i].denominator().as_long(), width);
+      }
+    }
+  }
+}
+
+class BinaryReader {
+private:
+  std::istream &m_file;
+
+public:
+  BinaryReader(std::istream &p_file) : m_file(p_file) { }
+
+  char ReadByte(void)
+  {
+    char c;
+    if (!m_file.get(c)) {
+      throw InvalidFileException("Unexpected end of binary game data");
+    }
+    return c;
+  }
+  unsigned long ReadCount(void)
+  {
+    unsigned long value = 0;
+    for (int i = 0; i < 4; i++) {
+      value |= ((unsigned long) (unsigned char) ReadByte()) << (8*i);
+    }
+    return value;
+  }
+  long ReadLong(int p_width);
+  std::string ReadString(void);
+  Array<Rational> ReadNumbers(unsigned long p_count);
+};
+
+long BinaryReader::ReadLong(int p_width)
+{
+  unsigned char bytes[8];
+  for (int i = 0; i < p_width; i++) {
+    bytes[i] = (unsigned char) ReadByte();
+  }
+  int width = std::min(p_width, (int) sizeof(long));
+  unsigned long value = 0;
+  for (int i = width - 1; i >= 0; i--) {
+    value = (value << 8) | bytes[i];
+  }
+  bool negative = (bytes[width-1] & 0x80) != 0;
+  for (int i = width; i < p_width; i++) {
+    if (bytes[i] != (negative ? 0xff : 0x00)) {
+      throw InvalidFileException("Integer too large in binary game data");
+    }
+  }
+  if (width < (int) sizeof(long) && negative) {
+    // Sign-extend to the width of long
+    value |= ~0UL << (8*width);
+  }
+  return (negative) ? -(long) (~value) - 1 : (long) value;
+}
+
+std::string BinaryReader::ReadString(void)
+{
+  unsigned long length = ReadCount();
+  std::string value(length, '\0');
+  if (length > 0 && !m_file.read(&value[0], length)) {
+    throw InvalidFileException("Unexpected end of binary game data");
+  }
+  return value;
+}
+
+// Returns the Integer with value p_value, going through its text for
+// values wider than 32 bits, as for FitsInt32()
+Integer ToInteger(long p_value)
+{
+  if (p_value > 2147483647L || p_value < -2147483647L - 1L) {
+    return lexical_cast<Rational>(lexical_cast<std::string>(p_value)).numerator();
+  }
+  return Integer(p_value);
+}
+
+Array<Rational> BinaryReader::ReadNumbers(unsigned long p_count)
+{
+  if (ReadCount() != p_count) {
+    throw InvalidFileException("Wrong number of values in binary game data");
+  }
+  char encoding = ReadByte();
+  int width = 0;
+  if (encoding == 'i' || encoding == 'r') {
+    width = ReadByte();
+    if (width != 1 && width != 2 && width != 4 && width != 8) {
+      throw InvalidFileException("Invalid width of values in binary game data");
+    }
+  }
+  else if (encoding != 't') {
+    throw InvalidFileException("Unknown encoding of values in binary game data");
+  }
+  Array<Rational> values(p_count);
+  for (int i = 1; i <= values.Length(); i++) {
+    if (encoding == 'i') {
+      values[i] = Rational(ToInteger(ReadLong(width)));
+    }
+    else if (encoding == 'r') {
+      long num = ReadLong(width);
+      long den = ReadLong(width);
+      if (den == 0) {
+	throw InvalidFileException("Zero denominator in binary game data");
+      }
+      values[i] = Rational(ToInteger(num), ToInteger(den));
+    }
+    else {
+      values[i] = lexical_cast<Rational>(ReadString());
+    }
+  }
+  return values;
+}
+
+void WriteBinaryNode(BinaryWriter &p_writer, const GameNode &p_node,
+		     std::set<GameInfosetRep *> &p_written)
+{
+  GameInfoset infoset = p_node->GetInfoset();
+  if (p_node->NumChildren() == 0) {
+    p_writer.WriteByte('t');
+  }
+  else {
+    p_writer.WriteByte((infoset->IsChanceInfoset()) ? 'c' : 'p');
+  }
+  p_writer.WriteString(p_node->GetLabel());
+  p_writer.WriteCount((p_node->GetOutcome()) ?
+		      p_node->GetOutcome()->GetNumber() : 0);
+  if (p_node->NumChildren() == 0) {
+    return;
+  }
+
+  p_writer.WriteCount((infoset->IsChanceInfoset()) ?
+		      0 : infoset->GetPlayer()->GetNumber());
+  p_writer.WriteCount(infoset->GetNumber());
+  if (p_written.insert(infoset.operator->()).second) {
+    p_writer.WriteString(infoset->GetLabel());
+    p_writer.WriteCount(infoset->NumActions());
+    for (int act = 1; act <= infoset->NumActions(); act++) {
+      p_writer.WriteString(infoset->GetAction(act)->GetLabel());
+    }
+    if (infoset->IsChanceInfoset()) {
+      Array<Rational> probs(infoset->NumActions());
+      for (int act = 1; act <= infoset->NumActions(); act++) {
+	probs[act] = infoset->GetActionProb(act, Rational(0));
+      }
+      p_writer.WriteNumbers(probs);
+    }
+  }
+
+  for (int i = 1; i <= p_node->NumChildren(); i++) {
+    WriteBinaryNode(p_writer, p_node->GetChild(i), p_written);
+  }
+}
+
+void ReadBinaryOutcomes(BinaryReader &p_reader, Game p_game)
+{
+  int numOutcomes = p_reader.ReadCount();
+  for (int outc = 1; outc <= numOutcomes; outc++) {
+    // A new table already has one outcome for each contingency;
+    // reuse these, and create any further outcomes needed.
+    GameOutcome outcome = (outc <= p_game->NumOutcomes()) ?
+      p_game->GetOutcome(outc) : p_game->NewOutcome();
+    outcome->SetLabel(p_reader.ReadString());
+  }
+  for (int pl = 1; pl <= p_game->NumPlayers(); pl++) {
+    Array<Rational> payoffs = p_reader.ReadNumbers(numOutcomes);
+    for (int outc = 1; outc <= numOutcomes; outc++) {
+      p_game->GetOutcome(outc)->SetPayoff(pl, payoffs[outc]);
+    }
+  }
+}
+
+GameOutcome ReadBinaryOutcomeIndex(BinaryReader &p_reader, Game p_game)
+{
+  unsigned long outcomeId = p_reader.ReadCount();
+  if (outcomeId == 0) {
+    return 0;
+  }
+  if (outcomeId > (unsigned long) p_game->NumOutcomes()) {
+    throw InvalidFileException("Outcome not defined in binary game data");
+  }
+  return p_game->GetOutcome(outcomeId);
+}
+
+void ReadBinaryNode(BinaryReader &p_reader, Game p_game, GameNode p_node,
+		    std::map<std::pair<int, int>, GameInfoset> &p_infosets)
+{
+  char type = p_reader.ReadByte();
+  if (type != 't' && type != 'c' && type != 'p') {
+    throw InvalidFileException("Invalid type of node in binary game data");
+  }
+  p_node->SetLabel(p_reader.ReadString());
+  GameOutcome outcome = ReadBinaryOutcomeIndex(p_reader, p_game);
+  if (outcome) {
+    p_node->SetOutcome(outcome);
+  }
+  if (type == 't') {
+    return;
+  }
+
+  int playerId = p_reader.ReadCount();
+  int infosetId = p_reader.ReadCount();
+  if ((type == 'c') != (playerId == 0)) {
+    throw InvalidFileException("Invalid player in binary game data");
+  }
+  // This will throw an exception if the player ID is not valid
+  GamePlayer player = (playerId == 0) ?
+    p_game->GetChance() : p_game->GetPlayer(playerId);
+
+  std::pair<int, int> key(playerId, infosetId);
+  if (p_infosets.count(key)) {
+    p_node->AppendMove(p_infosets[key]);
+  }
+  else {
+    std::string label = p_reader.ReadString();
+    int numActions = p_reader.ReadCount();
+    if (numActions == 0) {
+      throw InvalidFileException("Information set without actions in binary game data");
+    }
+    GameInfoset infoset = p_node->AppendMove(player, numActions);
+    p_infosets[key] = infoset;
+    infoset->SetLabel(label);
+    for (int act = 1; act <= numActions; act++) {
+      infoset->GetAction(act)->SetLabel(p_reader.ReadString());
+    }
+    if (type == 'c') {
+      Array<Rational> probs = p_reader.ReadNumbers(numActions);
+      for (int act = 1; act <= numActions; act++) {
+	infoset->SetActionProb(act, lexical_cast<std::string>(probs[act]));
+      }
+    }
+  }
+
+  for (int i = 1; i <= p_node->NumChildren(); i++) {
+    ReadBinaryNode(p_reader, p_game, p_node->GetChild(i), p_infosets);
+  }
+}
+
+//
+// Precondition: the stream is positioned just after the magic bytes
+//
+Game ReadBinaryGame(std::istream &p_file)
+{
+  BinaryReader reader(p_file);
+  if (reader.ReadCount() != BinaryVersion) {
+    throw InvalidFileException("Unsupported version of binary game data");
+  }
+  char type = reader.ReadByte();
+  if (type != 'N' && type != 'E') {
+    throw InvalidFileException("Unknown type of game in binary game data");
+  }
+  std::string title = reader.ReadString();
+  std::string comment = reader.ReadString();
+  Array<std::string> players(reader.ReadCount());
+  for (int pl = 1; pl <= players.Length(); pl++) {
+    players[pl] = reader.ReadString();
+  }
+
+  Game game;
+  if (type == 'N') {
+    Array<int> dim(players.Length());
+    List<std::string> strategies;
+    for (int pl = 1; pl <= dim.Length(); pl++) {
+      dim[pl] = reader.ReadCount();
+      for (int st = 1; st <= dim[pl]; st++) {
+	strategies.Append(reader.ReadString());
+      }
+    }
+    game = NewTable(dim);
+    for (int pl = 1, index = 1; pl <= dim.Length(); pl++) {
+      game->GetPlayer(pl)->SetLabel(players[pl]);
+      for (int st = 1; st <= dim[pl]; st++) {
+	game->GetPlayer(pl)->GetStrategy(st)->SetLabel(strategies[index++]);
+      }
+    }
+  }
+  else {
+    game = NewTree();
+    for (int pl = 1; pl <= players.Length(); pl++) {
+      game->NewPlayer()->SetLabel(players[pl]);
+    }
+  }
+  game->SetTitle(title);
+  game->SetComment(comment);
+
+  ReadBinaryOutcomes(reader, game);
+
+  if (type == 'N') {
+    StrategySupportProfile support(game);
+    for (StrategyProfileIterator iter(support); !iter.AtEnd(); iter++) {
+      (*iter)->SetOutcome(ReadBinaryOutcomeIndex(reader, game));
+    }
+  }
+  else {
+    std::map<std::pair<int, int>, GameInfoset> infosets;
+    ReadBinaryNode(reader, game, game->GetRoot(), infosets);
+  }
+  return game;
+}
+
 } // end of anonymous namespace
 
 
@@ -1052,6 +1476,22 @@ Game ReadGame(std::istream &p_file) throw (InvalidFileException)
 {
   std::stringstream buffer;
   buffer << p_file.rdbuf();
+
+  char magic[4];
+  if (buffer.read(magic, 4) && std::equal(magic, magic + 4, BinaryMagic)) {
+    try {
+      return ReadBinaryGame(buffer);
+    }
+    catch (InvalidFileException &) {
+      throw;
+    }
+    catch (std::exception &ex) {
+      throw InvalidFileException(ex.what());
+    }
+  }
+  buffer.clear();
+  buffer.seekg(0, std::ios::beg);
+
   try {
     GameXMLSavefile doc(buffer.str());
     return doc.GetGame();
@@ -1092,4 +1532,55 @@ Game ReadGame(std::istream &p_file) throw (InvalidFileException)
   }
 }
 
+//=========================================================================
+//    WriteBinaryGame: Global visible function to write the binary format
+//=========================================================================
+
+void WriteBinaryGame(std::ostream &p_file, const Game &p_game)
+{
+  BinaryWriter writer(p_file);
+  p_file.write(BinaryMagic, 4);
+  writer.WriteCount(BinaryVersion);
+  writer.WriteByte((p_game->IsTree()) ? 'E' : 'N');
+  writer.WriteString(p_game->GetTitle());
+  writer.WriteString(p_game->GetComment());
+  writer.WriteCount(p_game->NumPlayers());
+  for (int pl = 1; pl <= p_game->NumPlayers(); pl++) {
+    writer.WriteString(p_game->GetPlayer(pl)->GetLabel());
+  }
+  if (!p_game->IsTree()) {
+    for (int pl = 1; pl <= p_game->NumPlayers(); pl++) {
+      GamePlayer player = p_game->GetPlayer(pl);
+      writer.WriteCount(player->NumStrategies());
+      for (int st = 1; st <= player->NumStrategies(); st++) {
+	writer.WriteString(player->GetStrategy(st)->GetLabel());
+      }
+    }
+  }
+
+  writer.WriteCount(p_game->NumOutcomes());
+  for (int outc = 1; outc <= p_game->NumOutcomes(); outc++) {
+    writer.WriteString(p_game->GetOutcome(outc)->GetLabel());
+  }
+  for (int pl = 1; pl <= p_game->NumPlayers(); pl++) {
+    Array<Rational> payoffs(p_game->NumOutcomes());
+    for (int outc = 1; outc <= p_game->NumOutcomes(); outc++) {
+      payoffs[outc] = p_game->GetOutcome(outc)->GetPayoff<Rational>(pl);
+    }
+    writer.WriteNumbers(payoffs);
+  }
+
+  if (!p_game->IsTree()) {
+    StrategySupportProfile support(p_game);
+    for (StrategyProfileIterator iter(support); !iter.AtEnd(); iter++) {
+      GameOutcome outcome = (*iter)->GetOutcome();
+      writer.WriteCount((outcome) ? outcome->GetNumber() : 0);
+    }
+  }
+  else {
+    std::set<GameInfosetRep *> written;
+    WriteBinaryNode(writer, p_game->GetRoot(), written);
+  }
+}
+
 } // end namespace Gambit
@@ -536,6 +536,9 @@ void GameExplicitRep::Write(std::ostream &p_stream,
 	   (p_format == "native" && !IsTree())) {
     WriteNfgFile(p_stream);
   }
+  else if (p_format == "binary") {
+    WriteBinaryGame(p_stream, Game(const_cast<GameExplicitRep *>(this)));
+  }
   else {
     throw UndefinedException();
   }
@@ -20,36 +20,184 @@
 # Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
 #
 
+import multiprocessing
+
+import gambit.lib.libgambit
+from gambit.nash import ExternalEnumPolySolver, NashSolution, \
+     _profile_data, _rebuild_profiles, _wait, _write_game
+
+def solve_support(support, tolerance=1.0e-6):
+    """
+    Compute the Nash equilibria of the game of 'support' in which
+    exactly the strategies in 'support' are played with positive
+    probability, by solving the restriction of the game to 'support'
+    using gambit-enumpoly.  Profiles in which a strategy in 'support'
+    has probability at most 'tolerance', or a strategy outside it does
+    better by more than 'tolerance', are discarded.
+    """
+    game = support.game
+    strategies = list(support)
+    equilibria = [ ]
+    for eqm in ExternalEnumPolySolver().solve(support.restrict()):
+        profile = game.mixed_strategy_profile()
+        for strategy in game.strategies:
+            profile[strategy] = 0.0
+        for strategy in strategies:
+            profile[strategy] = eqm[strategy]
+        if min(profile[strategy] for strategy in strategies) <= tolerance:
+            continue
+        if max(profile.strategy_value(strategy) -
+               profile.payoff(strategy.player)
+               for strategy in game.strategies) > tolerance:
+            continue
+        equilibria.append(profile)
+    return equilibria
+
+def _support_worker(conn, data, solver):
+    """
+    Main loop of a SupportEnumeration.solve_supports() worker process.
+    Receives ("search", node) to search the part of the supports of
+    the game serialized in 'data' given by node (if None, all of them),
+    and sends back ("support", path, strategies, profiles) for each
+    support found, with the strategies as indices into game.strategies
+    and the equilibria found by 'solver' on the support as by
+    _profile_data(), and ("idle",) once the search is complete.
+    A request ("steal",) is answered by ("stolen", node), giving up
+    part of the search if possible, once the current support is solved.
+    """
+    game = gambit.lib.libgambit.Game.parse_game(data)
+    index = dict((strategy, i) for (i, strategy) in enumerate(game.strategies))
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        elif message[0] == "steal":
+            conn.send(("stolen", None))
+            continue
+        search = gambit.lib.libgambit.SupportEnumerator(game.support_profile(),
+                                                        node=message[1])
+        try:
+            for support in search:
+                profiles = [ _profile_data(p) for p in solver(support) ]
+                conn.send(("support", search.path,
+                           [ index[strategy] for strategy in support ],
+                           profiles))
+                # Answer at most one request per support, so a worker
+                # with nothing to give up is not asked continually
+                if conn.poll():
+                    conn.recv()
+                    conn.send(("stolen", search.steal()))
+        except Exception as e:
+            conn.send(("error", e))
+        conn.send(("idle",))
+    conn.close()
+
+class _SupportWorker(object):
+    def __init__(self, data, solver):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_support_worker,
+                                               args=(child_conn, data, solver))
+        self.process.daemon = True
+        self.process.start()
+        child_conn.close()
+        self.busy = False
+        self.stealing = False
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (IOError, OSError):
+            pass
+        self.process.join()
+
+    def kill(self):
+        self.process.terminate()
+        self.process.join()
+
 class SupportEnumeration(object):
     def enumerate_supports(self, game):
         return self.admissible_supports(game.support_profile(), list(game.strategies))
 
     def admissible_supports(self, profile, str_rest):
-        # Passo 1: closure
-        while True:
-            temp_profile = profile.undominated(True, True)
-            if temp_profile == profile:
-                break
-            profile = temp_profile
-
-        # Step 2: y' and z'
-        new_rest = filter(lambda x: x in list(profile), str_rest)
-
-        # Step 3: return x if z' is empty
-        if not new_rest:
-            yield profile
-
-        # Step 4: recursive step if z' isn't empty
-        else:
-            elem = new_rest.pop()
-
-            for gen in self.admissible_supports(profile, new_rest):
-                yield gen
-
-            try:
-                new_profile = profile.remove(elem)
-            except ValueError:
-                raise StopIteration
-
-            for gen in self.admissible_supports(new_profile, new_rest):
-                yield gen
+        """
+        Generate the support profiles contained in 'profile', with no
+        strictly dominated strategies, obtained by removing strategies
+        in 'str_rest' from 'profile'.  The search and the iterated
+        elimination of dominated strategies are carried out natively.
+        """
+        return gambit.lib.libgambit.SupportEnumerator(profile, str_rest)
+
+    def solve_supports(self, game, workers=None, solver=solve_support):
+        """
+        Compute the equilibria on each of the supports generated by
+        enumerate_supports(game), using a pool of 'workers' processes
+        (by default, one per CPU).  The search for supports is divided
+        among the workers, and an idle worker takes over part of the
+        search of a busy one.  Each support is passed to 'solver',
+        which returns the equilibria of the game on it, by default
+        solve_support().
+
+        Returns a list of pairs (support, equilibria), in the order in
+        which enumerate_supports() generates the supports, whatever the
+        number of workers.
+        """
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        data = _write_game(game)
+        pool = [ _SupportWorker(data, solver) for i in xrange(workers) ]
+        found = [ ]
+        pending = [ None ]
+        try:
+            while True:
+                idle = [ w for w in pool if not w.busy ]
+                while pending and idle:
+                    worker = idle.pop()
+                    worker.conn.send(("search", pending.pop()))
+                    worker.busy = True
+                if not pending and not [ w for w in pool
+                                         if w.busy or w.stealing ]:
+                    break
+                # Ask busy workers to give up part of their search, for
+                # each idle worker without a request already outstanding
+                wanted = len(idle) - len([ w for w in pool if w.stealing ])
+                for worker in pool:
+                    if wanted <= 0:
+                        break
+                    if worker.busy and not worker.stealing:
+                        worker.conn.send(("steal",))
+                        worker.stealing = True
+                        wanted -= 1
+
+                active = dict((w.conn, w) for w in pool
+                              if w.busy or w.stealing)
+                for conn in _wait(list(active.keys()), None):
+                    worker = active[conn]
+                    try:
+                        message = conn.recv()
+                    except EOFError:
+                        raise RuntimeError("worker process exited while "
+                                           "enumerating supports")
+                    if message[0] == "support":
+                        found.append(message[1:])
+                    elif message[0] == "stolen":
+                        worker.stealing = False
+                        if message[1] is not None:
+                            pending.append(message[1])
+                    elif message[0] == "idle":
+                        worker.busy = False
+                    else:
+                        raise message[1]
+        finally:
+            for worker in pool:
+                if worker.busy or worker.stealing:
+                    worker.kill()
+                else:
+                    worker.stop()
+
+        found.sort()
+        strategies = list(game.strategies)
+        return [ (gambit.lib.libgambit.StrategySupportProfile(
+                      [ strategies[i] for i in support ], game),
+                  [ NashSolution(p)
+                    for p in _rebuild_profiles(game, profiles) ])
+                 for (path, support, profiles) in found ]
@@ -24,6 +24,7 @@
 Implementation of contest games.
 """
 
+import numpy
 import meanstat
 from gambit.lib.libgambit import Rational
 
@@ -57,6 +58,15 @@ class TullockGame(meanstat.MeanStatisticGame):
         except ZeroDivisionError:
             return self.omega
 
+    def payoff_array(self, own, others):
+        own, others = numpy.broadcast_arrays(numpy.asarray(own, dtype=float),
+                                             numpy.asarray(others, dtype=float))
+        total = own + others
+        cost = numpy.vectorize(self.cost, otypes=[float])(own)
+        p_win = own / numpy.where(total == 0, 1.0, total)
+        return numpy.where(total == 0, self.omega,
+                           self.omega - cost + p_win * self.prize)
+
 
 import math
 
@@ -98,3 +108,20 @@ class GeneralTullockGame(meanstat.MeanStatisticGame):
         except ZeroDivisionError:
             return self.omega
 
+    def payoff_array(self, own, other):
+        own, other = numpy.broadcast_arrays(numpy.asarray(own, dtype=float),
+                                            numpy.asarray(other, dtype=float))
+        if self.r == 0.0:
+            p_own = numpy.where(own > other, 1.0,
+                                numpy.where((own < other) | (own == 0),
+                                            0.0, 0.5))
+            p_other = 1.0 - p_own
+        else:
+            p_own = numpy.power(own, self.r)
+            p_other = numpy.power(other, self.r)
+        total = p_own + p_other
+        cost = numpy.vectorize(self.cost, otypes=[float])(own)
+        p_win = p_own / numpy.where(total == 0, 1.0, total)
+        return numpy.where(total == 0, self.omega,
+                           self.omega - cost + p_win * self.prize)
+
@@ -25,8 +25,46 @@
 Representation of mean-statistic games.
 """
 
+import numpy
 import gambit
 
+# Below this length, direct convolution is faster than the FFT
+FFT_THRESHOLD = 64
+
+def _convolve(a, b):
+    """
+    Convolve the sequences a and b, using the FFT for long sequences
+    of floating-point numbers.  Sequences of exact numbers such as
+    Rationals are convolved directly.
+    """
+    if (min(len(a), len(b)) < FFT_THRESHOLD or
+        a.dtype.kind != 'f' or b.dtype.kind != 'f'):
+        return numpy.convolve(a, b)
+    size = len(a) + len(b) - 1
+    nfft = 1 << (size-1).bit_length()
+    v = numpy.fft.irfft(numpy.fft.rfft(a, nfft) * numpy.fft.rfft(b, nfft),
+                        nfft)[:size]
+    # Clear out roundoff error in the tails of the distribution
+    return numpy.maximum(v, 0.0)
+
+def sum_dist(K, prob):
+    """
+    Computes the distribution of the sum of K independent choices from
+    probability distribution prob, returned as an ndarray.  The K-fold
+    convolution is computed by exponentiation by squaring.
+    """
+    power = numpy.asarray(prob)
+    if power.dtype.kind in 'biu':
+        power = power.astype(float)
+    dist = numpy.ones(1, dtype=power.dtype)
+    while K > 0:
+        if K % 2 == 1:
+            dist = _convolve(dist, power)
+        K /= 2
+        if K > 0:
+            power = _convolve(power, power)
+    return dist
+
 class Strategy(object):
     def __init__(self, player, st):
         self.player = player
@@ -113,6 +151,13 @@ class MeanStatisticGame(object):
     This class is abstract in that it depends upon, but does not define,
     the method payoff(own, others), which provides the payoff for
     any given vector of own choice and sum of others' choices.
+    Subclasses may also override payoff_array(own, others), which
+    evaluates the payoff elementwise over (broadcast) arrays of own
+    choices and sums of others' choices; by default this calls payoff().
+
+    The payoffs for all pairs of own choice and statistic are tabulated
+    the first time they are needed and cached; the cache is not updated
+    if the parameters of the game are subsequently changed.
     """
     def __init__(self, N, min_choice, max_choice, step_choice=1,
                  label_prefix="S"):
@@ -122,6 +167,8 @@ class MeanStatisticGame(object):
         self.statistics = xrange((self.N-1)*min(self.choices),
                                  (self.N-1)*max(self.choices)+1,
                                  step_choice)
+        self._kernel = None
+        self._kernel_deriv = None
 
     @property
     def is_tree(self):   return False
@@ -154,21 +201,96 @@ class MeanStatisticGame(object):
     def __setitem__(self, key, value):
         raise NotImplementedError
 
+    def payoff_array(self, own, others):
+        """
+        Returns the payoffs for the arrays of own choices 'own' and
+        sums of others' choices 'others' as a floating-point ndarray.
+        """
+        return numpy.vectorize(self.payoff, otypes=[float])(own, others)
+
+    @property
+    def payoff_kernel(self):
+        """
+        The payoff matrix, indexed by own choice and by statistic
+        (the sum of the other players' choices).
+        """
+        if self._kernel is None:
+            self._kernel = self.payoff_array(
+                numpy.array(self.choices)[:, numpy.newaxis],
+                numpy.array(self.statistics)[numpy.newaxis, :])
+        return self._kernel
+
+    @property
+    def payoff_kernel_deriv(self):
+        """
+        The payoff matrix used in computing derivatives of strategy values.
+        Entry [st, i+stOpp] is the payoff to choice st when one opponent
+        chooses stOpp, and the remaining opponents have statistic index i.
+        """
+        if self._kernel_deriv is None:
+            self._kernel_deriv = self.payoff_array(
+                numpy.array(self.choices)[:, numpy.newaxis],
+                numpy.array(self.statistics)[numpy.newaxis, :] +
+                self.choices[0])
+        return self._kernel_deriv
+
     def mixed_strategy_profile(self, point=None):
         return MixedStrategyProfile(self, point)
 
-    def to_table(self):
-        g = gambit.new_table([ len(self.choices) ] * self.N)
+    def to_table(self, compact=False):
+        """
+        Returns a Gambit game equivalent to this game.  By default this
+        is the full strategic-form table, which is filled in directly
+        from the table of payoffs by own choice and statistic.
+
+        If 'compact' is True, an action graph game is returned instead,
+        in which all players share the same action nodes, and a single
+        function node counts the sum of the players' choices.  This
+        representation grows only polynomially in the number of players.
+        """
+        # Payoffs are computed using payoff() rather than taken from
+        # payoff_kernel, so that exact (e.g., Rational) payoffs are kept.
+        kernel = numpy.array([ [ self.payoff(c, s) for s in self.statistics ]
+                               for c in self.choices ])
+        if compact:
+            return gambit.Game.parse_game(self._agg_text(kernel))
+
+        # The index of the statistic is the sum of the indices of the
+        # other players' choices.
+        n = len(self.choices)
+        indices = [ numpy.arange(n).reshape([ n if i == pl else 1
+                                              for i in xrange(self.N) ])
+                    for pl in xrange(self.N) ]
+        total = sum(indices)
+        g = gambit.Game.from_arrays(*[ kernel[own, total-own]
+                                       for own in indices ])
+        g.title = self.title
         for pl in xrange(self.N):
             for (st, label) in enumerate(self.labels):
                 g.players[pl].strategies[st].label = label
-        for cont in g.contingencies:
-            g_outc = g[cont]
-            t_outc = self[cont]
-            for pl in xrange(self.N):
-                g_outc[pl] = t_outc[pl]
         return g
 
+    def _agg_text(self, kernel):
+        n = len(self.choices)
+        actions = " ".join([ str(st) for st in xrange(n) ])
+        lines = [ "#AGG", "# %s" % self.title,
+                  "# Players", str(self.N),
+                  "# Action nodes", str(n),
+                  "# Function nodes", "1",
+                  "# Action sets", " ".join([ str(n) ] * self.N) ]
+        lines += [ actions ] * self.N
+        # Each action node's payoff depends only on the function node,
+        # which sums the indices of the choices of all players.
+        lines += [ "# Action graph" ] + [ "1 %d" % n ] * n
+        lines += [ "%d %s" % (n, actions) ]
+        lines += [ "# Function signatures", "10 0 [%s]" % actions ]
+        # With the player's own choice st, the function node ranges
+        # over st plus the statistic indices, in ascending order.
+        lines += [ "# Payoffs" ]
+        for st in xrange(n):
+            lines += [ "0", " ".join([ repr(float(v)) for v in kernel[st] ]) ]
+        return "\n".join(lines) + "\n"
+
 
 class MixedStrategyProfile(object):
     """A (symmetric) mixed strategy profile on a mean statistic game.
@@ -179,10 +301,23 @@ class MixedStrategyProfile(object):
             self.set_centroid()
         else:
             self.profile = profile[:]
-    
+
+    # The distributions of sums of choices are cached for each version
+    # of the profile; assigning to the profile or to any of its entries
+    # starts a new version.  Modifying the list returned by 'profile'
+    # in place bypasses this, and should be avoided.
+    @property
+    def profile(self):   return self._profile
+    @profile.setter
+    def profile(self, value):
+        self._profile = value
+        self._dists = { }
+
     def __len__(self):   return len(self.profile)
     def __getitem__(self, i):      return self.profile[i]
-    def __setitem__(self, i, value):      self.profile[i] = value
+    def __setitem__(self, i, value):
+        self._profile[i] = value
+        self._dists = { }
     def __str__(self):  return repr(self)
     def __repr__(self):
         return "Mixed strategy profile on '%s': [%s]" % \
@@ -212,62 +347,39 @@ class MixedStrategyProfile(object):
             self.profile = [ x/den for x in self.profile ]
                 
     def strategy_value(self, st):
-        return sum([ prob * self.game.payoff(self.game.choices[st],
-                                             self.game.statistics[i])
-                     for (i, prob) in
-                     enumerate(self.sum_dist(self.game.N-1,
-                                             self.profile)) ])
+        return float(numpy.dot(self.game.payoff_kernel[st],
+                               self.others_dist(self.game.N-1)))
 
     def strategy_values(self):
-        oprob = self.sum_dist(self.game.N-1, self.profile)
-        
-        return [ sum([ prob * self.game.payoff(st, self.game.statistics[i])
-                       for (i, prob) in enumerate(oprob) ])
-                 for st in self.game.choices ]
+        return numpy.dot(self.game.payoff_kernel,
+                         self.others_dist(self.game.N-1)).tolist()
 
     def strategy_value_deriv(self, st, stOpp):
-        return sum([ prob * self.game.payoff(self.game.choices[st],
-                                             self.game.statistics[i]+
-                                             self.game.choices[stOpp])
-                     for (i, prob) in
-                     enumerate(self.sum_dist(self.game.N-2,
-                                             self.profile)) ])
-    
-        
-        
+        oprob = self.others_dist(self.game.N-2)
+        return float(numpy.dot(self.game.payoff_kernel_deriv[st, stOpp:stOpp+len(oprob)],
+                               oprob))
+
     def strategy_values_deriv(self):
-        oprob = self.sum_dist(self.game.N-2, self.profile)
-        
-        return [ [ sum([ prob * self.game.payoff(self.game.choices[st],
-                                                 self.game.statistics[i]+
-                                                 self.game.choices[stOpp])
-                         for (i, prob) in enumerate(oprob) ])
-                   for stOpp in self.game.choices ]
-                 for st in self.game.choices ]
+        oprob = self.others_dist(self.game.N-2)
+        kernel = self.game.payoff_kernel_deriv
+        return numpy.array([ numpy.dot(kernel[:, stOpp:stOpp+len(oprob)], oprob)
+                             for stOpp in xrange(len(self.game.choices)) ]).transpose().tolist()
+
+    def others_dist(self, K):
+        """
+        Returns the distribution of the sum of the choices of K players
+        playing according to the profile.  The result is cached until
+        the profile is next modified.
+        """
+        try:
+            return self._dists[K]
+        except KeyError:
+            self._dists[K] = sum_dist(K, self.profile)
+            return self._dists[K]
 
     def sum_dist(self, K, prob):
         """
         Computes the distribution of the sum of K independent choices from
         probability distribution prob
         """
-        if K == 0:
-            return [ 1.0 ]
-        elif K == 1:
-            return prob
-        elif K == 2:
-            v = [ 0.0 for i in xrange(2*len(prob)-1) ]
-            for (i, p) in enumerate(prob):
-                for (j, q) in enumerate(prob):
-                    v[i+j] += p*q
-            return v
-        else:
-            K1 = K / 2
-            K2 = K / 2 + K % 2
-            v1 = self.sum_dist(K1, prob)
-            v2 = self.sum_dist(K2, prob)
-            v = [ 0.0 for i in xrange(len(v1)+len(v2)-1) ]
-            for (i, p) in enumerate(v1):
-                for (j, q) in enumerate(v2):
-                    v[i+j] += p*q
-            return v
-
+        return sum_dist(K, prob)
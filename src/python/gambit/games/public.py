@@ -24,6 +24,7 @@
 Voluntary public-goods contribution games.
 """
 
+import numpy
 import meanstat
 
 class CobbDouglasVCGame(meanstat.MeanStatisticGame):
@@ -46,6 +47,12 @@ class CobbDouglasVCGame(meanstat.MeanStatisticGame):
     def payoff(self, own, others):
         return (self.omega-own-self.tax)**self.alpha * \
                (self.N*self.tax+own+others)**(1.0-self.alpha)
+
+    def payoff_array(self, own, others):
+        own = numpy.asarray(own, dtype=float)
+        others = numpy.asarray(others, dtype=float)
+        return numpy.power(self.omega-own-self.tax, self.alpha) * \
+               numpy.power(self.N*self.tax+own+others, 1.0-self.alpha)
         
 class QuadraticVCGame(meanstat.MeanStatisticGame):
     """
@@ -68,5 +75,10 @@ class QuadraticVCGame(meanstat.MeanStatisticGame):
         return self.omega-own-self.tax \
                + self.m*(self.N*self.tax+own+others) \
                - self.c*(self.N*self.tax+own+others)**2
+
+    def payoff_array(self, own, others):
+        own = numpy.asarray(own, dtype=float)
+        others = numpy.asarray(others, dtype=float)
+        return self.payoff(own, others)
         
 
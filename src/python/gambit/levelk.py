@@ -37,10 +37,8 @@ def logit_br(game, profile, lam):
     maxi = values.index(max(values))
     logp0 = scipy.optimize.newton(lambda x: do_sum(maxi, x, lam, values),
                                   0.0)
-    br = game.mixed_strategy_profile()
-    for i in xrange(len(profile)):
-        br[i] = math.exp(logp0 + lam*(values[i]-values[maxi]))
-    return br
+    return game.mixed_strategy_profile(point=[ math.exp(logp0 + lam*(v-values[maxi]))
+                                               for v in values ])
 
 class CognitiveHierarchyProfile(Solution):
     """
@@ -309,21 +309,15 @@ cdef class MixedBehaviorProfileRational(MixedBehaviorProfile):
     def _getaction(self, Action index):
         return Rational(rat_str(self.profile.getaction(index.action)).c_str()) 
     def _setprob(self, int index, value):
-        cdef char *s
         if not isinstance(value, (int, fractions.Fraction)):
             raise TypeError("rational precision profile requires int or Fraction probability, not %s" %
                             value.__class__.__name__)
-        t = str(value)
-        s = t
-        setitem_mbpr_int(self.profile, index, to_rational(s))
+        setitem_mbpr_int(self.profile, index, _to_rational(value))
     def _setaction(self, Action index, value):
-        cdef char *s
         if not isinstance(value, (int, fractions.Fraction)):
             raise TypeError("rational precision profile requires int or Fraction probability, not %s" %
                             value.__class__.__name__)
-        t = str(value)
-        s = t
-        setitem_mbpr_action(self.profile, index.action, to_rational(s))
+        setitem_mbpr_action(self.profile, index.action, _to_rational(value))
     def _payoff(self, Player player):
         return Rational(rat_str(self.profile.GetPayoff(player.player.deref().GetNumber())).c_str())
     def _belief(self, Node node):
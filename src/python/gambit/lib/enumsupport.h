@@ -0,0 +1,362 @@
+//
+// This file is part of Gambit
+// Copyright (c) 1994-2016, The Gambit Project (http://www.gambit-project.org)
+//
+// FILE: src/python/gambit/lib/enumsupport.h
+// Enumeration of admissible support profiles for Cython wrapper
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with this program; if not, write to the Free Software
+// Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+//
+
+#include <vector>
+#include <map>
+#include <utility>
+#include <algorithm>
+#include <stdint.h>
+#include "gambit/gambit.h"
+
+using namespace std;
+using namespace Gambit;
+
+//
+// Enumerates the support profiles which are closed under strict
+// dominance: those in which no strategy is strictly dominated, given
+// the supports of the other players, by any strategy of its player.
+// These are the supports which may be the supports of a Nash
+// equilibrium.
+//
+// Supports are represented as bitsets over all the strategies in the
+// game, the strategies of player 1 first.  The search branches on each
+// strategy in turn, first keeping it in the support, then removing it;
+// a strategy which has been kept is "fixed", and a branch in which a
+// fixed strategy becomes dominated is abandoned, so each support is
+// found exactly once.  After each branching, dominated strategies are
+// eliminated iteratively.  The strategies of a player dominated given
+// the supports of the other players are cached, as the same supports
+// of the other players recur across many branches.
+//
+// Payoffs are replaced by their rank among the payoffs of the same
+// player, which preserves dominance exactly while only comparing
+// integers.
+//
+class SupportEnumerator {
+public:
+  typedef std::vector<uint64_t> Bitset;
+
+  /// A node of the search: the current support, the fixed strategies,
+  /// and the branches taken to reach it (0 for keeping a strategy, 1 for
+  /// removing it).  Supports are found in lexicographic order of path.
+  struct Node {
+    Bitset support, fixed;
+    std::vector<int> path;
+  };
+
+  SupportEnumerator(const StrategySupportProfile &p_support);
+
+  /// Set whether the search may remove the strategy from the support.
+  /// Initially all strategies may be removed; strategies which may not
+  /// are still removed if they become dominated.
+  void SetUndecided(const GameStrategy &p_strategy, bool p_undecided);
+
+  /// Advance to the next admissible support; returns false once there
+  /// are no more.
+  bool Next(void);
+  /// Returns a new copy of the current support
+  StrategySupportProfile *GetSupport(void) const;
+  /// Returns the path of the current support
+  const std::vector<int> &GetPath(void) const { return m_path; }
+
+  /// Returns the number of nodes waiting to be searched
+  int NumPending(void) const { return m_stack.size(); }
+  /// Removes the pending node which would be searched last, which is
+  /// the root of the largest subtree still to be searched, so that it
+  /// may be searched elsewhere.  The node is returned as the global
+  /// indices of the strategies in its support, of its fixed strategies,
+  /// and its path.  Returns false if fewer than two nodes are pending.
+  bool Steal(std::vector<int> &p_support, std::vector<int> &p_fixed,
+	     std::vector<int> &p_path);
+  /// Replaces the pending nodes by the node given as by Steal()
+  void Seed(const std::vector<int> &p_support,
+	    const std::vector<int> &p_fixed, const std::vector<int> &p_path);
+
+private:
+  Game m_game;
+  int m_numPlayers;
+  // For each player, the number of strategies, the global index of
+  // the first strategy, and the stride of the strategy in the
+  // contingency index (the strategy of player 1 varying fastest)
+  std::vector<int> m_dims, m_offsets;
+  std::vector<long> m_strides;
+  // The rank of the payoff to each player in each contingency
+  std::vector<std::vector<int> > m_ranks;
+  std::vector<Node> m_stack;
+  Bitset m_undecided, m_current;
+  std::vector<int> m_path;
+  std::map<std::pair<int, Bitset>, Bitset> m_cache;
+
+  static bool Test(const Bitset &b, int i)
+  { return (b[i / 64] >> (i % 64)) & 1; }
+  static void Set(Bitset &b, int i)    { b[i / 64] |= (uint64_t) 1 << (i % 64); }
+  static void Reset(Bitset &b, int i)  { b[i / 64] &= ~((uint64_t) 1 << (i % 64)); }
+
+  int Count(const Bitset &p_support, int pl) const;
+  const Bitset &Dominated(int pl, const Bitset &p_support);
+  bool Eliminate(Node &p_node);
+};
+
+inline
+SupportEnumerator::SupportEnumerator(const StrategySupportProfile &p_support)
+  : m_game(p_support.GetGame()), m_numPlayers(m_game->NumPlayers()),
+    m_dims(m_numPlayers), m_offsets(m_numPlayers), m_strides(m_numPlayers),
+    m_ranks(m_numPlayers)
+{
+  int numStrats = 0;
+  long numConts = 1;
+  for (int pl = 0; pl < m_numPlayers; pl++) {
+    m_dims[pl] = m_game->GetPlayer(pl+1)->NumStrategies();
+    m_offsets[pl] = numStrats;
+    m_strides[pl] = numConts;
+    numStrats += m_dims[pl];
+    numConts *= m_dims[pl];
+  }
+
+  std::vector<std::vector<Rational> > payoffs(m_numPlayers);
+  for (int pl = 0; pl < m_numPlayers; pl++) {
+    payoffs[pl].resize(numConts);
+  }
+  StrategySupportProfile full(m_game);
+  for (StrategyProfileIterator iter(full); !iter.AtEnd(); iter++) {
+    long c = 0;
+    for (int pl = 0; pl < m_numPlayers; pl++) {
+      c += m_strides[pl] * ((*iter)->GetStrategy(pl+1)->GetNumber() - 1);
+    }
+    for (int pl = 0; pl < m_numPlayers; pl++) {
+      payoffs[pl][c] = (*iter)->GetPayoff(pl+1);
+    }
+  }
+  for (int pl = 0; pl < m_numPlayers; pl++) {
+    std::vector<Rational> values(payoffs[pl]);
+    std::sort(values.begin(), values.end());
+    values.erase(std::unique(values.begin(), values.end()), values.end());
+    m_ranks[pl].resize(numConts);
+    for (long c = 0; c < numConts; c++) {
+      m_ranks[pl][c] = std::lower_bound(values.begin(), values.end(),
+					payoffs[pl][c]) - values.begin();
+    }
+  }
+
+  Node root;
+  root.support = Bitset((numStrats + 63) / 64, 0);
+  root.fixed = root.support;
+  m_undecided = Bitset(root.support.size(), ~(uint64_t) 0);
+  for (int pl = 0; pl < m_numPlayers; pl++) {
+    for (int st = 1; st <= p_support.NumStrategies(pl+1); st++) {
+      Set(root.support,
+	  m_offsets[pl] + p_support.GetStrategy(pl+1, st)->GetNumber() - 1);
+    }
+  }
+  m_stack.push_back(root);
+}
+
+inline void SupportEnumerator::SetUndecided(const GameStrategy &p_strategy,
+					    bool p_undecided)
+{
+  int i = (m_offsets[p_strategy->GetPlayer()->GetNumber() - 1] +
+	   p_strategy->GetNumber() - 1);
+  if (p_undecided) {
+    Set(m_undecided, i);
+  }
+  else {
+    Reset(m_undecided, i);
+  }
+}
+
+inline int SupportEnumerator::Count(const Bitset &p_support, int pl) const
+{
+  int count = 0;
+  for (int st = 0; st < m_dims[pl]; st++) {
+    if (Test(p_support, m_offsets[pl] + st)) count++;
+  }
+  return count;
+}
+
+// Returns the set of strategies of player pl which are strictly
+// dominated by another of the player's strategies, given the supports
+// of the other players in p_support.
+inline const SupportEnumerator::Bitset &
+SupportEnumerator::Dominated(int pl, const Bitset &p_support)
+{
+  Bitset others(p_support);
+  for (int st = 0; st < m_dims[pl]; st++) {
+    Reset(others, m_offsets[pl] + st);
+  }
+  std::pair<int, Bitset> key(pl, others);
+  std::map<std::pair<int, Bitset>, Bitset>::const_iterator cached =
+    m_cache.find(key);
+  if (cached != m_cache.end()) {
+    return cached->second;
+  }
+
+  // The contingency index of each profile of strategies of the other
+  // players in their supports, with player pl playing the first strategy
+  std::vector<long> bases(1, 0);
+  for (int q = 0; q < m_numPlayers; q++) {
+    if (q == pl) continue;
+    std::vector<long> next;
+    for (int st = 0; st < m_dims[q]; st++) {
+      if (!Test(p_support, m_offsets[q] + st)) continue;
+      for (size_t i = 0; i < bases.size(); i++) {
+	next.push_back(bases[i] + st * m_strides[q]);
+      }
+    }
+    bases.swap(next);
+  }
+
+  const std::vector<int> &ranks = m_ranks[pl];
+  Bitset dominated(p_support.size(), 0);
+  for (int t = 0; t < m_dims[pl]; t++) {
+    for (int s = 0; s < m_dims[pl]; s++) {
+      if (s == t) continue;
+      long ds = s * m_strides[pl], dt = t * m_strides[pl];
+      size_t i = 0;
+      while (i < bases.size() && ranks[bases[i] + ds] > ranks[bases[i] + dt]) {
+	i++;
+      }
+      if (i == bases.size()) {
+	Set(dominated, m_offsets[pl] + t);
+	break;
+      }
+    }
+  }
+
+  // Bound the memory used by the cache
+  if (m_cache.size() >= 65536) {
+    m_cache.clear();
+  }
+  return m_cache[key] = dominated;
+}
+
+// Iteratively eliminate dominated strategies from the node's support.
+// Returns false if the node can contain no admissible support: if
+// a fixed strategy is dominated, or all a player's strategies are.
+inline bool SupportEnumerator::Eliminate(Node &p_node)
+{
+  bool changed = true;
+  while (changed) {
+    changed = false;
+    for (int pl = 0; pl < m_numPlayers; pl++) {
+      const Bitset &dominated = Dominated(pl, p_node.support);
+      for (size_t w = 0; w < dominated.size(); w++) {
+	uint64_t removed = dominated[w] & p_node.support[w];
+	if (removed == 0) continue;
+	if (removed & p_node.fixed[w]) {
+	  return false;
+	}
+	p_node.support[w] &= ~removed;
+	changed = true;
+      }
+      if (Count(p_node.support, pl) == 0) {
+	return false;
+      }
+    }
+  }
+  return true;
+}
+
+inline bool SupportEnumerator::Next(void)
+{
+  while (!m_stack.empty()) {
+    Node node = m_stack.back();
+    m_stack.pop_back();
+    if (!Eliminate(node)) {
+      continue;
+    }
+
+    // Branch on the last undecided strategy which is neither fixed
+    // nor eliminated
+    int branch = -1;
+    for (int i = m_offsets.back() + m_dims.back() - 1; i >= 0; i--) {
+      if (Test(node.support, i) && Test(m_undecided, i) &&
+	  !Test(node.fixed, i)) {
+	branch = i;
+	break;
+      }
+    }
+    if (branch < 0) {
+      m_current = node.support;
+      m_path = node.path;
+      return true;
+    }
+
+    int pl = std::upper_bound(m_offsets.begin(), m_offsets.end(),
+			      branch) - m_offsets.begin() - 1;
+    if (Count(node.support, pl) > 1) {
+      Node without(node);
+      Reset(without.support, branch);
+      without.path.push_back(1);
+      m_stack.push_back(without);
+    }
+    // Pushed last, so the branch keeping the strategy is searched first
+    Set(node.fixed, branch);
+    node.path.push_back(0);
+    m_stack.push_back(node);
+  }
+  return false;
+}
+
+inline StrategySupportProfile *SupportEnumerator::GetSupport(void) const
+{
+  StrategySupportProfile *support = new StrategySupportProfile(m_game);
+  for (int pl = 0; pl < m_numPlayers; pl++) {
+    for (int st = 0; st < m_dims[pl]; st++) {
+      if (!Test(m_current, m_offsets[pl] + st)) {
+	support->RemoveStrategy(m_game->GetPlayer(pl+1)->GetStrategy(st+1));
+      }
+    }
+  }
+  return support;
+}
+
+inline bool SupportEnumerator::Steal(std::vector<int> &p_support,
+				     std::vector<int> &p_fixed,
+				     std::vector<int> &p_path)
+{
+  if (m_stack.size() < 2) {
+    return false;
+  }
+  const Node &node = m_stack.front();
+  p_support.clear();
+  p_fixed.clear();
+  for (int i = 0; i < m_offsets.back() + m_dims.back(); i++) {
+    if (Test(node.support, i)) p_support.push_back(i);
+    if (Test(node.fixed, i))   p_fixed.push_back(i);
+  }
+  p_path = node.path;
+  m_stack.erase(m_stack.begin());
+  return true;
+}
+
+inline void SupportEnumerator::Seed(const std::vector<int> &p_support,
+				    const std::vector<int> &p_fixed,
+				    const std::vector<int> &p_path)
+{
+  Node node;
+  node.support = Bitset(m_undecided.size(), 0);
+  node.fixed = node.support;
+  for (size_t i = 0; i < p_support.size(); i++) Set(node.support, p_support[i]);
+  for (size_t i = 0; i < p_fixed.size(); i++)   Set(node.fixed, p_fixed[i]);
+  node.path = p_path;
+  m_stack.assign(1, node);
+}
@@ -19,6 +19,7 @@
 # along with this program; if not, write to the Free Software
 # Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
 #
+import hashlib
 import itertools
 
 from libcpp cimport bool
@@ -43,6 +44,31 @@ cdef class Outcomes(Collection):
         if label != "": c.label = str(label)
         return c
 
+    def set_payoffs(self, payoffs):
+        """Sets the payoffs of several outcomes at once.  'payoffs' is
+        an iterable of tuples (outcome, values), where 'outcome' is an
+        Outcome or the index of an outcome, and 'values' is a sequence
+        of payoffs, one for each player.
+        """
+        cdef c_GameOutcome c
+        nplayers = self.game.deref().NumPlayers()
+        for (outcome, values) in payoffs:
+            if isinstance(outcome, Outcome):
+                if (<Outcome>outcome).restriction is not None:
+                    raise UndefinedOperationError("Changing objects in a restriction is not supported")
+                c = (<Outcome>outcome).outcome
+            elif isinstance(outcome, int):
+                c = self.game.deref().GetOutcome(outcome+1)
+            else:
+                raise TypeError("outcome must be int or Outcome, not %s" %
+                                outcome.__class__.__name__)
+            if len(values) != nplayers:
+                raise ValueError("must specify exactly one payoff per player")
+            for value in values:
+                _check_payoff(value)
+            for (pl, value) in enumerate(values):
+                _set_payoff(c, pl+1, value)
+
 cdef class Players(Collection):
     "Represents a collection of players in a game."
     cdef c_Game game
@@ -121,6 +147,8 @@ cdef class GameStrategies(Collection):
 
 cdef class Game(object):
     cdef c_Game game
+    cdef dict payoff_cache
+    cdef unsigned long payoff_version
 
     @classmethod
     def new_tree(cls):
@@ -147,12 +175,54 @@ cdef class Game(object):
         if len(set(a.shape for a in arrays)) > 1:
             raise ValueError("All specified arrays must have the same shape")
         g = Game.new_table(arrays[0].shape)
-        for profile in itertools.product(*(xrange(arrays[0].shape[i])
-                                         for i in xrange(len(g.players)))):
-            for pl in xrange(len(g.players)):
-                g[profile][pl] = arrays[pl][profile]
+        for (pl, a) in enumerate(arrays):
+            g._load_payoffs(pl+1, a)
         return g
-        
+
+    cdef _load_payoffs(self, int pl, values):
+        # Bulk-load the payoffs of player 'pl' (numbered from 1) into a
+        # newly-created table.  The C++ side expects the contingencies
+        # with the first player's strategy varying fastest, which is
+        # Fortran order.
+        import numpy
+        cdef double[::1] dvalues
+        cdef long[::1] nums
+        cdef long[::1] dens
+        values = numpy.asarray(values).ravel(order='F')
+        _payoffs_changed()
+        if values.dtype.kind in 'biu':
+            if (len(values) > 0 and
+                (values.min() < _INT32_MIN or values.max() > _INT32_MAX)):
+                # As for _to_rational(), wide integers are set one by one
+                # from their text; this also covers unsigned 64-bit values
+                # which do not fit in a C long
+                for (i, x) in enumerate(values):
+                    self.outcomes[i][pl-1] = int(x)
+                return
+            nums = numpy.ascontiguousarray(values, dtype=numpy.int_)
+            setpayoffs_rational(self.game, pl, &nums[0], NULL)
+        elif values.dtype.kind == 'f':
+            if not numpy.isfinite(values).all():
+                raise ValueError("payoffs must be finite")
+            dvalues = numpy.ascontiguousarray(values, dtype=numpy.double)
+            setpayoffs_double(self.game, pl, &dvalues[0])
+        else:
+            # Arrays of Python objects, e.g. Fraction or Decimal.  These
+            # are loaded as exact rationals; if a numerator or denominator
+            # does not fit in 32 bits, fall back to the text representation.
+            for x in values:
+                _check_payoff(x)
+            fracs = [ fractions.Fraction(x) for x in values ]
+            if not all(_INT32_MIN <= x.numerator <= _INT32_MAX and
+                       x.denominator <= _INT32_MAX for x in fracs):
+                for (i, x) in enumerate(fracs):
+                    self.outcomes[i][pl-1] = x
+                return
+            nums = numpy.array([ x.numerator for x in fracs ],
+                               dtype=numpy.int_)
+            dens = numpy.array([ x.denominator for x in fracs ],
+                               dtype=numpy.int_)
+            setpayoffs_rational(self.game, pl, &nums[0], &dens[0])
 
     @classmethod
     def read_game(cls, char *fn):
@@ -166,10 +236,11 @@ cdef class Game(object):
         return g
 
     @classmethod
-    def parse_game(cls, char *s):
+    def parse_game(cls, s):
         cdef Game g
+        cdef char *buf = s
         g = cls()
-        g.game = ParseGame(s)
+        g.game = ParseGame(buf, len(s))
         return g        
 
     def __str__(self):
@@ -197,6 +268,17 @@ cdef class Game(object):
     def __hash__(self):
         return long(<long>self.game.deref())
 
+    def fingerprint(self, invariant=False):
+        """Returns a digest, as a string of hexadecimal digits, of the
+        structure, chance probabilities and payoffs of the game.  Games
+        which differ only in their labels have the same fingerprint.
+        If 'invariant' is True, the digest also does not depend on the
+        numbering of the players, or on the order of their strategies
+        or actions.
+        """
+        cdef cxx_string s = fingerprint_game(self.game, invariant)
+        return hashlib.sha256(s.c_str()[:s.size()]).hexdigest()
+
     property is_tree:
         def __get__(self):
             return True if self.game.deref().IsTree() != 0 else False
@@ -339,7 +421,100 @@ cdef class Game(object):
         return self._get_contingency(*tuple(cont))
 
 
-    def mixed_strategy_profile(self, rational=False):
+    def payoff_tensor(self, player, dtype=float, cache=False):
+        """Returns the payoffs to 'player' as an array with one dimension
+        per player, indexed by the strategies of each player.  If 'dtype'
+        is object, the payoffs are exact Rationals.  If 'cache' is True
+        and the game is in strategic form, a read-only array is returned,
+        which is kept and returned again by later calls until the payoffs
+        of the game are changed.
+        """
+        import numpy
+        cdef double[::1] buf
+        cdef Array[c_Rational] rats
+        if isinstance(player, Player):
+            pl = player.number
+        elif isinstance(player, (int, str)):
+            pl = self.players[player].number
+        else:
+            raise TypeError("payoff tensor index must be int, str, or Player, not %s" %
+                            player.__class__.__name__)
+        dtype = numpy.dtype(dtype)
+        # Trees are not cached, as they can be changed in too many ways
+        cache = cache and not self.is_tree
+        if cache:
+            if (self.payoff_cache is None or
+                self.payoff_version != _payoff_version):
+                self.payoff_cache = { }
+                self.payoff_version = _payoff_version
+            elif (pl, dtype) in self.payoff_cache:
+                return self.payoff_cache[(pl, dtype)]
+
+        shape = tuple(len(p.strategies) for p in self.players)
+        # Contingencies are visited with the first player's strategy varying
+        # fastest, so the values are written into a Fortran-ordered array.
+        if dtype.kind == 'O':
+            values = numpy.empty(shape, dtype=object, order='F')
+            flat = values.reshape(-1, order='F')
+            rats = getpayoffs_rational(self.game, pl+1)
+            for i in xrange(rats.Length()):
+                flat[i] = Rational(rat_str(rats.getitem(i+1)).c_str())
+        else:
+            values = numpy.empty(shape, dtype=numpy.double, order='F')
+            buf = values.reshape(-1, order='F')
+            getpayoffs_double(self.game, pl+1, &buf[0])
+            if dtype != values.dtype:
+                values = values.astype(dtype)
+
+        if cache:
+            values.flags.writeable = False
+            self.payoff_cache[(pl, dtype)] = values
+        return values
+
+    def payoff_tensors(self, dtype=float, cache=False):
+        """Returns a list of the payoff tensors of all players.
+        See payoff_tensor() for the meaning of the arguments.
+        """
+        return [ self.payoff_tensor(pl, dtype=dtype, cache=cache)
+                 for pl in xrange(len(self.players)) ]
+
+    def strategy_values_batch(self, profiles):
+        """Computes the strategy values for each of a batch of mixed
+        strategy profiles.  'profiles' is an array with one row per profile,
+        giving the probabilities of all strategies in the game; the values
+        are returned as an array of the same shape.  For games in strategic
+        form, the computation is done without holding the global
+        interpreter lock.
+        """
+        import numpy
+        cdef double[:, ::1] probs
+        cdef double[:, ::1] values
+        cdef double[::1] payoffs
+        cdef int[::1] dims
+        cdef int nplayers
+        probs = numpy.ascontiguousarray(profiles, dtype=numpy.double)
+        if probs.shape[1] != len(self.strategies):
+            raise ValueError("must specify exactly one value per strategy")
+        result = numpy.zeros((probs.shape[0], probs.shape[1]))
+        if probs.shape[0] == 0:
+            return result
+        if self.is_tree:
+            for i in xrange(probs.shape[0]):
+                result[i] = self.mixed_strategy_profile(point=probs[i]).strategy_values_array()
+            return result
+
+        nplayers = len(self.players)
+        dims = numpy.array([ len(p.strategies) for p in self.players ],
+                           dtype=numpy.intc)
+        payoffs = numpy.concatenate([ t.ravel(order='F')
+                                      for t in self.payoff_tensors() ])
+        values = result
+        with nogil:
+            strategyvalues_table(nplayers, &dims[0], &payoffs[0],
+                                 probs.shape[0], &probs[0,0], &values[0,0])
+        return result
+
+    def mixed_strategy_profile(self, rational=False, point=None):
         cdef MixedStrategyProfileDouble mspd
         cdef MixedStrategyProfileRational mspr
         cdef c_Rational dummy_rat
@@ -348,10 +523,14 @@ cdef class Game(object):
         if not rational:
             mspd = MixedStrategyProfileDouble()
             mspd.profile = new c_MixedStrategyProfileDouble(self.game.deref().NewMixedStrategyProfile(0.0))
+            if point is not None:
+                mspd._load_point(point)
             return mspd
         else:
             mspr = MixedStrategyProfileRational()
             mspr.profile = new c_MixedStrategyProfileRational(self.game.deref().NewMixedStrategyProfile(dummy_rat))
+            if point is not None:
+                mspr._load_point(point)
             return mspr
 
     def mixed_behavior_profile(self, rational=False):
@@ -383,10 +562,14 @@ cdef class Game(object):
 
     def write(self, format='native'):
         cdef cxx_string s
+        cdef cxx_string out
         if format == 'gte':
             return gambit.gte.write_game(self)
         else:
             s.assign(format)
-            return WriteGame(self.game, s).c_str()
+            out = WriteGame(self.game, s)
+            # Slicing with the length keeps any null characters in
+            # the binary format
+            return out.c_str()[:out.size()]
 
 
@@ -20,10 +20,12 @@
 # Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
 #
 
+import math
 import decimal
 import fractions
 import warnings
 from libcpp cimport bool
+from libcpp.vector cimport vector
 
 class Decimal(decimal.Decimal):
     pass
@@ -43,11 +45,14 @@ __version__ = VERSION
 cdef extern from "string":
     cdef cppclass cxx_string "string":
         char *c_str()
+        int size()
         cxx_string assign(char *)
 
 cdef extern from "gambit/rational.h":
     cdef cppclass c_Rational "Rational":
-        pass
+        c_Rational()
+        c_Rational(long)
+        c_Rational(long, long)
     cxx_string rat_str "lexical_cast<std::string>"(c_Rational)
     c_Rational str_rat "lexical_cast<Rational>"(cxx_string)
 
@@ -174,6 +179,8 @@ cdef extern from "gambit/game.h":
      
         c_Number GetPayoffNumber "GetPayoff<Number>"(int) except +IndexError
         void SetPayoff(int, cxx_string) except +IndexError
+        void SetPayoffRational "SetPayoff"(int, c_Rational) except +IndexError
+        void SetPayoffDouble "SetPayoff"(int, double) except +IndexError
 
     cdef cppclass c_GameNodeRep "GameNodeRep":
         c_Game GetGame()
@@ -366,14 +373,26 @@ cdef extern from "gambit/stratspt.h":
 
 cdef extern from "util.h":
     c_Game ReadGame(char *) except +IOError
-    c_Game ParseGame(char *) except +IOError
+    c_Game ParseGame(char *, int) except +IOError
     cxx_string WriteGame(c_Game, cxx_string) except +IOError
     cxx_string WriteGame(c_StrategySupportProfile) except +IOError
+    cxx_string fingerprint_game "fingerprint"(c_Game, bool) except +
+    cxx_string fingerprint_support "fingerprint"(c_StrategySupportProfile,
+                                                 bool) except +
 
     c_Rational to_rational(char *)
     
     void setitem_array_int "setitem"(Array[int] *, int, int)
 
+    void setpayoffs_double "setpayoffs"(c_Game, int, double *) except +IndexError
+    void setpayoffs_rational "setpayoffs"(c_Game, int, long *, long *) except +IndexError
+    void getpayoffs_double "getpayoffs"(c_Game, int, double *) except +IndexError
+    Array[c_Rational] getpayoffs_rational "getpayoffs"(c_Game, int) except +IndexError
+    double *getprobs_mspd "getprobs"(c_MixedStrategyProfileDouble *)
+    void getstrategyvalues_mspd "getstrategyvalues"(c_MixedStrategyProfileDouble, double *)
+    void strategyvalues_table "strategyvalues"(int, int *, double *, long,
+                                               double *, double *) nogil
+
     void setitem_mspd_int "setitem"(c_MixedStrategyProfileDouble *, int, double)
     void setitem_mspd_strategy "setitem"(c_MixedStrategyProfileDouble *,
                                          c_GameStrategy, double)
@@ -393,9 +412,52 @@ cdef extern from "util.h":
     c_MixedBehaviorProfileDouble *copyitem_list_mbpd "copyitem"(c_List[c_MixedBehaviorProfileDouble], int)
     c_MixedBehaviorProfileRational *copyitem_list_mbpr "copyitem"(c_List[c_MixedBehaviorProfileRational], int)
 
+cdef extern from "enumsupport.h":
+    cdef cppclass c_SupportEnumerator "SupportEnumerator":
+        c_SupportEnumerator(c_StrategySupportProfile) except +
+        void SetUndecided(c_GameStrategy, bool)
+        bool Next() nogil except +
+        c_StrategySupportProfile *GetSupport()
+        vector[int] GetPath()
+        int NumPending()
+        bool Steal(vector[int] &, vector[int] &, vector[int] &)
+        void Seed(vector[int], vector[int], vector[int])
+
 import gambit.gameiter
 
 
+# Integers are passed to the C++ library as C longs only within 32 bits,
+# as its conversions of wider values are not reliable
+_INT32_MIN = -2**31
+_INT32_MAX = 2**31 - 1
+
+cdef c_Rational _to_rational(value) except *:
+    # Convert an int or Fraction to a C++ Rational.  Where the numerator
+    # and denominator fit in 32 bits, the Rational is built from them
+    # directly; otherwise, it is parsed from the text of the value.
+    cdef char *s
+    if isinstance(value, fractions.Fraction):
+        num, den = value.numerator, value.denominator
+    else:
+        num, den = value, 1
+    if _INT32_MIN <= num <= _INT32_MAX and den <= _INT32_MAX:
+        return c_Rational(<long>num, <long>den)
+    t = str(value)
+    s = t
+    return to_rational(s)
+
+
+# Incremented whenever the payoffs of any game may have changed, so
+# that payoff tensors cached by Game.payoff_tensor() are not reused.
+# Several Game objects may refer to the same game, so the count is kept
+# for all games together.
+cdef unsigned long _payoff_version = 0
+
+cdef _payoffs_changed():
+    global _payoff_version
+    _payoff_version += 1
+
+
 cdef class Collection(object):
     "Represents a collection of related objects in a game."
     def __repr__(self):   return str(list(self))
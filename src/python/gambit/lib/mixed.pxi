@@ -176,12 +176,54 @@ cdef class MixedStrategyProfile(object):
 
 cdef class MixedStrategyProfileDouble(MixedStrategyProfile):
     cdef c_MixedStrategyProfileDouble *profile
+    cdef Py_ssize_t buffer_shape[1]
+    cdef Py_ssize_t buffer_strides[1]
 
     def __dealloc__(self):
         del self.profile
     def __len__(self):
         return self.profile.MixedProfileLength()
 
+    def __getbuffer__(self, Py_buffer *buffer, int flags):
+        # Exposes the probabilities in the profile, without copying.
+        self.buffer_shape[0] = self.profile.MixedProfileLength()
+        self.buffer_strides[0] = sizeof(double)
+        buffer.buf = <char *> getprobs_mspd(self.profile)
+        buffer.format = 'd'
+        buffer.internal = NULL
+        buffer.itemsize = sizeof(double)
+        buffer.len = self.buffer_shape[0] * sizeof(double)
+        buffer.ndim = 1
+        buffer.obj = self
+        buffer.readonly = 0
+        buffer.shape = self.buffer_shape
+        buffer.strides = self.buffer_strides
+        buffer.suboffsets = NULL
+    def __releasebuffer__(self, Py_buffer *buffer):
+        pass
+
+    def as_array(self):
+        """Returns a copy of the probabilities in the profile as an array."""
+        import numpy
+        return numpy.array(self, dtype=numpy.double)
+    def strategy_values_array(self):
+        """Returns the values of all strategies in the profile as an array,
+        in the same order as the probabilities in the profile."""
+        import numpy
+        cdef double[::1] buf
+        values = numpy.empty(len(self), dtype=numpy.double)
+        buf = values
+        getstrategyvalues_mspd(deref(self.profile), &buf[0])
+        return values
+    def _load_point(self, point):
+        cdef double[::1] src
+        cdef double[::1] dest = self
+        import numpy
+        src = numpy.ascontiguousarray(point, dtype=numpy.double)
+        if src.shape[0] != dest.shape[0]:
+            raise ValueError("must specify exactly one value per strategy")
+        dest[:] = src
+
     def _strategy_index(self, Strategy st):
         return self.profile.GetSupport().GetIndex(st.strategy)
     def _getprob(self, int index):
@@ -247,6 +289,25 @@ cdef class MixedStrategyProfileRational(MixedStrategyProfile):
     def __len__(self):
         return self.profile.MixedProfileLength()
 
+    def as_array(self):
+        """Returns a copy of the probabilities in the profile as an array
+        of Rationals."""
+        import numpy
+        return numpy.array([ self._getprob(i+1) for i in xrange(len(self)) ],
+                           dtype=object)
+    def strategy_values_array(self):
+        """Returns the values of all strategies in the profile as an array
+        of Rationals, in the same order as the probabilities in the profile."""
+        import numpy
+        return numpy.array([ v for player in self.game.players
+                             for v in self.strategy_values(player) ],
+                           dtype=object)
+    def _load_point(self, point):
+        if len(point) != len(self):
+            raise ValueError("must specify exactly one value per strategy")
+        for (i, v) in enumerate(point):
+            self._setprob(i+1, v)
+
     def _strategy_index(self, Strategy st):
         return self.profile.GetSupport().GetIndex(st.strategy)
     def _getprob(self, int index):
@@ -254,21 +315,15 @@ cdef class MixedStrategyProfileRational(MixedStrategyProfile):
     def _getprob_strategy(self, Strategy strategy):
         return Rational(rat_str(self.profile.getitem_strategy(strategy.strategy)).c_str())
     def _setprob(self, int index, value):
-        cdef char *s
         if not isinstance(value, (int, fractions.Fraction)):
             raise TypeError("rational precision profile requires int or Fraction probability, not %s" %
                             value.__class__.__name__)
-        t = str(value)
-        s = t
-        setitem_mspr_int(self.profile, index, to_rational(s))
+        setitem_mspr_int(self.profile, index, _to_rational(value))
     def _setprob_strategy(self, Strategy strategy, value):
-        cdef char *s
         if not isinstance(value, (int, fractions.Fraction)):
             raise TypeError("rational precision profile requires int or Fraction probability, not %s" %
                             value.__class__.__name__)
-        t = str(value)
-        s = t
-        setitem_mspr_strategy(self.profile, strategy.strategy, to_rational(s))
+        setitem_mspr_strategy(self.profile, strategy.strategy, _to_rational(value))
     def _payoff(self, Player player):
         return Rational(rat_str(self.profile.GetPayoff(player.player)).c_str())
     def _strategy_value(self, Strategy strategy):
@@ -20,26 +20,168 @@
 # Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
 #
 
+cdef extern from "util.h":
+    cdef cppclass c_StrategyProfileRendererDouble "StrategyProfileRenderer<double>":
+        pass
+    cdef cppclass c_StrategyProfileRendererRational "StrategyProfileRenderer<Rational>":
+        pass
+    c_StrategyProfileRendererDouble *new_callback_renderer_double "new_callback_renderer<double>"(void *, int (*)(void *, c_MixedStrategyProfileDouble *), int (*)(void *, c_MixedBehaviorProfileDouble *))
+    c_StrategyProfileRendererRational *new_callback_renderer_rational "new_callback_renderer<Rational>"(void *, int (*)(void *, c_MixedStrategyProfileRational *), int (*)(void *, c_MixedBehaviorProfileRational *))
+
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+import sys
+import threading
+
+# Each equilibrium found by a native solver is passed, as it is found,
+# to one of these callbacks, which copies it into a Python profile object
+# and hands it to the solver's sink, if any.  Returning nonzero stops
+# the solver.
+cdef int _render_mspd(void *solver, c_MixedStrategyProfileDouble *profile) with gil:
+    cdef MixedStrategyProfileDouble p
+    if (<_StreamingSolver> solver).sink is None:
+        return 0
+    p = MixedStrategyProfileDouble()
+    p.profile = new c_MixedStrategyProfileDouble(deref(profile))
+    return (<_StreamingSolver> solver).emit(p)
+
+cdef int _render_mspr(void *solver, c_MixedStrategyProfileRational *profile) with gil:
+    cdef MixedStrategyProfileRational p
+    if (<_StreamingSolver> solver).sink is None:
+        return 0
+    p = MixedStrategyProfileRational()
+    p.profile = new c_MixedStrategyProfileRational(deref(profile))
+    return (<_StreamingSolver> solver).emit(p)
+
+cdef int _render_mbpd(void *solver, c_MixedBehaviorProfileDouble *profile) with gil:
+    cdef MixedBehaviorProfileDouble p
+    if (<_StreamingSolver> solver).sink is None:
+        return 0
+    p = MixedBehaviorProfileDouble()
+    p.profile = new c_MixedBehaviorProfileDouble(deref(profile))
+    return (<_StreamingSolver> solver).emit(p)
+
+cdef int _render_mbpr(void *solver, c_MixedBehaviorProfileRational *profile) with gil:
+    cdef MixedBehaviorProfileRational p
+    if (<_StreamingSolver> solver).sink is None:
+        return 0
+    p = MixedBehaviorProfileRational()
+    p.profile = new c_MixedBehaviorProfileRational(deref(profile))
+    return (<_StreamingSolver> solver).emit(p)
+
+cdef c_StrategyProfileRendererDouble *_renderer_double(object solver):
+    return new_callback_renderer_double(<void *> solver,
+                                        _render_mspd, _render_mbpd)
+
+cdef c_StrategyProfileRendererRational *_renderer_rational(object solver):
+    return new_callback_renderer_rational(<void *> solver,
+                                          _render_mspr, _render_mbpr)
+
+_STREAM_DONE = object()
+
+cdef class _StreamingSolver(object):
+    """
+    Base class for the native solvers, providing solve_iter(), which
+    yields each equilibrium as soon as the solver finds it.
+    """
+    cdef object sink
+    cdef object error
+
+    cdef int emit(self, profile):
+        try:
+            return 1 if self.sink(profile) else 0
+        except BaseException:
+            self.error = sys.exc_info()
+            return 1
+
+    def solve_iter(self, Game game, int buffer=16):
+        """
+        Solve 'game', yielding each equilibrium as soon as the solver
+        finds it.  The solver runs in a separate thread, and stops once
+        'buffer' equilibria are waiting to be consumed, until the caller
+        takes another.  Closing the generator before it is exhausted,
+        for example by breaking out of a loop over it, stops the solver.
+        As the solver works on the game itself, the equilibria yielded
+        may be examined while it runs, but the game should not otherwise
+        be used until the generator is exhausted or closed.
+        """
+        if self.sink is not None:
+            raise RuntimeError("solver is already in use by solve_iter()")
+        results = queue.Queue(buffer)
+        stopped = threading.Event()
+
+        def put(item):
+            # Returns True if the item was queued, or False if the
+            # consumer has gone away in the meantime.
+            while not stopped.is_set():
+                try:
+                    results.put(item, True, 0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def run():
+            try:
+                self.solve(game)
+            except BaseException:
+                if self.error is None:
+                    self.error = sys.exc_info()
+            if self.error is not None and not stopped.is_set():
+                put((False, self.error))
+            else:
+                put((True, _STREAM_DONE))
+
+        self.error = None
+        self.sink = lambda profile: not put((True, profile))
+        thread = threading.Thread(target=run)
+        thread.daemon = True
+        thread.start()
+        # Releasing a profile changes the reference count of its game,
+        # which the solver thread may be changing at the same moment, so
+        # the profiles yielded are kept until the thread has finished.
+        yielded = [ ]
+        try:
+            while True:
+                ok, item = results.get()
+                if not ok:
+                    raise item[0], item[1], item[2]
+                if item is _STREAM_DONE:
+                    break
+                yielded.append(item)
+                yield item
+        finally:
+            stopped.set()
+            thread.join()
+            self.sink = None
+            self.error = None
+
+
 cdef extern from "gambit/nash/enumpure.h":
     cdef cppclass c_NashEnumPureStrategySolver "EnumPureStrategySolver":
-        c_NashEnumPureStrategySolver()
-        c_List[c_MixedStrategyProfileRational] Solve(c_Game) except +RuntimeError
+        c_NashEnumPureStrategySolver(c_StrategyProfileRendererRational *)
+        c_List[c_MixedStrategyProfileRational] Solve(c_Game) nogil except +RuntimeError
 
     cdef cppclass c_NashEnumPureAgentSolver "EnumPureAgentSolver":
-        c_NashEnumPureAgentSolver()
-        c_List[c_MixedBehaviorProfileRational] Solve(c_Game) except +RuntimeError
+        c_NashEnumPureAgentSolver(c_StrategyProfileRendererRational *)
+        c_List[c_MixedBehaviorProfileRational] Solve(c_Game) nogil except +RuntimeError
 
-cdef class EnumPureStrategySolver(object):
+cdef class EnumPureStrategySolver(_StreamingSolver):
     cdef c_NashEnumPureStrategySolver *alg
 
     def __cinit__(self):
-        self.alg = new c_NashEnumPureStrategySolver()
+        self.alg = new c_NashEnumPureStrategySolver(_renderer_rational(self))
     def __dealloc__(self):
         del self.alg
     def solve(self, Game game):
         cdef c_List[c_MixedStrategyProfileRational] solns
         cdef MixedStrategyProfileRational p
-        solns = self.alg.Solve(game.game)
+        with nogil:
+            solns = self.alg.Solve(game.game)
+        if self.sink is not None:
+            return [ ]
         ret = [ ]
         for i in xrange(solns.Length()):
             p = MixedStrategyProfileRational()
@@ -47,17 +189,20 @@ cdef class EnumPureStrategySolver(object):
             ret.append(p)
         return ret
 
-cdef class EnumPureAgentSolver(object):
+cdef class EnumPureAgentSolver(_StreamingSolver):
     cdef c_NashEnumPureAgentSolver *alg
 
     def __cinit__(self, p_stopAfter=0, p_maxDepth=0):
-        self.alg = new c_NashEnumPureAgentSolver()
+        self.alg = new c_NashEnumPureAgentSolver(_renderer_rational(self))
     def __dealloc__(self):
         del self.alg
     def solve(self, Game game):
         cdef c_List[c_MixedBehaviorProfileRational] solns
         cdef MixedBehaviorProfileRational p
-        solns = self.alg.Solve(game.game)
+        with nogil:
+            solns = self.alg.Solve(game.game)
+        if self.sink is not None:
+            return [ ]
         ret = [ ]
         for i in xrange(solns.Length()):
             p = MixedBehaviorProfileRational()
@@ -67,28 +212,33 @@ cdef class EnumPureAgentSolver(object):
 
 cdef extern from "gambit/nash/enummixed.h":
     cdef cppclass c_NashEnumMixedStrategySolverDouble "EnumMixedStrategySolver<double>":
-        c_NashEnumMixedStrategySolverDouble()
-        c_List[c_MixedStrategyProfileDouble] Solve(c_Game) except +RuntimeError
+        c_NashEnumMixedStrategySolverDouble(c_StrategyProfileRendererDouble *)
+        c_List[c_MixedStrategyProfileDouble] Solve(c_Game) nogil except +RuntimeError
 
     cdef cppclass c_NashEnumMixedStrategySolverRational "EnumMixedStrategySolver<Rational>":
-        c_NashEnumMixedStrategySolverRational()
-        c_List[c_MixedStrategyProfileRational] Solve(c_Game) except +RuntimeError
+        c_NashEnumMixedStrategySolverRational(c_StrategyProfileRendererRational *)
+        c_List[c_MixedStrategyProfileRational] Solve(c_Game) nogil except +RuntimeError
 
+    # lrslib keeps its state in globals, so this solver cannot be run
+    # concurrently with itself, and keeps the GIL while solving.
     cdef cppclass c_NashEnumMixedLrsStrategySolver "EnumMixedLrsStrategySolver":
-        c_NashEnumMixedLrsStrategySolver()
+        c_NashEnumMixedLrsStrategySolver(c_StrategyProfileRendererRational *)
         c_List[c_MixedStrategyProfileRational] Solve(c_Game) except +RuntimeError
 
-cdef class EnumMixedStrategySolverDouble(object):
+cdef class EnumMixedStrategySolverDouble(_StreamingSolver):
     cdef c_NashEnumMixedStrategySolverDouble *alg
 
     def __cinit__(self):
-        self.alg = new c_NashEnumMixedStrategySolverDouble()
+        self.alg = new c_NashEnumMixedStrategySolverDouble(_renderer_double(self))
     def __dealloc__(self):
         del self.alg
     def solve(self, Game game):
         cdef c_List[c_MixedStrategyProfileDouble] solns
         cdef MixedStrategyProfileDouble p
-        solns = self.alg.Solve(game.game)
+        with nogil:
+            solns = self.alg.Solve(game.game)
+        if self.sink is not None:
+            return [ ]
         ret = [ ]
         for i in xrange(solns.Length()):
             p = MixedStrategyProfileDouble()
@@ -96,17 +246,20 @@ cdef class EnumMixedStrategySolverDouble(object):
             ret.append(p)
         return ret
 
-cdef class EnumMixedStrategySolverRational(object):
+cdef class EnumMixedStrategySolverRational(_StreamingSolver):
     cdef c_NashEnumMixedStrategySolverRational *alg
 
     def __cinit__(self):
-        self.alg = new c_NashEnumMixedStrategySolverRational()
+        self.alg = new c_NashEnumMixedStrategySolverRational(_renderer_rational(self))
     def __dealloc__(self):
         del self.alg
     def solve(self, Game game):
         cdef c_List[c_MixedStrategyProfileRational] solns
         cdef MixedStrategyProfileRational p
-        solns = self.alg.Solve(game.game)
+        with nogil:
+            solns = self.alg.Solve(game.game)
+        if self.sink is not None:
+            return [ ]
         ret = [ ]
         for i in xrange(solns.Length()):
             p = MixedStrategyProfileRational()
@@ -114,17 +267,19 @@ cdef class EnumMixedStrategySolverRational(object):
             ret.append(p)
         return ret
 
-cdef class EnumMixedLrsStrategySolver(object):
+cdef class EnumMixedLrsStrategySolver(_StreamingSolver):
     cdef c_NashEnumMixedLrsStrategySolver *alg
 
     def __cinit__(self):
-        self.alg = new c_NashEnumMixedLrsStrategySolver()
+        self.alg = new c_NashEnumMixedLrsStrategySolver(_renderer_rational(self))
     def __dealloc__(self):
         del self.alg
     def solve(self, Game game):
         cdef c_List[c_MixedStrategyProfileRational] solns
         cdef MixedStrategyProfileRational p
         solns = self.alg.Solve(game.game)
+        if self.sink is not None:
+            return [ ]
         ret = [ ]
         for i in xrange(solns.Length()):
             p = MixedStrategyProfileRational()
@@ -134,34 +289,37 @@ cdef class EnumMixedLrsStrategySolver(object):
 
 cdef extern from "tools/lcp/nfglcp.h":
     cdef cppclass c_NashLcpStrategySolverDouble "NashLcpStrategySolver<double>":
-        c_NashLcpStrategySolverDouble(int, int)
-        c_List[c_MixedStrategyProfileDouble] Solve(c_Game) except +RuntimeError
+        c_NashLcpStrategySolverDouble(int, int, c_StrategyProfileRendererDouble *)
+        c_List[c_MixedStrategyProfileDouble] Solve(c_Game) nogil except +RuntimeError
 
     cdef cppclass c_NashLcpStrategySolverRational "NashLcpStrategySolver<Rational>":
-        c_NashLcpStrategySolverRational(int, int)
-        c_List[c_MixedStrategyProfileRational] Solve(c_Game) except +RuntimeError
+        c_NashLcpStrategySolverRational(int, int, c_StrategyProfileRendererRational *)
+        c_List[c_MixedStrategyProfileRational] Solve(c_Game) nogil except +RuntimeError
 
 cdef extern from "tools/lcp/efglcp.h":
     cdef cppclass c_NashLcpBehaviorSolverDouble "NashLcpBehaviorSolver<double>":
-        c_NashLcpBehaviorSolverDouble(int, int)
-        c_List[c_MixedBehaviorProfileDouble] Solve(c_Game) except +RuntimeError
+        c_NashLcpBehaviorSolverDouble(int, int, c_StrategyProfileRendererDouble *)
+        c_List[c_MixedBehaviorProfileDouble] Solve(c_Game) nogil except +RuntimeError
 
     cdef cppclass c_NashLcpBehaviorSolverRational "NashLcpBehaviorSolver<Rational>":
-        c_NashLcpBehaviorSolverRational(int, int)
-        c_List[c_MixedBehaviorProfileRational] Solve(c_Game) except +RuntimeError
+        c_NashLcpBehaviorSolverRational(int, int, c_StrategyProfileRendererRational *)
+        c_List[c_MixedBehaviorProfileRational] Solve(c_Game) nogil except +RuntimeError
 
 
-cdef class LCPBehaviorSolverDouble(object):
+cdef class LCPBehaviorSolverDouble(_StreamingSolver):
     cdef c_NashLcpBehaviorSolverDouble *alg
 
     def __cinit__(self, p_stopAfter=0, p_maxDepth=0):
-        self.alg = new c_NashLcpBehaviorSolverDouble(p_stopAfter, p_maxDepth)
+        self.alg = new c_NashLcpBehaviorSolverDouble(p_stopAfter, p_maxDepth, _renderer_double(self))
     def __dealloc__(self):
         del self.alg
     def solve(self, Game game):
         cdef c_List[c_MixedBehaviorProfileDouble] solns
         cdef MixedBehaviorProfileDouble p
-        solns = self.alg.Solve(game.game)
+        with nogil:
+            solns = self.alg.Solve(game.game)
+        if self.sink is not None:
+            return [ ]
         ret = [ ]
         for i in xrange(solns.Length()):
             p = MixedBehaviorProfileDouble()
@@ -169,17 +327,20 @@ cdef class LCPBehaviorSolverDouble(object):
             ret.append(p)
         return ret
 
-cdef class LCPBehaviorSolverRational(object):
+cdef class LCPBehaviorSolverRational(_StreamingSolver):
     cdef c_NashLcpBehaviorSolverRational *alg
 
     def __cinit__(self, p_stopAfter=0, p_maxDepth=0):
-        self.alg = new c_NashLcpBehaviorSolverRational(p_stopAfter, p_maxDepth)
+        self.alg = new c_NashLcpBehaviorSolverRational(p_stopAfter, p_maxDepth, _renderer_rational(self))
     def __dealloc__(self):
         del self.alg
     def solve(self, Game game):
         cdef c_List[c_MixedBehaviorProfileRational] solns
         cdef MixedBehaviorProfileRational p
-        solns = self.alg.Solve(game.game)
+        with nogil:
+            solns = self.alg.Solve(game.game)
+        if self.sink is not None:
+            return [ ]
         ret = [ ]
         for i in xrange(solns.Length()):
             p = MixedBehaviorProfileRational()
@@ -187,17 +348,20 @@ cdef class LCPBehaviorSolverRational(object):
             ret.append(p)
         return ret
 
-cdef class LCPStrategySolverDouble(object): 
+cdef class LCPStrategySolverDouble(_StreamingSolver):
     cdef c_NashLcpStrategySolverDouble *alg
 
     def __cinit__(self, p_stopAfter=0, p_maxDepth=0):
-        self.alg = new c_NashLcpStrategySolverDouble(p_stopAfter, p_maxDepth)
+        self.alg = new c_NashLcpStrategySolverDouble(p_stopAfter, p_maxDepth, _renderer_double(self))
     def __dealloc__(self):
         del self.alg
     def solve(self, Game game):
         cdef c_List[c_MixedStrategyProfileDouble] solns
         cdef MixedStrategyProfileDouble p
-        solns = self.alg.Solve(game.game)
+        with nogil:
+            solns = self.alg.Solve(game.game)
+        if self.sink is not None:
+            return [ ]
         ret = [ ]
         for i in xrange(solns.Length()):
             p = MixedStrategyProfileDouble()
@@ -205,17 +369,20 @@ cdef class LCPStrategySolverDouble(object):
             ret.append(p)
         return ret
 
-cdef class LCPStrategySolverRational(object):
+cdef class LCPStrategySolverRational(_StreamingSolver):
     cdef c_NashLcpStrategySolverRational *alg
 
     def __cinit__(self, p_stopAfter=0, p_maxDepth=0):
-        self.alg = new c_NashLcpStrategySolverRational(p_stopAfter, p_maxDepth)
+        self.alg = new c_NashLcpStrategySolverRational(p_stopAfter, p_maxDepth, _renderer_rational(self))
     def __dealloc__(self):
         del self.alg
     def solve(self, Game game):
         cdef c_List[c_MixedStrategyProfileRational] solns
         cdef MixedStrategyProfileRational p
-        solns = self.alg.Solve(game.game)
+        with nogil:
+            solns = self.alg.Solve(game.game)
+        if self.sink is not None:
+            return [ ]
         ret = [ ]
         for i in xrange(solns.Length()):
             p = MixedStrategyProfileRational()
@@ -226,34 +393,37 @@ cdef class LCPStrategySolverRational(object):
 
 cdef extern from "tools/lp/nfglp.h":
     cdef cppclass c_NashLpStrategySolverDouble "NashLpStrategySolver<double>":
-        c_NashLpStrategySolverDouble()
-        c_List[c_MixedStrategyProfileDouble] Solve(c_Game) except +RuntimeError
+        c_NashLpStrategySolverDouble(c_StrategyProfileRendererDouble *)
+        c_List[c_MixedStrategyProfileDouble] Solve(c_Game) nogil except +RuntimeError
 
     cdef cppclass c_NashLpStrategySolverRational "NashLpStrategySolver<Rational>":
-        c_NashLpStrategySolverRational()
-        c_List[c_MixedStrategyProfileRational] Solve(c_Game) except +RuntimeError
+        c_NashLpStrategySolverRational(c_StrategyProfileRendererRational *)
+        c_List[c_MixedStrategyProfileRational] Solve(c_Game) nogil except +RuntimeError
 
 cdef extern from "tools/lp/efglp.h":
     cdef cppclass c_NashLpBehavSolverDouble "NashLpBehavSolver<double>":
-        c_NashLpBehavSolverDouble()
-        c_List[c_MixedBehaviorProfileDouble] Solve(c_Game) except +RuntimeError
+        c_NashLpBehavSolverDouble(c_StrategyProfileRendererDouble *)
+        c_List[c_MixedBehaviorProfileDouble] Solve(c_Game) nogil except +RuntimeError
 
     cdef cppclass c_NashLpBehavSolverRational "NashLpBehavSolver<Rational>":
-        c_NashLpBehavSolverRational()
-        c_List[c_MixedBehaviorProfileRational] Solve(c_Game) except +RuntimeError
+        c_NashLpBehavSolverRational(c_StrategyProfileRendererRational *)
+        c_List[c_MixedBehaviorProfileRational] Solve(c_Game) nogil except +RuntimeError
 
 
-cdef class LPBehaviorSolverDouble(object):
+cdef class LPBehaviorSolverDouble(_StreamingSolver):
     cdef c_NashLpBehavSolverDouble *alg
 
     def __cinit__(self):
-        self.alg = new c_NashLpBehavSolverDouble()
+        self.alg = new c_NashLpBehavSolverDouble(_renderer_double(self))
     def __dealloc__(self):
         del self.alg
     def solve(self, Game game):
         cdef c_List[c_MixedBehaviorProfileDouble] solns
         cdef MixedBehaviorProfileDouble p
-        solns = self.alg.Solve(game.game)
+        with nogil:
+            solns = self.alg.Solve(game.game)
+        if self.sink is not None:
+            return [ ]
         ret = [ ]
         for i in xrange(solns.Length()):
             p = MixedBehaviorProfileDouble()
@@ -261,17 +431,20 @@ cdef class LPBehaviorSolverDouble(object):
             ret.append(p)
         return ret
 
-cdef class LPBehaviorSolverRational(object):
+cdef class LPBehaviorSolverRational(_StreamingSolver):
     cdef c_NashLpBehavSolverRational *alg
 
     def __cinit__(self):
-        self.alg = new c_NashLpBehavSolverRational()
+        self.alg = new c_NashLpBehavSolverRational(_renderer_rational(self))
     def __dealloc__(self):
         del self.alg
     def solve(self, Game game):
         cdef c_List[c_MixedBehaviorProfileRational] solns
         cdef MixedBehaviorProfileRational p
-        solns = self.alg.Solve(game.game)
+        with nogil:
+            solns = self.alg.Solve(game.game)
+        if self.sink is not None:
+            return [ ]
         ret = [ ]
         for i in xrange(solns.Length()):
             p = MixedBehaviorProfileRational()
@@ -279,17 +452,20 @@ cdef class LPBehaviorSolverRational(object):
             ret.append(p)
         return ret
 
-cdef class LPStrategySolverDouble(object): 
+cdef class LPStrategySolverDouble(_StreamingSolver):
     cdef c_NashLpStrategySolverDouble *alg
 
     def __cinit__(self):
-        self.alg = new c_NashLpStrategySolverDouble()
+        self.alg = new c_NashLpStrategySolverDouble(_renderer_double(self))
     def __dealloc__(self):
         del self.alg
     def solve(self, Game game):
         cdef c_List[c_MixedStrategyProfileDouble] solns
         cdef MixedStrategyProfileDouble p
-        solns = self.alg.Solve(game.game)
+        with nogil:
+            solns = self.alg.Solve(game.game)
+        if self.sink is not None:
+            return [ ]
         ret = [ ]
         for i in xrange(solns.Length()):
             p = MixedStrategyProfileDouble()
@@ -297,17 +473,20 @@ cdef class LPStrategySolverDouble(object):
             ret.append(p)
         return ret
 
-cdef class LPStrategySolverRational(object):
+cdef class LPStrategySolverRational(_StreamingSolver):
     cdef c_NashLpStrategySolverRational *alg
 
     def __cinit__(self):
-        self.alg = new c_NashLpStrategySolverRational()
+        self.alg = new c_NashLpStrategySolverRational(_renderer_rational(self))
     def __dealloc__(self):
         del self.alg
     def solve(self, Game game):
         cdef c_List[c_MixedStrategyProfileRational] solns
         cdef MixedStrategyProfileRational p
-        solns = self.alg.Solve(game.game)
+        with nogil:
+            solns = self.alg.Solve(game.game)
+        if self.sink is not None:
+            return [ ]
         ret = [ ]
         for i in xrange(solns.Length()):
             p = MixedStrategyProfileRational()
@@ -336,9 +515,9 @@ cdef extern from "util.h":
     c_LogitQREMixedStrategyProfile *copyitem_list_qrem "copyitem"(c_List[c_LogitQREMixedStrategyProfile], int)        
 
 cdef extern from "nash.h":
-    c_LogitQREMixedStrategyProfile *_logit_estimate "logit_estimate"(c_MixedStrategyProfileDouble *)
-    c_LogitQREMixedStrategyProfile *_logit_atlambda "logit_atlambda"(c_Game, double)
-    c_List[c_LogitQREMixedStrategyProfile] _logit_principal_branch "logit_principal_branch"(c_Game, double)
+    c_LogitQREMixedStrategyProfile *_logit_estimate "logit_estimate"(c_MixedStrategyProfileDouble *) nogil
+    c_LogitQREMixedStrategyProfile *_logit_atlambda "logit_atlambda"(c_Game, double) nogil
+    c_List[c_LogitQREMixedStrategyProfile] _logit_principal_branch "logit_principal_branch"(c_Game, double) nogil
     
 cdef class LogitQREMixedStrategyProfile(object):
     cdef c_LogitQREMixedStrategyProfile *thisptr
@@ -379,7 +558,8 @@ def logit_estimate(MixedStrategyProfileDouble p_profile):
     """
     cdef LogitQREMixedStrategyProfile ret
     ret = LogitQREMixedStrategyProfile()
-    ret.thisptr = _logit_estimate(p_profile.profile)
+    with nogil:
+        ret.thisptr = _logit_estimate(p_profile.profile)
     return ret
 
 def logit_atlambda(Game p_game, double p_lambda):
@@ -388,13 +568,15 @@ def logit_atlambda(Game p_game, double p_lambda):
     """
     cdef LogitQREMixedStrategyProfile ret
     ret = LogitQREMixedStrategyProfile()
-    ret.thisptr = _logit_atlambda(p_game.game, p_lambda)
+    with nogil:
+        ret.thisptr = _logit_atlambda(p_game.game, p_lambda)
     return ret
    
 def logit_principal_branch(Game p_game, double p_maxLambda=100000.0):
     cdef c_List[c_LogitQREMixedStrategyProfile] solns
     cdef LogitQREMixedStrategyProfile p
-    solns = _logit_principal_branch(p_game.game, p_maxLambda)
+    with nogil:
+        solns = _logit_principal_branch(p_game.game, p_maxLambda)
     ret = [ ]
     for i in xrange(solns.Length()):
         p = LogitQREMixedStrategyProfile()
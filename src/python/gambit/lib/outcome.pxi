@@ -19,6 +19,31 @@
 # along with this program; if not, write to the Free Software
 # Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
 #
+cdef _check_payoff(value):
+    # Payoffs must be finite, as infinities and NaNs have no
+    # representation as a Gambit number
+    if ((isinstance(value, float) and
+         (math.isinf(value) or math.isnan(value))) or
+        (isinstance(value, decimal.Decimal) and not value.is_finite())):
+        raise ValueError("payoff must be finite, not %s" % value)
+
+cdef _set_payoff(c_GameOutcome outcome, int pl, value):
+    # Floats and rationals are passed to the C++ library as numbers;
+    # decimals are passed as text so their decimal form is retained.
+    cdef cxx_string s
+    _check_payoff(value)
+    _payoffs_changed()
+    if isinstance(value, float):
+        outcome.deref().SetPayoffDouble(pl, value)
+    elif isinstance(value, (int, long, fractions.Fraction)):
+        outcome.deref().SetPayoffRational(pl, _to_rational(value))
+    elif isinstance(value, decimal.Decimal):
+        v = str(value)
+        s.assign(v)
+        outcome.deref().SetPayoff(pl, s)
+    else:
+        raise TypeError, "numeric argument required for payoff"
+
 cdef class Outcome:
     cdef c_GameOutcome outcome
     cdef StrategicRestriction restriction
@@ -51,6 +76,7 @@ cdef class Outcome:
         if self.restriction is not None:
             raise UndefinedOperationError("Changing objects in a restriction is not supported")
         (<Game>self.game).game.deref().DeleteOutcome(self.outcome)
+        _payoffs_changed()
 
     property game:
         def __get__(self):
@@ -90,14 +116,7 @@ cdef class Outcome:
     def __setitem__(self, pl, value):
         if self.restriction is not None:
             raise UndefinedOperationError("Changing objects in a support is not supported")
-        cdef cxx_string s
-        if isinstance(value, int) or isinstance(value, decimal.Decimal) or \
-           isinstance(value, fractions.Fraction):
-            v = str(value)
-            s.assign(v)
-            self.outcome.deref().SetPayoff(pl+1, s)
-        else:
-            raise TypeError, "numeric argument required for payoff"
+        _set_payoff(self.outcome, pl+1, value)
 
     def unrestrict(self):
         cdef Outcome o
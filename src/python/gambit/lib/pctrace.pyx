@@ -0,0 +1,252 @@
+#
+# This file is part of Gambit
+# Copyright (c) 1994-2016, The Gambit Project (http://www.gambit-project.org)
+#
+# FILE: src/python/gambit/lib/pctrace.pyx
+# Compiled implementation of the predictor-corrector path tracer
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+# cython: boundscheck=False
+"""
+Compiled implementation of the predictor-corrector path tracer in
+gambit.pctrace.  The QR decompositions of the Jacobian are computed
+using LAPACK, and the corrector steps operate on typed memoryviews.
+"""
+
+import numpy
+from libc.math cimport sqrt, fabs
+from scipy.linalg.cython_lapack cimport dgeqrf, dorgqr
+
+
+cdef class QRWorkspace(object):
+    """
+    Storage for the QR decomposition of an (n+1) x n Jacobian.
+    'b' holds the triangular factor R in its upper triangle, and 'q' the
+    full (n+1) x (n+1) orthogonal factor Q; both are in Fortran order,
+    as required by LAPACK.
+    """
+    cdef int n
+    cdef double[::1, :] b
+    cdef double[::1, :] q
+    cdef double[::1] tau
+    cdef double[::1] work
+
+    def __init__(self, int n):
+        self.n = n
+        self.b = numpy.zeros((n+1, n), order='F')
+        self.q = numpy.zeros((n+1, n+1), order='F')
+        self.tau = numpy.zeros(n+1)
+        self.work = numpy.zeros(64*(n+1))
+
+    cdef decompose(self, jac):
+        cdef int m = self.n+1, n = self.n, k = self.n
+        cdef int lwork = self.work.shape[0], info = 0
+        cdef int i, j
+        cdef double[:, :] src = numpy.asarray(jac, dtype=numpy.double)
+        self.b[:, :] = src
+        dgeqrf(&m, &n, &self.b[0,0], &m, &self.tau[0],
+               &self.work[0], &lwork, &info)
+        if info != 0:
+            raise ValueError("QR decomposition failed with code %d" % info)
+        for j in range(n):
+            for i in range(m):
+                self.q[i,j] = self.b[i,j]
+        n = self.n+1
+        dorgqr(&m, &n, &k, &self.q[0,0], &m, &self.tau[0],
+               &self.work[0], &lwork, &info)
+        if info != 0:
+            raise ValueError("QR decomposition failed with code %d" % info)
+
+    cdef tangent(self):
+        # The last column of Q spans the kernel of the Jacobian.
+        return numpy.array(self.q[:, self.n])
+
+    cdef double newton_step(self, double[::1] u, double[::1] y):
+        # Solve R^T z = y by forward substitution, overwriting y with z,
+        # then take the step u -= Q[:, :n] z.  Returns the steplength.
+        cdef int n = self.n
+        cdef int j, k
+        cdef double s, d = 0.0
+        for k in range(n):
+            s = y[k]
+            for j in range(k):
+                s -= self.b[j,k] * y[j]
+            y[k] = s / self.b[k,k]
+        for k in range(n+1):
+            s = 0.0
+            for j in range(n):
+                s += self.q[k,j] * y[j]
+            u[k] -= s
+            d += s*s
+        return sqrt(d)
+
+
+def trace_path(start, double startLam, double maxLam, compute_lhs, compute_jac,
+               double omega=1.0, double hStart=0.03, double maxDecel=1.1,
+               int maxIter=1000, crit=None, callback=None,
+               double maxAccel=2.0, double maxAngle=0.5, dense=None):
+    """
+    Trace a differentiable path starting at the vector 'start' with
+    parameter 'startLam', until 'maxLam' is reached.  lhs() returns the
+    value of the LHS at any point (x, lam), and jac() returns the value
+    of the Jacobian at any point (x, lam).  omega determines the orientation
+    to trace the curve.  Optionally, 'crit' is a function to search for a
+    zero of along the path.
+
+    The steplength is adapted after each step from the distance and
+    rate of contraction of the corrector iteration, and the angle
+    between the tangents at either end of the step, which estimates
+    the curvature of the path.  It grows by at most a factor of
+    'maxAccel' and shrinks by at most 'maxDecel' after a successful
+    step.  A step is retried with half the steplength if the corrector
+    fails within 'maxIter' iterations, or the path turns through more
+    than 'maxAngle' radians.  A corrector which stops contracting is
+    accepted if the residual of the equations is negligible.
+
+    If 'dense' is given, it is called as dense(x0, x1, t0, t1) for
+    each step, with the points at either end of the step and the unit
+    tangents there, oriented in the direction of the step, from which
+    gambit.pctrace.hermite() interpolates the path.
+    """
+    cdef double tol = 1.0e-4      # tolerance for corrector iteration
+    cdef double maxDist = 0.4     # maximal distance to curve
+    cdef double maxContr = 0.6    # maximal contraction rate in corrector
+    cdef double eta = 0.1         # perturbation to avoid cancellation
+                                  # in calculating contraction rate
+    cdef double resTol = 1.0e-8   # residual at which the corrector has
+                                  # converged, even if not contracting
+    cdef double h = hStart        # initial stepsize
+    cdef double hmin = 1.0e-8     # minimal stepsize
+    cdef bint newton = False      # using Newton steplength (for zero-finding)
+    cdef bint accept
+    cdef int it
+    cdef double decel, dist, disto, contr, angle
+    cdef double[::1] uview
+    cdef double[::1] yview
+    cdef QRWorkspace qr
+
+    x = numpy.array([ v for v in start ] + [ startLam ], dtype=numpy.double)
+    if callback is not None:
+        callback(x)
+
+    qr = QRWorkspace(len(start))
+    qr.decompose(compute_jac(x))
+    t = qr.tangent()
+
+    if startLam == 0.0 and omega*t[-1] < 0.0:
+        # Reverse orientation of curve to trace away from boundary
+        omega = -omega
+
+    while x[-1] >= 0.0 and x[-1] < maxLam:
+        accept = True
+
+        if fabs(h) <= hmin:
+            # Stop.
+            return x
+
+        # Predictor step
+        u = x + h*omega*t
+        uview = u
+
+        decel = 1.0 / maxAccel      # initialize deceleration factor
+        qr.decompose(compute_jac(u))
+
+        it = 1
+        disto = 0.0
+        while True:
+            if it == maxIter:
+                # The corrector is not converging; retry with a shorter step
+                accept = False
+                break
+
+            y = numpy.array(compute_lhs(u), dtype=numpy.double)
+            yview = y
+            dist = qr.newton_step(uview, yview)
+
+            if dist >= maxDist:
+                accept = False
+                break
+
+            decel = max(decel, sqrt(dist / maxDist) * maxDecel)
+
+            if it >= 2:
+                contr = dist / (disto + tol * eta)
+                if contr > maxContr:
+                    # When the Jacobian is badly conditioned, for instance
+                    # far along the path, the corrections stall at roundoff
+                    # level; accept the point if it solves the equations
+                    accept = (numpy.max(numpy.abs(compute_lhs(u))) < resTol)
+                    break
+                decel = max(decel, sqrt(contr / maxContr) * maxDecel)
+
+            if dist < tol:
+                # Success; break out of iteration
+                break
+
+            disto = dist
+            it += 1
+
+        if accept:
+            newT = qr.tangent()
+            # The sign of the computed tangent is arbitrary, so the angle
+            # is measured between the lines the tangents span
+            angle = numpy.arccos(min(1.0, fabs(numpy.dot(t, newT))))
+            if angle > maxAngle:
+                accept = False
+            else:
+                decel = max(decel, angle / maxAngle * maxDecel)
+
+        if not accept:
+            h /= 2.0            # PC not accepted; change stepsize and retry
+            if fabs(h) < hmin:
+                # Stop.
+                return x
+            continue    # back out to main loop to try again
+
+        # Determine new stepsize
+        if decel > maxDecel:
+            decel = maxDecel
+
+        if not newton and crit is not None:
+            if crit(x, t) * crit(u, newT) < 0.0:
+                # Enter Newton mode, since a critical point has been bracketed
+                newton = True
+
+        if newton:
+            # Newton-type steplength adaptation, secant method
+            h *= -crit(u, newT) / (crit(u, newT) - crit(x, t))
+        else:
+            # Standard steplength adaptation
+            h = fabs(h / decel)
+
+        if dense is not None:
+            chord = u - x
+            dense(x, u,
+                  t if numpy.dot(t, chord) >= 0.0 else -t,
+                  newT if numpy.dot(newT, chord) >= 0.0 else -newT)
+
+        # PC step was successful; update and iterate
+        x = u
+
+        if callback is not None:
+            callback(x)
+
+        if numpy.dot(t, newT) < 0.0:
+            # Bifurcation detected; keep tracing in the same direction
+            omega = -omega
+        t = newT
+
+    return x
@@ -45,6 +45,7 @@ cdef class Strategies(Collection):
         cdef Strategy s
         s = Strategy()
         s.strategy = self.player.deref().NewStrategy()
+        _payoffs_changed()
         s.label = str(label)
         return s
 
@@ -19,6 +19,7 @@
 # along with this program; if not, write to the Free Software
 # Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
 #
+import hashlib
 import itertools
 from cython.operator cimport dereference as deref
 from gambit.lib.error import UndefinedOperationError
@@ -148,6 +149,69 @@ cdef class StrategySupportProfile(Collection):
             g.game = self.support.GetGame()
             return g
 
+cdef class SupportEnumerator(object):
+    """
+    Iterates over the support profiles contained in 'profile' in which
+    no strategy is strictly dominated, given the supports of the other
+    players, by any strategy of its player.  These are the candidate
+    supports of Nash equilibria.  Each support is generated once.
+
+    If 'undecided' is given, the search only branches on whether to
+    remove the strategies in it; other strategies are removed only
+    if they are dominated.
+
+    The search may be divided: steal() removes part of the search
+    still to be done, and returns it as a node, which can be searched
+    by a SupportEnumerator created with the same arguments and 'node'.
+    """
+    cdef c_SupportEnumerator *alg
+
+    def __cinit__(self, StrategySupportProfile profile not None,
+                  undecided=None, node=None):
+        self.alg = new c_SupportEnumerator(deref(profile.support))
+        if undecided is not None:
+            for strategy in profile.game.strategies:
+                self.alg.SetUndecided((<Strategy>strategy).strategy, False)
+            for strategy in undecided:
+                self.alg.SetUndecided((<Strategy>strategy).strategy, True)
+        if node is not None:
+            self.alg.Seed(node[0], node[1], node[2])
+    def __dealloc__(self):
+        del self.alg
+    def __iter__(self):
+        return self
+    def __next__(self):
+        cdef StrategySupportProfile profile
+        cdef bool found
+        with nogil:
+            found = self.alg.Next()
+        if not found:
+            raise StopIteration
+        profile = StrategySupportProfile.__new__(StrategySupportProfile)
+        profile.support = self.alg.GetSupport()
+        return profile
+
+    def steal(self):
+        """
+        Remove the largest part of the search not yet started, and
+        return it as a node, a tuple of the indices in game.strategies
+        of the strategies in its support, of those which it must keep,
+        and its path.  Returns None if there is no such part.
+        """
+        cdef vector[int] support, fixed, path
+        if not self.alg.Steal(support, fixed, path):
+            return None
+        return (tuple(support), tuple(fixed), tuple(path))
+
+    property path:
+        """
+        The branches taken in the search to find the most recently
+        generated support, 0 for keeping a strategy and 1 for removing
+        it.  Supports are generated in lexicographic order of path.
+        """
+        def __get__(self):
+            return tuple(self.alg.GetPath())
+
 cdef class RestrictionOutcomes(Collection):
     "Represents a collection of outcomes in a restriction."
     cdef StrategicRestriction restriction
@@ -274,6 +338,10 @@ cdef class StrategicRestriction(BaseGame):
         else:
             return WriteGame(deref(self.support)).c_str()
 
+    def fingerprint(self, invariant=False):
+        cdef cxx_string s = fingerprint_support(deref(self.support), invariant)
+        return hashlib.sha256(s.c_str()[:s.size()]).hexdigest()
+
     def undominated(self, strict=False):
         cdef StrategicRestriction new_restriction
         new_restriction = StrategicRestriction()
@@ -341,15 +409,19 @@ cdef class StrategicRestriction(BaseGame):
                 raise TypeError("Must use a tuple of ints, strategy labels, or strategies")
         return self._get_contingency(*tuple(cont))
 
-    def mixed_strategy_profile(self, rational=False):
+    def mixed_strategy_profile(self, rational=False, point=None):
         cdef MixedStrategyProfileDouble mspd
         cdef MixedStrategyProfileRational mspr
         cdef c_Rational dummy_rat
         if not rational:
             mspd = MixedStrategyProfileDouble()
             mspd.profile = new c_MixedStrategyProfileDouble(deref(self.support).NewMixedStrategyProfileDouble())
+            if point is not None:
+                mspd._load_point(point)
             return mspd
         else:
             mspr = MixedStrategyProfileRational()
             mspr.profile = new c_MixedStrategyProfileRational(deref(self.support).NewMixedStrategyProfileRational())
+            if point is not None:
+                mspr._load_point(point)
             return mspr
@@ -29,6 +29,9 @@
 #include <string>
 #include <fstream>
 #include <sstream>
+#include <vector>
+#include <algorithm>
+#include <stdint.h>
 #include "gambit/gambit.h"
 #include "gambit/nash.h"
 
@@ -41,13 +44,15 @@ inline Game NewTable(Array<int> *dim)
 
 Game ReadGame(char *fn) throw (InvalidFileException)
 { 
-  std::ifstream f(fn);
+  std::ifstream f(fn, std::ios::in | std::ios::binary);
   return ReadGame(f);
 }
 
-Game ParseGame(char *s) throw (InvalidFileException)
+// The length is given explicitly, as games in the binary format
+// contain null characters
+Game ParseGame(char *s, int len) throw (InvalidFileException)
 {
-  std::istringstream f(s);
+  std::istringstream f(std::string(s, len));
   return ReadGame(f);
 }
 
@@ -85,3 +90,474 @@ void setitem(C *p_container, const X &p_index, const T &p_value)
 // Convert the (C-style) string p_value to a Rational
 inline Rational to_rational(const char *p_value)
 { return lexical_cast<Rational>(std::string(p_value)); }
+
+// Set the payoffs of player p_pl in a newly-created table game p_game
+// from the array p_values.  The array is indexed by contingency,
+// with the strategy of the first player varying fastest; in a new table,
+// this is the same as the numbering of the outcomes.
+inline void setpayoffs(const Game &p_game, int p_pl, const double *p_values)
+{
+  for (int i = 1; i <= p_game->NumOutcomes(); i++) {
+    p_game->GetOutcome(i)->SetPayoff(p_pl, p_values[i-1]);
+  }
+}
+
+// As above, with payoffs given as rationals by arrays of numerators and
+// denominators.  If p_den is null, all denominators are taken to be one.
+// The numerators and denominators must fit in 32 bits; wider values are
+// set from their text by the caller.
+inline void setpayoffs(const Game &p_game, int p_pl, 
+		       const long *p_num, const long *p_den)
+{
+  for (int i = 1; i <= p_game->NumOutcomes(); i++) {
+    p_game->GetOutcome(i)->SetPayoff(p_pl, 
+				     (p_den) ? Rational(p_num[i-1], p_den[i-1]) :
+				     Rational(p_num[i-1]));
+  }
+}
+
+// Fill p_values with the payoffs to player p_pl at each contingency of
+// p_game, with the strategy of the first player varying fastest.
+inline void getpayoffs(const Game &p_game, int p_pl, double *p_values)
+{
+  StrategySupportProfile support(p_game);
+  long i = 0;
+  for (StrategyProfileIterator iter(support); !iter.AtEnd(); iter++, i++) {
+    if (p_game->IsTree()) {
+      p_values[i] = (double) (*iter)->GetPayoff(p_pl);
+    }
+    else {
+      GameOutcome outcome = (*iter)->GetOutcome();
+      p_values[i] = (outcome) ? outcome->GetPayoff<double>(p_pl) : 0.0;
+    }
+  }
+}
+
+// As above, returning the payoffs as exact rationals
+inline Array<Rational> getpayoffs(const Game &p_game, int p_pl)
+{
+  StrategySupportProfile support(p_game);
+  Array<Rational> values;
+  for (StrategyProfileIterator iter(support); !iter.AtEnd(); iter++) {
+    values.push_back((*iter)->GetPayoff(p_pl));
+  }
+  return values;
+}
+
+// Return a pointer to the (contiguous) storage of the probabilities
+// in the mixed strategy profile p_profile
+inline double *getprobs(MixedStrategyProfile<double> *p_profile)
+{
+  Vector<double> &probs = *p_profile;
+  return &probs[1];
+}
+
+// Fill p_values with the value of each strategy in the support of
+// p_profile, in the order in which the strategies appear in the profile
+inline void getstrategyvalues(const MixedStrategyProfile<double> &p_profile,
+			      double *p_values)
+{
+  const StrategySupportProfile &support = p_profile.GetSupport();
+  long i = 0;
+  for (int pl = 1; pl <= support.GetGame()->NumPlayers(); pl++) {
+    for (int st = 1; st <= support.NumStrategies(pl); st++) {
+      p_values[i++] = p_profile.GetPayoff(support.GetStrategy(pl, st));
+    }
+  }
+}
+
+// Compute the strategy values of each of the p_numProfiles mixed strategy
+// profiles in the p_numProfiles x (total strategies) matrix p_profiles,
+// for a strategic game with p_numPlayers players, where player pl has
+// p_dims[pl] strategies.  p_payoffs holds the payoffs of each player
+// in turn, indexed by contingency with the strategy of the first player
+// varying fastest.  The values are written into p_values, which has
+// the same shape as p_profiles.
+//
+// This uses no Gambit or Python objects, and so may be called with the
+// Python global interpreter lock released.
+inline void strategyvalues(int p_numPlayers, const int *p_dims,
+			   const double *p_payoffs, long p_numProfiles,
+			   const double *p_profiles, double *p_values)
+{
+  std::vector<long> offsets(p_numPlayers);
+  long numStrats = 0, numConts = 1;
+  for (int pl = 0; pl < p_numPlayers; pl++) {
+    offsets[pl] = numStrats;
+    numStrats += p_dims[pl];
+    numConts *= p_dims[pl];
+  }
+
+  std::vector<int> cont(p_numPlayers);
+  std::vector<double> prefix(p_numPlayers + 1), suffix(p_numPlayers + 1);
+  for (long m = 0; m < p_numProfiles; m++) {
+    const double *probs = p_profiles + m * numStrats;
+    double *values = p_values + m * numStrats;
+    std::fill(values, values + numStrats, 0.0);
+    std::fill(cont.begin(), cont.end(), 0);
+    for (long c = 0; c < numConts; c++) {
+      // The value to player pl of each contingency is weighted by the
+      // probability the other players play their strategies in it.
+      prefix[0] = 1.0;
+      suffix[p_numPlayers] = 1.0;
+      for (int pl = 0; pl < p_numPlayers; pl++) {
+	prefix[pl+1] = prefix[pl] * probs[offsets[pl] + cont[pl]];
+      }
+      for (int pl = p_numPlayers - 1; pl >= 0; pl--) {
+	suffix[pl] = suffix[pl+1] * probs[offsets[pl] + cont[pl]];
+      }
+      for (int pl = 0; pl < p_numPlayers; pl++) {
+	values[offsets[pl] + cont[pl]] += 
+	  p_payoffs[pl * numConts + c] * prefix[pl] * suffix[pl+1];
+      }
+      for (int pl = 0; pl < p_numPlayers && ++cont[pl] == p_dims[pl]; pl++) {
+	cont[pl] = 0;
+      }
+    }
+  }
+}
+
+//
+// Canonical fingerprints of games, from which Game.fingerprint()
+// computes a digest.  These depend only on the structure, chance
+// probabilities and payoffs of the game, and not on labels, titles,
+// or the location of the game in memory, so that equal games have
+// equal fingerprints on any platform.
+//
+// An invariant fingerprint does not depend on the numbering of the
+// players, or on the order of the strategies or actions.  It is
+// computed by refining a hash value for each player and strategy
+// (or information set) from the hash values of those it is combined
+// with; isomorphic games always have equal invariant fingerprints.
+//
+class FingerprintWriter {
+public:
+  const std::string &GetData(void) const { return m_data; }
+
+  // Integers are written as eight bytes, least significant first
+  void WriteInt(uint64_t p_value)
+  {
+    for (int i = 0; i < 8; i++, p_value >>= 8) {
+      m_data += (char) (p_value & 0xff);
+    }
+  }
+  void WriteNumber(const Rational &p_value)
+  {
+    std::string s = lexical_cast<std::string>(p_value);
+    WriteInt(s.length());
+    m_data += s;
+  }
+
+private:
+  std::string m_data;
+};
+
+// Mixing function for hash values (the finalizer of splitmix64)
+inline uint64_t fingerprint_mix(uint64_t x)
+{
+  x += 0x9e3779b97f4a7c15ULL;
+  x = (x ^ (x >> 30)) * 0xbf58476d1ce4e5b9ULL;
+  x = (x ^ (x >> 27)) * 0x94d049bb133111ebULL;
+  return x ^ (x >> 31);
+}
+
+inline uint64_t fingerprint_mix(uint64_t x, uint64_t y)
+{ return fingerprint_mix(fingerprint_mix(x) ^ y); }
+
+inline uint64_t fingerprint_mix(uint64_t x, uint64_t y, uint64_t z)
+{ return fingerprint_mix(fingerprint_mix(x, y) ^ z); }
+
+// The hash value of an exact number, via its canonical text form
+inline uint64_t fingerprint_hash(const Rational &p_value)
+{
+  std::string s = lexical_cast<std::string>(p_value);
+  uint64_t h = 0xcbf29ce484222325ULL;   // 64-bit FNV-1a
+  for (size_t i = 0; i < s.length(); i++) {
+    h = (h ^ (unsigned char) s[i]) * 0x100000001b3ULL;
+  }
+  return fingerprint_mix(h);
+}
+
+// Multisets of hash values are hashed by summing the mixed elements,
+// which does not depend on the order in which they are added.
+inline void fingerprint_add(uint64_t &p_set, uint64_t p_value)
+{ p_set += fingerprint_mix(p_value); }
+
+// The number of rounds of refinement of invariant fingerprints
+const int FingerprintRounds = 3;
+
+inline void fingerprint_tree(FingerprintWriter &p_writer, const GameNode &p_node)
+{
+  Game game = p_node->GetGame();
+  GameOutcome outcome = p_node->GetOutcome();
+  p_writer.WriteInt((outcome) ? 1 : 0);
+  if (outcome) {
+    for (int pl = 1; pl <= game->NumPlayers(); pl++) {
+      p_writer.WriteNumber(outcome->GetPayoff<Rational>(pl));
+    }
+  }
+  p_writer.WriteInt(p_node->NumChildren());
+  if (p_node->NumChildren() == 0) {
+    return;
+  }
+  GameInfoset infoset = p_node->GetInfoset();
+  p_writer.WriteInt(infoset->GetPlayer()->GetNumber());
+  p_writer.WriteInt(infoset->GetNumber());
+  if (infoset->IsChanceInfoset()) {
+    for (int act = 1; act <= infoset->NumActions(); act++) {
+      p_writer.WriteNumber(infoset->GetActionProb(act, Rational(0)));
+    }
+  }
+  for (int i = 1; i <= p_node->NumChildren(); i++) {
+    fingerprint_tree(p_writer, p_node->GetChild(i));
+  }
+}
+
+// Compute the invariant hash value of the subtree rooted at p_node,
+// given the current hash values of the players and information sets,
+// and add the value of each decision node to that of its next round
+// for its information set.
+inline uint64_t 
+fingerprint_tree(const GameNode &p_node,
+		 const std::vector<uint64_t> &p_players,
+		 const std::vector<std::vector<uint64_t> > &p_infosets,
+		 std::vector<std::vector<uint64_t> > &p_nextInfosets)
+{
+  Game game = p_node->GetGame();
+  uint64_t payoffs = 0;
+  GameOutcome outcome = p_node->GetOutcome();
+  if (outcome) {
+    for (int pl = 1; pl <= game->NumPlayers(); pl++) {
+      fingerprint_add(payoffs, 
+		      fingerprint_mix(p_players[pl-1],
+				      fingerprint_hash(outcome->GetPayoff<Rational>(pl))));
+    }
+  }
+  if (p_node->NumChildren() == 0) {
+    return fingerprint_mix(1, payoffs);
+  }
+
+  GameInfoset infoset = p_node->GetInfoset();
+  uint64_t children = 0;
+  for (int i = 1; i <= p_node->NumChildren(); i++) {
+    uint64_t child = fingerprint_tree(p_node->GetChild(i), p_players,
+				      p_infosets, p_nextInfosets);
+    if (infoset->IsChanceInfoset()) {
+      child = fingerprint_mix(child, 
+			      fingerprint_hash(infoset->GetActionProb(i, Rational(0))));
+    }
+    fingerprint_add(children, child);
+  }
+  if (infoset->IsChanceInfoset()) {
+    return fingerprint_mix(2, payoffs, children);
+  }
+  int pl = infoset->GetPlayer()->GetNumber(), iset = infoset->GetNumber();
+  uint64_t value = fingerprint_mix(fingerprint_mix(3, p_players[pl-1]),
+				   fingerprint_mix(p_infosets[pl-1][iset-1], payoffs),
+				   children);
+  fingerprint_add(p_nextInfosets[pl-1][iset-1], value);
+  return value;
+}
+
+inline void fingerprint_tree_invariant(FingerprintWriter &p_writer, 
+				       const Game &p_game)
+{
+  int numPlayers = p_game->NumPlayers();
+  std::vector<uint64_t> players(numPlayers);
+  std::vector<std::vector<uint64_t> > infosets(numPlayers);
+  for (int pl = 1; pl <= numPlayers; pl++) {
+    GamePlayer player = p_game->GetPlayer(pl);
+    infosets[pl-1].resize(player->NumInfosets());
+    for (int iset = 1; iset <= player->NumInfosets(); iset++) {
+      GameInfoset infoset = player->GetInfoset(iset);
+      infosets[pl-1][iset-1] = fingerprint_mix(infoset->NumActions(),
+					       infoset->NumMembers());
+      fingerprint_add(players[pl-1], infosets[pl-1][iset-1]);
+    }
+  }
+
+  uint64_t root = 0;
+  for (int round = 0; round <= FingerprintRounds; round++) {
+    std::vector<std::vector<uint64_t> > nextInfosets(infosets);
+    root = fingerprint_tree(p_game->GetRoot(), players, 
+			    infosets, nextInfosets);
+    infosets = nextInfosets;
+    for (int pl = 0; pl < numPlayers; pl++) {
+      for (size_t iset = 0; iset < infosets[pl].size(); iset++) {
+	fingerprint_add(players[pl], infosets[pl][iset]);
+      }
+    }
+  }
+
+  std::sort(players.begin(), players.end());
+  p_writer.WriteInt(numPlayers);
+  for (int pl = 0; pl < numPlayers; pl++) {
+    p_writer.WriteInt(players[pl]);
+  }
+  p_writer.WriteInt(root);
+}
+
+inline void fingerprint_strategic(FingerprintWriter &p_writer,
+				  const StrategySupportProfile &p_support)
+{
+  p_writer.WriteInt(p_support.NumPlayers());
+  for (int pl = 1; pl <= p_support.NumPlayers(); pl++) {
+    p_writer.WriteInt(p_support.NumStrategies(pl));
+  }
+  for (StrategyProfileIterator iter(p_support); !iter.AtEnd(); iter++) {
+    for (int pl = 1; pl <= p_support.NumPlayers(); pl++) {
+      p_writer.WriteNumber((*iter)->GetPayoff(pl));
+    }
+  }
+}
+
+inline void fingerprint_strategic_invariant(FingerprintWriter &p_writer,
+					    const StrategySupportProfile &p_support)
+{
+  int numPlayers = p_support.NumPlayers();
+  std::vector<std::vector<uint64_t> > strategies(numPlayers);
+  std::vector<uint64_t> players(numPlayers);
+  // The hash value of each payoff, and the index of the strategy of each 
+  // player, in each contingency
+  std::vector<uint64_t> payoffs;
+  std::vector<int> contingencies;
+  for (int pl = 1; pl <= numPlayers; pl++) {
+    strategies[pl-1].resize(p_support.NumStrategies(pl));
+  }
+  for (StrategyProfileIterator iter(p_support); !iter.AtEnd(); iter++) {
+    for (int pl = 1; pl <= numPlayers; pl++) {
+      int st = p_support.GetIndex((*iter)->GetStrategy(pl)) - 1;
+      uint64_t payoff = fingerprint_hash((*iter)->GetPayoff(pl));
+      payoffs.push_back(payoff);
+      contingencies.push_back(st);
+      fingerprint_add(strategies[pl-1][st], payoff);
+    }
+  }
+  for (int pl = 0; pl < numPlayers; pl++) {
+    players[pl] = fingerprint_mix(strategies[pl].size());
+    for (size_t st = 0; st < strategies[pl].size(); st++) {
+      fingerprint_add(players[pl], strategies[pl][st]);
+    }
+  }
+
+  long numConts = payoffs.size() / std::max(numPlayers, 1);
+  std::vector<uint64_t> values(numConts);
+  for (int round = 0; round <= FingerprintRounds; round++) {
+    std::vector<std::vector<uint64_t> > nextStrategies(strategies);
+    for (long c = 0; c < numConts; c++) {
+      values[c] = 0;
+      for (int pl = 0; pl < numPlayers; pl++) {
+	fingerprint_add(values[c], 
+			fingerprint_mix(players[pl], 
+					strategies[pl][contingencies[c*numPlayers+pl]],
+					payoffs[c*numPlayers+pl]));
+      }
+      for (int pl = 0; pl < numPlayers; pl++) {
+	fingerprint_add(nextStrategies[pl][contingencies[c*numPlayers+pl]],
+			values[c]);
+      }
+    }
+    strategies = nextStrategies;
+    for (int pl = 0; pl < numPlayers; pl++) {
+      for (size_t st = 0; st < strategies[pl].size(); st++) {
+	fingerprint_add(players[pl], strategies[pl][st]);
+      }
+    }
+  }
+
+  std::sort(players.begin(), players.end());
+  std::sort(values.begin(), values.end());
+  p_writer.WriteInt(numPlayers);
+  for (int pl = 0; pl < numPlayers; pl++) {
+    p_writer.WriteInt(players[pl]);
+  }
+  p_writer.WriteInt(numConts);
+  for (long c = 0; c < numConts; c++) {
+    p_writer.WriteInt(values[c]);
+  }
+}
+
+// Return the fingerprint data of the strategic game defined by p_support
+inline std::string fingerprint(const StrategySupportProfile &p_support,
+			       bool p_invariant)
+{
+  FingerprintWriter writer;
+  writer.WriteInt((p_invariant) ? 'I' : 'S');
+  if (p_invariant) {
+    fingerprint_strategic_invariant(writer, p_support);
+  }
+  else {
+    fingerprint_strategic(writer, p_support);
+  }
+  return writer.GetData();
+}
+
+// Return the fingerprint data of p_game.  Trees are fingerprinted
+// as trees, and not via their strategic forms.
+inline std::string fingerprint(const Game &p_game, bool p_invariant)
+{
+  if (!p_game->IsTree()) {
+    return fingerprint(StrategySupportProfile(p_game), p_invariant);
+  }
+  FingerprintWriter writer;
+  writer.WriteInt((p_invariant) ? 'J' : 'T');
+  if (p_invariant) {
+    fingerprint_tree_invariant(writer, p_game);
+  }
+  else {
+    writer.WriteInt(p_game->NumPlayers());
+    fingerprint_tree(writer, p_game->GetRoot());
+  }
+  return writer.GetData();
+}
+
+//
+// Renderer which passes each equilibrium found by a solver to a pair of
+// callbacks, one for strategy profiles and one for behavior profiles,
+// along with an opaque pointer for the caller's use.  If a callback
+// returns nonzero, the solver is stopped by throwing SolveStopped.
+// This is deliberately not a std::runtime_error, which some solvers
+// catch and report as an error.
+//
+class SolveStopped : public std::exception {
+public:
+  virtual ~SolveStopped() throw() { }
+  const char *what(void) const throw() { return "Solve stopped by caller"; }
+};
+
+template <class T> class CallbackRenderer : public StrategyProfileRenderer<T> {
+public:
+  typedef int (*StrategyCallback)(void *, MixedStrategyProfile<T> *);
+  typedef int (*BehaviorCallback)(void *, MixedBehaviorProfile<T> *);
+
+  CallbackRenderer(void *p_data, StrategyCallback p_strategy,
+		   BehaviorCallback p_behavior)
+    : m_data(p_data), m_strategy(p_strategy), m_behavior(p_behavior) { }
+  virtual ~CallbackRenderer() { }
+
+  virtual void Render(const MixedStrategyProfile<T> &p_profile,
+		      const std::string &p_label = "NE") const
+  {
+    if (m_strategy(m_data, const_cast<MixedStrategyProfile<T> *>(&p_profile))) {
+      throw SolveStopped();
+    }
+  }
+  virtual void Render(const MixedBehaviorProfile<T> &p_profile,
+		      const std::string &p_label = "NE") const
+  {
+    if (m_behavior(m_data, const_cast<MixedBehaviorProfile<T> *>(&p_profile))) {
+      throw SolveStopped();
+    }
+  }
+
+private:
+  void *m_data;
+  StrategyCallback m_strategy;
+  BehaviorCallback m_behavior;
+};
+
+template <class T> StrategyProfileRenderer<T> *
+new_callback_renderer(void *p_data,
+		      typename CallbackRenderer<T>::StrategyCallback p_strategy,
+		      typename CallbackRenderer<T>::BehaviorCallback p_behavior)
+{ return new CallbackRenderer<T>(p_data, p_strategy, p_behavior); }
@@ -23,11 +23,35 @@
 A set of utilities for computing Nash equilibria
 """
 
+import os
 import sys
+import time
+import errno
+import shlex
+import hashlib
+import tempfile
+import threading
 import subprocess
+import multiprocessing
+from multiprocessing.pool import ThreadPool
 from fractions import Fraction
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
 from gambit.profiles import Solution
 
+def _write_game(game):
+    """
+    Serialize 'game' in the binary format, or in its native text format
+    for representations which do not support the binary format, such
+    as action graph games and strategic restrictions.
+    """
+    try:
+        return game.write(format='binary')
+    except (IOError, NotImplementedError):
+        return game.write(format='native')
+
 class NashSolution(Solution):
     def __init__(self, profile):
         Solution.__init__(self, profile)
@@ -35,51 +59,189 @@ class NashSolution(Solution):
         return "<NashProfile for '%s': %s>" % (self._profile.game.title,
                                                self._profile)
     
-    
+class SolveResult(list):
+    """
+    The list of equilibria returned by a solver.  'status' is "complete"
+    if the solver finished, or "time_limit" or "max_equilibria" if it was
+    stopped on reaching that limit, in which case the list holds the
+    equilibria found up to then.
+    """
+    def __init__(self, profiles=(), status="complete"):
+        list.__init__(self, profiles)
+        self.status = status
+
+class _ToolOutput(object):
+    """
+    The standard output of an external program started by
+    ExternalSolver.launch().  The program is killed if its output is
+    closed before the program has finished, or once 'time_limit'
+    seconds have passed, in which case 'status' becomes "time_limit".
+    """
+    def __init__(self, process, time_limit=None):
+        self.process = process
+        self.status = "complete"
+        self._finished = False
+        self._timer = None
+        if time_limit is not None:
+            self._timer = threading.Timer(time_limit, self._expire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _expire(self):
+        if self.process.poll() is None:
+            self.status = "time_limit"
+            self._kill()
+
+    def _kill(self):
+        try:
+            self.process.kill()
+        except OSError:
+            # The program has already exited
+            pass
+
+    def readline(self):
+        line = self.process.stdout.readline()
+        if not line:
+            self._finished = True
+        return line
+
+    def __iter__(self):
+        return iter(self.readline, "")
+
+    def close(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        if not self._finished:
+            self._kill()
+        self.process.stdout.close()
+        self.process.wait()
+
 class ExternalSolver(object):
     """
     Base class for managing calls to external programs.
+
+    If the attribute 'binary' is set, games are passed to the external
+    program in the compact binary format, rather than as text.  This
+    is faster for large games, but requires that the command-line
+    tools are from a version of Gambit which supports the format.
+
+    If the attribute 'time_limit' is set, the program is killed after
+    running for that many seconds, and if 'max_equilibria' is set, it
+    is killed once it has reported that many equilibria.  solve() then
+    returns the equilibria reported up to that point, with the status
+    of the returned SolveResult indicating which limit was reached.
     """
+    binary = False
+    time_limit = None
+    max_equilibria = None
+    _pool = None
+    _pool_size = None
+
     def launch(self, prog, game):
         """
         Helper function for launching calls to external programs.
         Calls the specified program 'prog', passing the game to standard
-        input in .efg format (if a tree) or .nfg format (if a table).
-        Returns the object referencing standard output of the external program.
+        input in .efg format (if a tree) or .nfg format (if a table),
+        or in the binary format if the attribute 'binary' is set.
+        Returns the object referencing standard output of the external
+        program; closing it stops the program, if it is still running.
         """
-        p = subprocess.Popen("%s -q" % prog, shell=True,
+        # The program is started directly, rather than via a shell, to
+        # avoid the cost of starting a shell for each game solved.
+        p = subprocess.Popen(shlex.split(prog) + [ "-q" ],
                              stdin=subprocess.PIPE, stdout=subprocess.PIPE,
                              close_fds=True if sys.platform != "win32" else False)
-        child_stdin, child_stdout = p.stdin, p.stdout
-        child_stdin.write(game.write(format='native'))
+        output = _ToolOutput(p, self.time_limit)
+        p.stdin.write(_write_game(game) if self.binary
+                      else game.write(format='native'))
         # Need to close, or at least flush, stdin of the child, or else
         # processing won't begin...
-        child_stdin.close()
-        return child_stdout
+        p.stdin.close()
+        return output
 
-    def _parse_output(self, stream, game, rational, extensive=False):
-        profiles = [ ]
-        for line in stream:
-            entries = line.strip().split(",")
-            if entries[0] != "NE":  continue
-            if extensive:
-                profile = game.mixed_behavior_profile(rational=rational)
-            else:
-                profile = game.mixed_strategy_profile(rational=rational)
-            for (i, p) in enumerate(entries[1:]):
-                if rational:
-                    profile[i] = Fraction(p)
+    def solve_many(self, games, workers=None, **kwargs):
+        """
+        Solve each of the games in 'games', passing the keyword arguments
+        'kwargs' to solve().  Returns the list of the results of solve(),
+        in the same order as 'games'.  Only the threads which wait on the
+        external programs are pooled: each game is still solved by a new
+        run of the program, and up to 'workers' of them (by default, one
+        per CPU) are run at once.  The pool of threads is retained by the
+        solver for subsequent calls; call close() to release it.
+        """
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        if self._pool is None or self._pool_size != workers:
+            self.close()
+            self._pool = ThreadPool(workers)
+            self._pool_size = workers
+        return self._pool.map(lambda game: self.solve(game, **kwargs),
+                              games, 1)
+
+    def close(self):
+        """
+        Shut down the pool of worker threads used by solve_many(), if any.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+            self._pool_size = None
+
+    def solve_iter(self, game, **kwargs):
+        """
+        Solve 'game' as solve() does, passing it the keyword arguments
+        'kwargs', but returning a generator which yields each equilibrium
+        as soon as the external program reports it.  Closing the
+        generator before it is exhausted stops the program.
+        """
+        return self.solve(game, streaming=True, **kwargs)
+
+    def _iter_output(self, stream, game, rational, extensive=False):
+        count = 0
+        try:
+            # Iterating over the file directly reads ahead in blocks, which
+            # would hold back equilibria until a block had been filled.
+            for line in iter(stream.readline, ""):
+                entries = line.strip().split(",")
+                if entries[0] != "NE":  continue
+                values = map(Fraction if rational else float, entries[1:])
+                if extensive:
+                    profile = game.mixed_behavior_profile(rational=rational)
+                    for (i, p) in enumerate(values):
+                        profile[i] = p
                 else:
-                    profile[i] = float(p)
-            profiles.append(NashSolution(profile))
-        return profiles
+                    profile = game.mixed_strategy_profile(rational=rational,
+                                                          point=values)
+                yield NashSolution(profile)
+                count += 1
+                if count == self.max_equilibria:
+                    stream.status = "max_equilibria"
+                    break
+        finally:
+            stream.close()
+
+    def _parse_output(self, stream, game, rational, extensive=False,
+                      streaming=False):
+        """
+        Read the equilibria reported by the program on 'stream'.  Returns
+        a generator of them if 'streaming' is set, as for solve_iter(),
+        and otherwise the SolveResult listing them all.
+        """
+        profiles = self._iter_output(stream, game, rational, extensive)
+        if streaming:
+            return profiles
+        result = SolveResult(profiles)
+        # The status is only known once the output has been read
+        result.status = stream.status
+        return result
 
 class ExternalEnumPureSolver(ExternalSolver):
     """
     Algorithm class to manage calls to external gambit-enumpure solver
     for computing pure-strategy equilibria.
     """
-    def solve(self, game, use_strategic=False):
+    def solve(self, game, use_strategic=False, streaming=False):
         if not game.is_perfect_recall:
             raise RuntimeError("Computing equilibria of games with imperfect recall is not supported.")
         command_line = "gambit-enumpure"
@@ -87,14 +249,15 @@ class ExternalEnumPureSolver(ExternalSolver):
             command_line += " -S"
         return self._parse_output(self.launch(command_line, game),
                                   game, rational=True,
-                                  extensive=game.is_tree and not use_strategic)
+                                  extensive=game.is_tree and not use_strategic,
+                                  streaming=streaming)
 
 class ExternalLPSolver(ExternalSolver):
     """
     Algorithm class to manage calls to external gambit-lp solver
     for computing equilibria in two-player games using linear programming.
     """
-    def solve(self, game, rational=False, use_strategic=False):
+    def solve(self, game, rational=False, use_strategic=False, streaming=False):
         if len(game.players) != 2:
             raise RuntimeError("Method only valid for two-player games.")
         if not game.is_const_sum:
@@ -109,7 +272,8 @@ class ExternalLPSolver(ExternalSolver):
             command_line += " -S"
         return self._parse_output(self.launch(command_line, game),
                                   game, rational,
-                                  extensive=game.is_tree and not use_strategic)
+                                  extensive=game.is_tree and not use_strategic,
+                                  streaming=streaming)
 
 class ExternalLCPSolver(ExternalSolver):
     """
@@ -117,7 +281,7 @@ class ExternalLCPSolver(ExternalSolver):
     for computing equilibria in two-player games using linear complementarity
     programming.
     """
-    def solve(self, game, rational=False, use_strategic=False):
+    def solve(self, game, rational=False, use_strategic=False, streaming=False):
         if len(game.players) != 2:
             raise RuntimeError("Method only valid for two-player games.")
         if not game.is_perfect_recall:
@@ -130,14 +294,15 @@ class ExternalLCPSolver(ExternalSolver):
             command_line += " -S"
         return self._parse_output(self.launch(command_line, game),
                                   game, rational,
-                                  extensive=game.is_tree and not use_strategic)
+                                  extensive=game.is_tree and not use_strategic,
+                                  streaming=streaming)
 
 class ExternalEnumMixedSolver(ExternalSolver):
     """
     Algorithm class to manage calls to external gambit-enummixed solver
     for computing equilibria in two-player games using enumeration of extreme points.
     """
-    def solve(self, game, rational=False):
+    def solve(self, game, rational=False, streaming=False):
         if not game.is_perfect_recall:
             raise RuntimeError("Computing equilibria of games with imperfect recall is not supported.")
         if rational:
@@ -145,38 +310,38 @@ class ExternalEnumMixedSolver(ExternalSolver):
         else:
             command_line = "gambit-enummixed -d 10"
         return self._parse_output(self.launch(command_line, game),
-                                  game, rational)
+                                  game, rational, streaming=streaming)
 
 class ExternalSimpdivSolver(ExternalSolver):
     """
     Algorithm class to manage calls to external gambit-simpdiv solver
     for computing equilibria in N-player games using simpicial subdivision.
     """
-    def solve(self, game):
+    def solve(self, game, streaming=False):
         if not game.is_perfect_recall:
             raise RuntimeError("Computing equilibria of games with imperfect recall is not supported.")
         command_line = "gambit-simpdiv"
         return self._parse_output(self.launch(command_line, game),
-                                  game, rational=True)
+                                  game, rational=True, streaming=streaming)
     
 class ExternalGlobalNewtonSolver(ExternalSolver):
     """
     Algorithm class to manage calls to external gambit-gnm solver
     for computing equilibria in N-player games using the global Newton method.
     """
-    def solve(self, game):
+    def solve(self, game, streaming=False):
         if not game.is_perfect_recall:
             raise RuntimeError("Computing equilibria of games with imperfect recall is not supported.")
         command_line = "gambit-gnm -d 10"
         return self._parse_output(self.launch(command_line, game),
-                                  game, rational=False)
+                                  game, rational=False, streaming=streaming)
 
 class ExternalEnumPolySolver(ExternalSolver):
     """
     Algorithm class to manage calls to external gambit-enumpoly solver
     for computing equilibria in N-player games systems of polynomial equations.
     """
-    def solve(self, game, use_strategic=False):
+    def solve(self, game, use_strategic=False, streaming=False):
         if not game.is_perfect_recall:
             raise RuntimeError("Computing equilibria of games with imperfect recall is not supported.")
         command_line = "gambit-enumpoly -d 10"
@@ -184,14 +349,15 @@ class ExternalEnumPolySolver(ExternalSolver):
             command_line += " -S"
         return self._parse_output(self.launch(command_line, game),
                                   game, rational=False,
-                                  extensive=game.is_tree and not use_strategic)
+                                  extensive=game.is_tree and not use_strategic,
+                                  streaming=streaming)
 
 class ExternalLyapunovSolver(ExternalSolver):
     """
     Algorithm class to manage calls to external gambit-liap solver
     for computing equilibria in N-player games using Lyapunov function minimization.
     """
-    def solve(self, game, use_strategic=False):
+    def solve(self, game, use_strategic=False, streaming=False):
         if not game.is_perfect_recall:
             raise RuntimeError("Computing equilibria of games with imperfect recall is not supported.")
         command_line = "gambit-liap -d 10"
@@ -199,26 +365,27 @@ class ExternalLyapunovSolver(ExternalSolver):
             command_line += " -S"
         return self._parse_output(self.launch(command_line, game),
                                   game, rational=False,
-                                  extensive=game.is_tree and not use_strategic)
+                                  extensive=game.is_tree and not use_strategic,
+                                  streaming=streaming)
 
 class ExternalIteratedPolymatrixSolver(ExternalSolver):
     """
     Algorithm class to manage calls to external gambit-ipa solver
     for computing equilibria in N-player games using iterated polymatrix approximation.
     """
-    def solve(self, game):
+    def solve(self, game, streaming=False):
         if not game.is_perfect_recall:
             raise RuntimeError("Computing equilibria of games with imperfect recall is not supported.")
         command_line = "gambit-ipa -d 10"
         return self._parse_output(self.launch(command_line, game),
-                                  game, rational=False)
+                                  game, rational=False, streaming=streaming)
 
 class ExternalLogitSolver(ExternalSolver):
     """
     Algorithm class to manage calls to external gambit-logit solver
     for computing equilibria in N-player games using quantal response equilibrium.
     """
-    def solve(self, game, use_strategic=False):
+    def solve(self, game, use_strategic=False, streaming=False):
         if not game.is_perfect_recall:
             raise RuntimeError("Computing equilibria of games with imperfect recall is not supported.")
         profiles = [ ]
@@ -227,46 +394,37 @@ class ExternalLogitSolver(ExternalSolver):
             command_line += " -S"
         return self._parse_output(self.launch(command_line, game),
                                   game, rational=False,
-                                  extensive=game.is_tree and not use_strategic)
+                                  extensive=game.is_tree and not use_strategic,
+                                  streaming=streaming)
 
 
 import gambit.lib.libgambit
 
-def enumpure_solve(game, use_strategic=True, external=False):
-    """Convenience function to solve game to find pure-strategy Nash equilibria.
-    """
+def _enumpure_solver(game, use_strategic=True, external=False):
     if external:
-        return ExternalEnumPureSolve().solve(game, use_strategic=True)
+        return ExternalEnumPureSolver(), { "use_strategic": use_strategic }
     if not game.is_tree or use_strategic:
-        alg = gambit.lib.libgambit.EnumPureStrategySolver()
+        return gambit.lib.libgambit.EnumPureStrategySolver(), { }
     else:
-        alg = gambit.lib.libgambit.EnumPureAgentSolver()
-    return alg.solve(game)
+        return gambit.lib.libgambit.EnumPureAgentSolver(), { }
 
-def enummixed_solve(game, rational=True, external=False, use_lrs=False):
-    """Convenience function to solve two-player game to find all
-    mixed-strategy Nash equilibria.
-    """
+def _enummixed_solver(game, rational=True, external=False, use_lrs=False):
     if external:
-        return ExternalEnumMixedSolver().solve(game, rational=rational)
+        return ExternalEnumMixedSolver(), { "rational": rational }
     if use_lrs:
-        alg = gambit.lib.libgambit.EnumMixedLrsStrategySolver()
-    if rational:
-        alg = gambit.lib.libgambit.EnumMixedStrategySolverRational()
+        return gambit.lib.libgambit.EnumMixedLrsStrategySolver(), { }
+    elif rational:
+        return gambit.lib.libgambit.EnumMixedStrategySolverRational(), { }
     else:
-        alg = gambit.lib.libgambit.EnumMixedStrategySolverDouble()
-    return alg.solve(game)
+        return gambit.lib.libgambit.EnumMixedStrategySolverDouble(), { }
 
-def lcp_solve(game, rational=True, use_strategic=False, external=False,
-              stop_after=None, max_depth=None):
-    """Convenience function to solve game using an appropriate linear
-    complementarity solver.
-    """
+def _lcp_solver(game, rational=True, use_strategic=False, external=False,
+                stop_after=None, max_depth=None):
     if stop_after is None: stop_after = 0
     if max_depth is None:  max_depth = 0
     if external:
-        return ExternalLCPSolver().solve(game, rational=rational,
-                                         use_strategic=use_strategic)
+        return ExternalLCPSolver(), { "rational": rational,
+                                      "use_strategic": use_strategic }
     if not game.is_tree or use_strategic:
         if rational:
             alg = gambit.lib.libgambit.LCPStrategySolverRational(stop_after, max_depth)
@@ -277,15 +435,12 @@ def lcp_solve(game, rational=True, use_strategic=False, external=False,
             alg = gambit.lib.libgambit.LCPBehaviorSolverRational(stop_after, max_depth)
         else:
             alg = gambit.lib.libgambit.LCPBehaviorSolverDouble(stop_after, max_depth)
-    return alg.solve(game)
+    return alg, { }
 
-def lp_solve(game, rational=True, use_strategic=False, external=False):
-    """Convenience function to solve game using an appropriate linear
-    programming solver.
-    """
+def _lp_solver(game, rational=True, use_strategic=False, external=False):
     if external:
-        return ExternalLPSolver().solve(game, rational=rational,
-                                         use_strategic=use_strategic)
+        return ExternalLPSolver(), { "rational": rational,
+                                     "use_strategic": use_strategic }
     if not game.is_tree or use_strategic:
         if rational:
             alg = gambit.lib.libgambit.LPStrategySolverRational()
@@ -296,7 +451,585 @@ def lp_solve(game, rational=True, use_strategic=False, external=False):
             alg = gambit.lib.libgambit.LPBehaviorSolverRational()
         else:
             alg = gambit.lib.libgambit.LPBehaviorSolverDouble()
-    return alg.solve(game)
+    return alg, { }
+
+# For each method, the function returning the solver used by the
+# corresponding convenience function, and the arguments to its solve()
+_SOLVERS = { "enumpure": _enumpure_solver,
+             "enummixed": _enummixed_solver,
+             "lcp": _lcp_solver,
+             "lp": _lp_solver }
+
+def _take(profiles, max_equilibria, append):
+    """
+    Pass each equilibrium from the iterator 'profiles' to 'append',
+    stopping once 'max_equilibria' (if not None) have been passed, and
+    return the status of the solve.
+    """
+    try:
+        for (count, profile) in enumerate(profiles, 1):
+            append(profile)
+            if count == max_equilibria:
+                return "max_equilibria"
+        return "complete"
+    finally:
+        if hasattr(profiles, "close"):
+            profiles.close()
+
+def _send_solutions(conn, index, game, method, time_limit, max_equilibria,
+                    kwargs):
+    """
+    Solve 'game' using 'method' in a worker process, sending (index,
+    "profile", data) over 'conn' for each equilibrium, where data is
+    as returned by _profile_data(), then (index, "done", status).
+    The time limit of a native solver is enforced by the receiving
+    process, which terminates this one, so in that case each
+    equilibrium is sent as soon as it is found.
+    """
+    solver, args = _SOLVERS[method](game, **kwargs)
+    send = lambda p: conn.send((index, "profile", _profile_data(p)))
+    if isinstance(solver, ExternalSolver):
+        solver.time_limit = time_limit
+        solver.max_equilibria = max_equilibria
+        result = solver.solve(game, **args)
+        _take(result, None, send)
+        status = result.status
+    elif time_limit is None and max_equilibria is None:
+        status = _take(solver.solve(game, **args), None, send)
+    else:
+        status = _take(solver.solve_iter(game, **args), max_equilibria, send)
+    conn.send((index, "done", status))
+
+def _solve_worker(conn, game, method, time_limit, max_equilibria, kwargs):
+    """
+    Main function of the process used to solve the serialized game
+    'game' using a native solver with a time limit.
+    """
+    try:
+        game = gambit.lib.libgambit.Game.parse_game(game)
+        _send_solutions(conn, 0, game, method, time_limit, max_equilibria,
+                        kwargs)
+    except Exception as e:
+        conn.send((0, "error", e))
+    conn.close()
+
+def _solve_in_process(method, game, time_limit, max_equilibria, kwargs):
+    """
+    Solve 'game' using the native solver for 'method' in a separate
+    process, which is terminated if it has not finished within
+    'time_limit' seconds.
+    """
+    conn, child_conn = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_solve_worker,
+                                      args=(child_conn, _write_game(game),
+                                            method, time_limit,
+                                            max_equilibria, kwargs))
+    process.daemon = True
+    process.start()
+    child_conn.close()
+    deadline = time.time() + time_limit
+    found = [ ]
+    status = "time_limit"
+    try:
+        while conn.poll(max(0.0, deadline - time.time())):
+            try:
+                index, kind, value = conn.recv()
+            except EOFError:
+                raise RuntimeError("solver process exited unexpectedly")
+            if kind == "profile":
+                found.append(value)
+            elif kind == "error":
+                raise value
+            else:
+                status = value
+                break
+    finally:
+        if status == "time_limit":
+            process.terminate()
+        process.join()
+        conn.close()
+    return SolveResult(_rebuild_profiles(game, found), status)
+
+def _solve(method, game, time_limit, max_equilibria, kwargs):
+    solver, args = _SOLVERS[method](game, **kwargs)
+    if isinstance(solver, ExternalSolver):
+        solver.time_limit = time_limit
+        solver.max_equilibria = max_equilibria
+        return solver.solve(game, **args)
+    if time_limit is not None:
+        return _solve_in_process(method, game, time_limit, max_equilibria,
+                                 kwargs)
+    if max_equilibria is None:
+        return SolveResult(solver.solve(game, **args))
+    result = SolveResult()
+    result.status = _take(solver.solve_iter(game, **args), max_equilibria,
+                          result.append)
+    return result
+
+def enumpure_solve(game, use_strategic=True, external=False,
+                   time_limit=None, max_equilibria=None):
+    """Convenience function to solve game to find pure-strategy Nash equilibria.
+    """
+    return _solve("enumpure", game, time_limit, max_equilibria,
+                  { "use_strategic": use_strategic, "external": external })
+
+def enummixed_solve(game, rational=True, external=False, use_lrs=False,
+                    time_limit=None, max_equilibria=None):
+    """Convenience function to solve two-player game to find all
+    mixed-strategy Nash equilibria.
+    """
+    return _solve("enummixed", game, time_limit, max_equilibria,
+                  { "rational": rational, "external": external,
+                    "use_lrs": use_lrs })
+
+def lcp_solve(game, rational=True, use_strategic=False, external=False,
+              stop_after=None, max_depth=None, time_limit=None,
+              max_equilibria=None):
+    """Convenience function to solve game using an appropriate linear
+    complementarity solver.
+    """
+    return _solve("lcp", game, time_limit, max_equilibria,
+                  { "rational": rational, "use_strategic": use_strategic,
+                    "external": external, "stop_after": stop_after,
+                    "max_depth": max_depth })
+
+def lp_solve(game, rational=True, use_strategic=False, external=False,
+             time_limit=None, max_equilibria=None):
+    """Convenience function to solve game using an appropriate linear
+    programming solver.
+    """
+    return _solve("lp", game, time_limit, max_equilibria,
+                  { "rational": rational, "use_strategic": use_strategic,
+                    "external": external })
+
+class SolveTimeoutError(RuntimeError):
+    """
+    Reported by solve_batch() for a game whose solution was abandoned
+    after exceeding the time limit.
+    """
+    pass
+
+_BATCH_METHODS = { "enumpure": enumpure_solve,
+                   "enummixed": enummixed_solve,
+                   "lcp": lcp_solve,
+                   "lp": lp_solve }
+
+def _profile_data(profile):
+    """
+    Return the picklable representation (is_behavior, is_rational,
+    probabilities) of 'profile', from which _rebuild_profiles()
+    reconstructs it.
+    """
+    if isinstance(profile, Solution):
+        profile = profile._profile
+    return (isinstance(profile, gambit.lib.libgambit.MixedBehaviorProfile),
+            isinstance(profile, (gambit.lib.libgambit.MixedStrategyProfileRational,
+                                 gambit.lib.libgambit.MixedBehaviorProfileRational)),
+            [ profile[i] for i in xrange(len(profile)) ])
+
+def _batch_worker(conn):
+    """
+    Main loop of a solve_batch() worker process.  Receives tasks
+    (index, game, method, time_limit, max_equilibria, kwargs), where
+    game is either a filename or a serialized game, and sends back the
+    equilibria found as by _send_solutions(), or (index, "error", e)
+    if an exception is raised.  Profiles are sent as (is_behavior,
+    is_rational, probabilities), as the profile objects themselves
+    cannot be pickled.
+    """
+    while True:
+        task = conn.recv()
+        if task is None:
+            break
+        index, (is_file, game), method, time_limit, max_equilibria, kwargs = task
+        try:
+            if is_file:
+                game = gambit.lib.libgambit.Game.read_game(game)
+            else:
+                game = gambit.lib.libgambit.Game.parse_game(game)
+            _send_solutions(conn, index, game, method, time_limit,
+                            max_equilibria, kwargs)
+        except Exception as e:
+            conn.send((index, "error", e))
+    conn.close()
+
+def _wait(conns, timeout):
+    """
+    Wait for up to 'timeout' seconds (indefinitely if None) until one of
+    the connections 'conns' has data, and return those which do.
+    """
+    try:
+        from multiprocessing.connection import wait
+    except ImportError:
+        import select
+        return select.select(conns, [ ], [ ], timeout)[0]
+    return wait(conns, timeout)
+
+class _BatchWorker(object):
+    def __init__(self):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_batch_worker,
+                                               args=(child_conn,))
+        self.process.daemon = True
+        self.process.start()
+        child_conn.close()
+        self.index = None
+        self.deadline = None
+        self.limit = None
+        self.found = [ ]
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (IOError, OSError):
+            pass
+        self.process.join()
+
+    def kill(self):
+        self.process.terminate()
+        self.process.join()
+
+def _rebuild_profiles(game, result):
+    profiles = [ ]
+    for (is_behavior, rational, probs) in result:
+        if is_behavior:
+            profile = game.mixed_behavior_profile(rational=rational)
+        else:
+            profile = game.mixed_strategy_profile(rational=rational)
+        for (i, p) in enumerate(probs):
+            profile[i] = p
+        profiles.append(profile)
+    return profiles
+
+def _truncate(profiles, max_equilibria):
+    """
+    Return the complete list of equilibria 'profiles' as a SolveResult,
+    limited to the first 'max_equilibria' (if not None).
+    """
+    if max_equilibria is not None and len(profiles) > max_equilibria:
+        return SolveResult(profiles[:max_equilibria], "max_equilibria")
+    return SolveResult(profiles)
+
+def _remove_file(path):
+    """Remove 'path', if it has not already been removed."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+class EquilibriumCache(object):
+    """
+    An on-disk cache of the equilibria computed for games, stored in
+    'directory'.  Entries are keyed by the game's fingerprint, together
+    with the solution method and its arguments, so the cache is shared
+    by all copies of a game, whatever their labels.
+
+    The least recently used entries are removed when the total size
+    of the cache exceeds 'max_size' bytes (if None, the cache is not
+    bounded).  If 'shared' is set, the directory may be used at the
+    same time by other processes; the cache then consults the directory
+    itself rather than its own index when evicting entries.
+    """
+    def __init__(self, directory, max_size=64*1024*1024, shared=False):
+        self.directory = directory
+        self.max_size = max_size
+        self.shared = shared
+        try:
+            os.makedirs(directory)
+        except OSError as e:
+            if e.errno != errno.EEXIST or not os.path.isdir(directory):
+                raise
+        self._index = self._scan()
+
+    _SUFFIX = ".eqm"
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self._SUFFIX)
+
+    def _scan(self):
+        """
+        Return a dictionary mapping the key of each entry in the
+        directory to a pair (last use, size).
+        """
+        entries = { }
+        for name in os.listdir(self.directory):
+            if not name.endswith(self._SUFFIX):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                # Removed by another process
+                continue
+            entries[name[:-len(self._SUFFIX)]] = (st.st_mtime, st.st_size)
+        return entries
+
+    def key(self, game, method, **kwargs):
+        """
+        Return the key under which the equilibria of 'game' computed by
+        'method' with arguments 'kwargs' are stored.
+        """
+        h = hashlib.sha256()
+        h.update(game.fingerprint())
+        h.update("\0%s\0%r" % (method, sorted(kwargs.items())))
+        return h.hexdigest()
+
+    def get(self, game, method, **kwargs):
+        """
+        Return the stored equilibria of 'game' computed by 'method' with
+        arguments 'kwargs', as a SolveResult of profiles on 'game', or
+        None if there are none.
+        """
+        key = self.key(game, method, **kwargs)
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except (IOError, EOFError, pickle.UnpicklingError):
+            # Missing, or an entry which was not completely written;
+            # either way it is treated as not present.
+            self._index.pop(key, None)
+            return None
+        try:
+            os.utime(path, None)
+            st = os.stat(path)
+            self._index[key] = (st.st_mtime, st.st_size)
+        except OSError:
+            pass
+        profiles = _rebuild_profiles(game, [ data for (_, data) in entry ])
+        return SolveResult(NashSolution(p) if is_solution else p
+                           for ((is_solution, _), p) in zip(entry, profiles))
+
+    def put(self, game, method, profiles, **kwargs):
+        """
+        Store the equilibria 'profiles' of 'game', computed by 'method'
+        with arguments 'kwargs'.
+        """
+        key = self.key(game, method, **kwargs)
+        entry = [ (isinstance(p, NashSolution), _profile_data(p))
+                  for p in profiles ]
+        # Write to a temporary file and rename it into place, so other
+        # processes never see a partially written entry.
+        fd, tmpname = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(entry, f, pickle.HIGHEST_PROTOCOL)
+            size = os.path.getsize(tmpname)
+            os.rename(tmpname, self._path(key))
+        except OSError:
+            # On Windows, rename fails if another process has just
+            # stored the same entry, which can be left in its place.
+            _remove_file(tmpname)
+            return
+        except:
+            _remove_file(tmpname)
+            raise
+        self._index[key] = (time.time(), size)
+        self._evict()
+
+    def _evict(self):
+        if self.max_size is None:
+            return
+        if self.shared:
+            self._index = self._scan()
+        total = sum(size for (_, size) in self._index.values())
+        if total <= self.max_size:
+            return
+        for (used, key) in sorted((used, key) for (key, (used, size))
+                                  in self._index.items()):
+            _remove_file(self._path(key))
+            total -= self._index.pop(key)[1]
+            if total <= self.max_size:
+                break
+
+    def solve(self, game, method="lcp", **kwargs):
+        """
+        Return the equilibria of 'game' computed using 'method', which
+        is one of "enumpure", "enummixed", "lcp", or "lp", selecting the
+        corresponding convenience function, called with the keyword
+        arguments 'kwargs'.  The equilibria are taken from the cache if
+        present; otherwise they are computed and stored.  Equilibria
+        computed under the limits 'time_limit' or 'max_equilibria' are
+        only stored if the solver finished within them, and the limits
+        are not part of the key, so these equilibria are also returned
+        when the same game is solved without limits.
+        """
+        if method not in _BATCH_METHODS:
+            raise ValueError("unknown method '%s'" % method)
+        time_limit = kwargs.pop("time_limit", None)
+        max_equilibria = kwargs.pop("max_equilibria", None)
+        profiles = self.get(game, method, **kwargs)
+        if profiles is not None:
+            return _truncate(profiles, max_equilibria)
+        profiles = _BATCH_METHODS[method](game, time_limit=time_limit,
+                                          max_equilibria=max_equilibria,
+                                          **kwargs)
+        if profiles.status == "complete":
+            self.put(game, method, profiles, **kwargs)
+        return profiles
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        for key in self._scan():
+            _remove_file(self._path(key))
+        self._index = { }
+
+    def __len__(self):
+        if self.shared:
+            self._index = self._scan()
+        return len(self._index)
+
+    @property
+    def size(self):
+        """The total size in bytes of the entries in the cache."""
+        if self.shared:
+            self._index = self._scan()
+        return sum(size for (_, size) in self._index.values())
+
+def solve_batch(games, method="lcp", workers=None, timeout=None, cache=None,
+                **kwargs):
+    """Solve each of a list of games in parallel, using a pool of
+    'workers' processes (by default, one per CPU).  Each entry in
+    'games' is either a game or the name of a file containing one.
+    'method' is one of "enumpure", "enummixed", "lcp", or "lp", and
+    selects the corresponding convenience function, which is called
+    with the keyword arguments 'kwargs'.
+
+    This is a generator, which yields a pair (index, result) for each
+    game as soon as it is solved, so results are not in general in the
+    order of 'games'.  result is the list of equilibria found, or the
+    exception raised in solving the game.  A game which is not solved
+    within 'timeout' seconds has its worker process terminated, and
+    its result is a SolveTimeoutError.
+
+    The keyword arguments 'time_limit' and 'max_equilibria' limit the
+    solution of each game as for the convenience functions, and the
+    result is then a SolveResult, holding the equilibria found before
+    the limit was reached.  A native solver which reaches the time
+    limit has its worker process terminated.
+
+    If 'cache' is an EquilibriumCache, games whose equilibria are in
+    the cache are not solved again, and the equilibria of the others
+    are stored in it once computed.
+    """
+    if method not in _BATCH_METHODS:
+        raise ValueError("unknown method '%s'" % method)
+    time_limit = kwargs.pop("time_limit", None)
+    max_equilibria = kwargs.pop("max_equilibria", None)
+    games = list(games)
+
+    def game_of(index):
+        game = games[index]
+        if isinstance(game, basestring):
+            game = gambit.lib.libgambit.Game.read_game(game)
+        return game
+
+    def receive(worker):
+        # Receive the next message from a worker, returning the result
+        # for its game once it has been solved, or None until then.
+        index, kind, value = worker.conn.recv()
+        if kind == "profile":
+            worker.found.append(value)
+            return None
+        elif kind == "error":
+            return value
+        game = game_of(index)
+        result = SolveResult(_rebuild_profiles(game, worker.found), value)
+        if cache is not None and result.status == "complete":
+            cache.put(game, method, result, **kwargs)
+        return result
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    pending = list(enumerate(games))
+    pending.reverse()
+    idle = [ ]
+    busy = { }
+    try:
+        while pending or busy:
+            while pending and len(busy) < workers:
+                index, game = pending.pop()
+                if cache is not None:
+                    if isinstance(game, basestring):
+                        game = games[index] = \
+                               gambit.lib.libgambit.Game.read_game(game)
+                    result = cache.get(game, method, **kwargs)
+                    if result is not None:
+                        yield index, _truncate(result, max_equilibria)
+                        continue
+                worker = idle.pop() if idle else _BatchWorker()
+                if isinstance(game, basestring):
+                    task = (True, game)
+                else:
+                    task = (False, _write_game(game))
+                worker.conn.send((index, task, method, time_limit,
+                                  max_equilibria, kwargs))
+                worker.index = index
+                worker.found = [ ]
+                if timeout is not None:
+                    worker.deadline = time.time() + timeout
+                if time_limit is not None and not kwargs.get("external"):
+                    # External programs are stopped by the solver itself
+                    worker.limit = time.time() + time_limit
+                busy[worker.conn] = worker
+            if not busy:
+                # The remaining games were all found in the cache
+                continue
+
+            deadlines = [ d for w in busy.values()
+                          for d in (w.deadline, w.limit) if d is not None ]
+            if deadlines:
+                wait = max(0.0, min(deadlines) - time.time())
+            else:
+                wait = None
+            for conn in _wait(list(busy.keys()), wait):
+                worker = busy[conn]
+                try:
+                    result = receive(worker)
+                except EOFError:
+                    del busy[conn]
+                    worker.kill()
+                    yield worker.index, \
+                          RuntimeError("worker process exited while "
+                                       "solving game %d" % worker.index)
+                    continue
+                if result is not None:
+                    del busy[conn]
+                    worker.limit = None
+                    idle.append(worker)
+                    yield worker.index, result
+
+            now = time.time()
+            for (conn, worker) in list(busy.items()):
+                if worker.limit is not None and worker.limit <= now:
+                    del busy[conn]
+                    # Collect any equilibria sent before the limit
+                    result = None
+                    while result is None and conn.poll():
+                        try:
+                            result = receive(worker)
+                        except EOFError:
+                            break
+                    if result is not None:
+                        worker.limit = None
+                        idle.append(worker)
+                        yield worker.index, result
+                        continue
+                    worker.kill()
+                    yield worker.index, \
+                          SolveResult(_rebuild_profiles(game_of(worker.index),
+                                                        worker.found),
+                                      "time_limit")
+                elif worker.deadline is not None and worker.deadline <= now:
+                    del busy[conn]
+                    worker.kill()
+                    yield worker.index, \
+                          SolveTimeoutError("game %d not solved within %s "
+                                            "seconds" % (worker.index, timeout))
+    finally:
+        for worker in idle:
+            worker.stop()
+        for worker in busy.values():
+            worker.kill()
 
 logit_estimate = gambit.lib.libgambit.logit_estimate
 logit_atlambda = gambit.lib.libgambit.logit_atlambda
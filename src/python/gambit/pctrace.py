@@ -45,9 +45,26 @@ def newton_step(q, b, u, y):
         d += s*s
     return math.sqrt(d)
 
+def hermite(x0, x1, t0, t1, u):
+    """
+    Evaluate at 'u', between 0 and 1, the cubic Hermite interpolant
+    of the path between successive points 'x0' and 'x1', with unit
+    tangents 't0' and 't1', as passed to the 'dense' callback of
+    trace_path().  The tangents are scaled by the distance between
+    the points.
+    """
+    x0 = numpy.asarray(x0, dtype=float)
+    x1 = numpy.asarray(x1, dtype=float)
+    h = math.sqrt(numpy.dot(x1 - x0, x1 - x0))
+    u2 = u*u
+    u3 = u*u*u
+    return ((2*u3-3*u2+1)*x0 + (u3-2*u2+u)*h*numpy.asarray(t0) +
+            (-2*u3+3*u2)*x1 + (u3-u2)*h*numpy.asarray(t1))
+
 def trace_path(start, startLam, maxLam, compute_lhs, compute_jac,
                omega=1.0, hStart=0.03, maxDecel=1.1, maxIter=1000,
-               crit=None, callback=None):
+               crit=None, callback=None,
+               maxAccel=2.0, maxAngle=0.5, dense=None):
     """
     Trace a differentiable path starting at the vector 'start' with
     parameter 'startLam', until 'maxLam' is reached.  lhs() returns the
@@ -55,6 +72,21 @@ def trace_path(start, startLam, maxLam, compute_lhs, compute_jac,
     of the Jacobian at any point (x, lam).  omega determines the orientation
     to trace the curve.  Optionally, 'crit' is a function to search for a
     zero of along the path.
+
+    The steplength is adapted after each step from the distance and
+    rate of contraction of the corrector iteration, and the angle
+    between the tangents at either end of the step, which estimates
+    the curvature of the path.  It grows by at most a factor of
+    'maxAccel' and shrinks by at most 'maxDecel' after a successful
+    step.  A step is retried with half the steplength if the corrector
+    fails within 'maxIter' iterations, or the path turns through more
+    than 'maxAngle' radians.  A corrector which stops contracting is
+    accepted if the residual of the equations is negligible.
+
+    If 'dense' is given, it is called as dense(x0, x1, t0, t1) for
+    each step, with the points at either end of the step and the unit
+    tangents there, oriented in the direction of the step, from which
+    hermite() interpolates the path.
     """
 
     tol = 1.0e-4              # tolerance for corrector iteration
@@ -62,6 +94,8 @@ def trace_path(start, startLam, maxLam, compute_lhs, compute_jac,
     maxContr = 0.6            # maximal contraction rate in corrector
     eta = 0.1                 # perturbation to avoid cancellation
                               # in calculating contraction rate
+    resTol = 1.0e-8           # residual at which the corrector has
+                              # converged, even if not contracting
     h = hStart                # initial stepsize
     hmin = 1.0e-8             # minimal stepsize
 
@@ -91,7 +125,7 @@ def trace_path(start, startLam, maxLam, compute_lhs, compute_jac,
         # Predictor step
         u = x + h*omega*t
 
-        decel = 1.0 / maxDecel      # initialize deceleration factor
+        decel = 1.0 / maxAccel      # initialize deceleration factor
         b = compute_jac(u)
         #q, b = scipy.linalg.decomp.qr(b, mode='qr')
         q = qr_decomp(b)
@@ -100,9 +134,10 @@ def trace_path(start, startLam, maxLam, compute_lhs, compute_jac,
         disto = 0.0
         while True:
             if it == maxIter:
-                # Give up!
-                return x
-            
+                # The corrector is not converging; retry with a shorter step
+                accept = False
+                break
+
             y = compute_lhs(u)
             dist = newton_step(q, b, u, y)
 
@@ -115,7 +150,10 @@ def trace_path(start, startLam, maxLam, compute_lhs, compute_jac,
             if it >= 2:
                 contr = dist / (disto + tol * eta)
                 if contr > maxContr:
-                    accept = False
+                    # When the Jacobian is badly conditioned, for instance
+                    # far along the path, the corrections stall at roundoff
+                    # level; accept the point if it solves the equations
+                    accept = (numpy.max(numpy.abs(compute_lhs(u))) < resTol)
                     break
                 decel = max(decel, math.sqrt(contr / maxContr) * maxDecel)
 
@@ -126,8 +164,18 @@ def trace_path(start, startLam, maxLam, compute_lhs, compute_jac,
             disto = dist
             it += 1
 
+        if accept:
+            newT = q[-1]
+            # The sign of the computed tangent is arbitrary, so the angle
+            # is measured between the lines the tangents span
+            angle = math.acos(min(1.0, abs(numpy.dot(t, newT))))
+            if angle > maxAngle:
+                accept = False
+            else:
+                decel = max(decel, angle / maxAngle * maxDecel)
+
         if not accept:
-            h /= maxDecel       # PC not accepted; change stepsize and retry
+            h /= 2.0            # PC not accepted; change stepsize and retry
             if abs(h) < hmin:
                 # Stop.
                 return x
@@ -154,6 +202,12 @@ def trace_path(start, startLam, maxLam, compute_lhs, compute_jac,
             # Standard steplength adaptaiton
             h = abs(h / decel)
 
+        if dense is not None:
+            chord = u - x
+            dense(x, u,
+                  t if numpy.dot(t, chord) >= 0.0 else -t,
+                  newT if numpy.dot(newT, chord) >= 0.0 else -newT)
+
         # PC step was successful; update and iterate
         x = u[:]
 
@@ -162,9 +216,7 @@ def trace_path(start, startLam, maxLam, compute_lhs, compute_jac,
 
         newT = q[-1]    # new tangent
         if sum(t * newT) < 0.0:
-            # Bifurcation detected
-            print "Detected bifurcation near %f" % x[-1]
-
+            # Bifurcation detected; keep tracing in the same direction
             omega = -omega
         t = newT[:]
         
@@ -441,3 +493,11 @@ def trace_path_nojac(start, startLam, maxLam, compute_lhs,
     return x
 
 
+
+# Use the compiled implementation of trace_path when it is available;
+# the version above is retained as a fallback, and as trace_path_python.
+trace_path_python = trace_path
+try:
+    from gambit.lib.pctrace import trace_path
+except ImportError:
+    pass
@@ -25,9 +25,12 @@ A set of utilities for computing and analyzing quantal response equilbria
 
 import math
 import numpy
+import scipy.optimize
 import pctrace
+import multiprocessing
 
 from gambit.profiles import Solution
+from gambit.games.meanstat import sum_dist
 
 def sym_compute_lhs(game, point):
     """
@@ -86,7 +89,344 @@ def sym_compute_jac(game, point):
                              profile.strategy_value(st)
 
     return matrix
-            
+
+
+class SymmetricLogitEquations(object):
+    """
+    Vectorized evaluation of the set of equations defining a symmetric
+    logit QRE of a symmetric mean-statistic game, and their Jacobian.
+
+    The payoffs are taken from the game's cached payoff kernels.  The
+    distribution of the sum of the other players' choices is computed
+    once per point, and the LHS and Jacobian at the most recently
+    evaluated point are retained, so that lhs() and jac() can be passed
+    directly to pctrace.trace_path.
+    """
+    def __init__(self, game):
+        self.game = game
+        self.N = game.N
+        self.kernel = game.payoff_kernel
+        self.dkernel = game.payoff_kernel_deriv
+        self.offsets = numpy.array([ 0, len(game.choices) ])
+        self._point = None
+        self._lhs = None
+        self._jac = None
+
+    def evaluate(self, point):
+        """
+        Compute the LHS and Jacobian of the equations at 'point', returning
+        them as a tuple of ndarrays.
+        """
+        point = numpy.asarray(point, dtype=float)
+        if self._point is not None and numpy.array_equal(point, self._point):
+            return self._lhs, self._jac
+
+        N = self.N
+        n = len(point) - 1
+        logprofile = point[:-1]
+        lam = point[-1]
+        profile = numpy.exp(logprofile)
+
+        dist2 = sum_dist(N-2, profile) if N >= 2 else numpy.ones(1)
+        dist1 = numpy.convolve(dist2, profile) if N >= 2 else dist2
+        values = numpy.dot(self.kernel, dist1)
+        L = len(dist2)
+        deriv = numpy.empty((n, n))
+        for sto in xrange(n):
+            deriv[:, sto] = numpy.dot(self.dkernel[:, sto:sto+L], dist2)
+
+        lhs = numpy.empty(n)
+        lhs[0] = -1.0 + profile.sum()
+        lhs[1:] = (logprofile[1:] - logprofile[0] -
+                   lam * (values[1:] - values[0]))
+
+        matrix = numpy.zeros((n+1, n))
+        # sum-to-one equation; derivative wrt lambda is zero
+        matrix[:-1, 0] = profile
+        # ratio equations
+        matrix[:-1, 1:] = (-(N-1) * lam * profile[:, numpy.newaxis] *
+                           (deriv[1:, :] - deriv[0, :]).transpose())
+        matrix[0, 1:] -= 1.0
+        matrix[numpy.arange(1, n), numpy.arange(1, n)] += 1.0
+        # column wrt lambda
+        matrix[-1, 1:] = values[0] - values[1:]
+
+        self._point = point.copy()
+        self._lhs = lhs
+        self._jac = matrix
+        return lhs, matrix
+
+    def lhs(self, point):
+        """Compute the LHS of the equations at 'point'."""
+        return self.evaluate(point)[0].copy()
+
+    def jac(self, point):
+        """Compute the Jacobian of the equations at 'point'."""
+        return self.evaluate(point)[1].copy()
+
+    def __getstate__(self):
+        # The game may hold functions, which cannot be pickled; only its
+        # payoff kernels are needed to evaluate the equations
+        state = self.__dict__.copy()
+        state['game'] = None
+        return state
+
+
+def _contract(tensor, probs, keep):
+    """
+    Contract the payoff tensor 'tensor' with the mixed strategies
+    'probs' of all the players except those in 'keep'.  The axes of
+    the players in 'keep' remain, in order of player.
+    """
+    # Contract the last axes first, so the axes still to be contracted
+    # keep their positions
+    for pl in xrange(len(probs)-1, -1, -1):
+        if pl not in keep:
+            tensor = numpy.tensordot(tensor, probs[pl], axes=([pl], [0]))
+    return tensor
+
+
+class LogitQREEquations(object):
+    """
+    Vectorized evaluation of the set of equations defining a logit QRE
+    of a game in strategic form, and their Jacobian.
+
+    A point gives the logarithms of the probabilities of all strategies,
+    followed by lambda.  For each player, the first equation requires
+    the probabilities to sum to one, and the others equate the log-ratio
+    of the probabilities of each strategy and the first to lambda times
+    the difference in their values.  Values and their derivatives are
+    computed by contracting the game's payoff tensors, taken when the
+    equations are constructed, with the mixed strategies of the other
+    players.  As for SymmetricLogitEquations, the LHS and Jacobian at
+    the most recently evaluated point are retained.
+    """
+    def __init__(self, game):
+        self.game = game
+        self.tensors = game.payoff_tensors()
+        self.offsets = numpy.cumsum([ 0 ] + [ len(p.strategies)
+                                             for p in game.players ])
+        self._point = None
+        self._lhs = None
+        self._jac = None
+
+    def evaluate(self, point):
+        """
+        Compute the LHS and Jacobian of the equations at 'point', returning
+        them as a tuple of ndarrays.
+        """
+        point = numpy.asarray(point, dtype=float)
+        if self._point is not None and numpy.array_equal(point, self._point):
+            return self._lhs, self._jac
+
+        n = len(point) - 1
+        logprofile = point[:-1]
+        lam = point[-1]
+        profile = numpy.exp(logprofile)
+        offsets = self.offsets
+        N = len(self.tensors)
+        probs = [ profile[offsets[pl]:offsets[pl+1]] for pl in xrange(N) ]
+
+        lhs = numpy.empty(n)
+        matrix = numpy.zeros((n+1, n))
+        for (pl, tensor) in enumerate(self.tensors):
+            first, last = offsets[pl], offsets[pl+1]
+            values = None
+            for opp in xrange(N):
+                if opp == pl:
+                    continue
+                # deriv[k, l] is the value of strategy k when 'opp'
+                # plays strategy l
+                deriv = _contract(tensor, probs, (pl, opp))
+                if opp < pl:
+                    deriv = deriv.transpose()
+                if values is None:
+                    values = numpy.dot(deriv, probs[opp])
+                matrix[offsets[opp]:offsets[opp+1], first+1:last] = \
+                    (-lam * probs[opp][:, numpy.newaxis] *
+                     (deriv[1:, :] - deriv[0, :]).transpose())
+            if values is None:
+                # A one-player game
+                values = numpy.asarray(tensor, dtype=float)
+
+            lhs[first] = -1.0 + probs[pl].sum()
+            lhs[first+1:last] = (logprofile[first+1:last] - logprofile[first] -
+                                 lam * (values[1:] - values[0]))
+
+            # sum-to-one equation; derivative wrt lambda is zero
+            matrix[first:last, first] = probs[pl]
+            # ratio equations
+            matrix[first, first+1:last] = -1.0
+            matrix[numpy.arange(first+1, last), numpy.arange(first+1, last)] = 1.0
+            # column wrt lambda
+            matrix[-1, first+1:last] = values[0] - values[1:]
+
+        self._point = point.copy()
+        self._lhs = lhs
+        self._jac = matrix
+        return lhs, matrix
+
+    def lhs(self, point):
+        """Compute the LHS of the equations at 'point'."""
+        return self.evaluate(point)[0].copy()
+
+    def jac(self, point):
+        """Compute the Jacobian of the equations at 'point'."""
+        return self.evaluate(point)[1].copy()
+
+    def __getstate__(self):
+        # Only the payoff tensors are needed to evaluate the equations,
+        # so they can be sent to worker processes without the game
+        state = self.__dict__.copy()
+        state['game'] = None
+        return state
+
+
+def _logit_equations(game):
+    """
+    Returns the equations defining the logit QRE of 'game', and the
+    point at lambda = 0 at which the principal branch starts.
+    """
+    p = game.mixed_strategy_profile()
+    if getattr(game, "is_symmetric", False):
+        return SymmetricLogitEquations(game), [ math.log(x) for x in p.profile ]
+    return LogitQREEquations(game), [ math.log(x) for x in p ]
+
+
+def _correct(equations, point, tol=1.0e-10, max_iter=20):
+    """
+    Move 'point' onto the curve defined by 'equations', by Newton steps
+    of minimal norm, as in the corrector of pctrace.trace_path.  The
+    steps stop if they diverge, for instance far along the curve, where
+    the probabilities of some strategies overflow or vanish.
+    """
+    point = numpy.array(point, dtype=float)
+    with numpy.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        for it in xrange(max_iter):
+            try:
+                step = numpy.dot(numpy.linalg.pinv(equations.jac(point).transpose()),
+                                 equations.lhs(point))
+            except numpy.linalg.LinAlgError:
+                break
+            if not numpy.all(numpy.isfinite(step)):
+                break
+            point -= step
+            if numpy.sqrt(numpy.dot(step, step)) < tol:
+                break
+    return point
+
+
+def _solve_at_lambda(equations, point, tol=1.0e-12, max_iter=10):
+    """
+    Move 'point' onto the curve defined by 'equations' by Newton steps
+    with lambda held fixed.  Returns the point, and whether the steps
+    converged.
+    """
+    point = numpy.array(point, dtype=float)
+    for it in xrange(max_iter):
+        step = numpy.linalg.solve(equations.jac(point)[:-1].transpose(),
+                                  equations.lhs(point))
+        point[:-1] -= step
+        if numpy.sqrt(numpy.dot(step, step)) < tol:
+            return point, True
+    return point, False
+
+
+def _logit_response(equations, probs, lam):
+    """
+    Returns the point at 'lam' giving the logit response to the mixed
+    strategies 'probs', from which to seek a QRE near 'probs'.
+    """
+    point = numpy.append(numpy.log(numpy.maximum(probs, 1.0e-300)), lam)
+    lhs = equations.lhs(point)
+    offsets = equations.offsets
+    for (first, last) in zip(offsets[:-1], offsets[1:]):
+        # The ratio equations give lambda times the differences in the
+        # values of the strategies from the first
+        values = numpy.concatenate([ [ 0.0 ],
+                                     point[first+1:last] - point[first] -
+                                     lhs[first+1:last] ])
+        values -= values.max()
+        point[first:last] = values - math.log(numpy.exp(values).sum())
+    return point
+
+
+def _trace_branch(task):
+    """
+    Trace the branch of the logit QRE correspondence through a seed,
+    in a worker process of trace_correspondence().  The task gives the
+    equations, the seed point, max_lambda, and the initial steplength
+    and maximal deceleration.  A seed at lambda zero starts the
+    principal branch.  Other seeds are first moved onto the
+    correspondence at their lambda, and the branch is traced in both
+    directions from there.  Returns the successive points on the
+    branch, or None if the seed does not lead to a QRE.
+    """
+    equations, point, max_lambda, h_start, max_decel = task
+    if point[-1] == 0.0:
+        directions = [ 1.0 ]
+    else:
+        try:
+            # Newton steps from a poor seed may diverge
+            with numpy.errstate(over='ignore', invalid='ignore'):
+                point, converged = _solve_at_lambda(equations, point,
+                                                    max_iter=50)
+        except numpy.linalg.LinAlgError:
+            return None
+        if not converged or not numpy.all(numpy.isfinite(point)):
+            return None
+        directions = [ -1.0, 1.0 ]
+
+    legs = [ ]
+    for omega in directions:
+        leg = [ ]
+        pctrace.trace_path(point[:-1], point[-1], max_lambda,
+                           equations.lhs,
+                           equations.jac,
+                           omega=omega,
+                           hStart=h_start,
+                           maxDecel=max_decel,
+                           callback=lambda p: leg.append(numpy.array(p)),
+                           maxIter=100)
+        legs.append(leg)
+    if len(legs) == 1:
+        return numpy.array(legs[0])
+    return numpy.array(legs[0][::-1] + legs[1][1:])
+
+
+def _maximize_on_path(equations, points, data):
+    """
+    Find the point maximizing the log-likelihood of 'data' on the part
+    of the curve defined by 'equations' through the successive 'points'.
+    Points along the chords joining them are corrected onto the curve.
+    """
+    def point_at(s):
+        i = min(int(s), len(points)-2)
+        return _correct(equations, points[i] + (s-i)*(points[i+1]-points[i]))
+
+    best = max(points, key=lambda p: numpy.dot(data, p[:-1]))
+    result = scipy.optimize.minimize_scalar(
+        lambda s: -numpy.dot(data, point_at(s)[:-1]),
+        bounds=(0.0, len(points)-1.0), method='bounded')
+    point = point_at(result.x)
+    # This also rejects a point at which the corrector diverged
+    if not numpy.dot(data, point[:-1]) >= numpy.dot(data, best[:-1]):
+        return best
+    return point
+
+
+def _refine_fit(task):
+    """
+    Refine the maximizer of the log-likelihood of a dataset, in a
+    worker process of compute_max_like_batch().  The task gives the
+    equations, the checkpoints adjacent to the best one for the
+    dataset, and the dataset.  Returns the point found.
+    """
+    equations, segment, counts = task
+    if len(segment) == 1:
+        return segment[0]
+    return _maximize_on_path(equations, segment, counts)
+
 
 def printer(game, point):
     profile = game.mixed_strategy_profile(point=[math.exp(x) for x in point[:-1]])
@@ -109,14 +449,253 @@ class LogitQRE(Solution):
     @property
     def mu(self):       return 1.0 / self._lam
 
+class QRECorrespondence(object):
+    """
+    A branch of the logit QRE correspondence of a game, traced once and
+    stored as a single array, with one row per point on the branch
+    giving its arclength from the start of the branch, the point (the
+    logarithms of the strategy probabilities, followed by lambda), and
+    the unit tangent to the branch there.  Several branches may be
+    stored one after another; the arclength restarts from zero at the
+    first point of each.
+
+    QRE at other values of lambda are found by cubic Hermite
+    interpolation between the stored points, followed by Newton steps
+    back onto the branch if the game is given and these converge.  Correspondences are
+    saved as .npy files, which load() can memory-map.
+    """
+    def __init__(self, game, data):
+        self.game = game
+        self.data = data
+        self.n = (data.shape[1] - 3) // 2
+        if game is not None:
+            self._equations = _logit_equations(game)[0]
+        else:
+            self._equations = None
+        # Searching by lambda requires a single branch, along which
+        # lambda increases
+        self._monotone = bool(numpy.all(numpy.diff(data[:, 0]) > 0.0) and
+                              numpy.all(numpy.diff(self.lambdas) > 0.0))
+
+    @classmethod
+    def from_points(cls, game, points):
+        """
+        Build the correspondence of 'game' through the successive
+        'points' on a branch, such as those passed to the callback of
+        pctrace.trace_path.
+        """
+        equations = _logit_equations(game)[0]
+        points = numpy.array(points, dtype=float)
+        chords = numpy.diff(points, axis=0)
+        lengths = numpy.sqrt((chords * chords).sum(axis=1))
+        keep = numpy.concatenate([ [ True ], lengths > 0.0 ])
+        points, chords = points[keep], chords[lengths > 0.0]
+        if len(points) < 2:
+            raise ValueError("a correspondence requires at least two points")
+
+        # The tangent spans the kernel of the transposed Jacobian; it
+        # is oriented in the direction in which the branch was traced
+        tangents = numpy.array([ numpy.linalg.svd(equations.jac(p).transpose())[2][-1]
+                                 for p in points ])
+        directions = numpy.vstack([ chords, chords[-1:] ])
+        tangents[(tangents * directions).sum(axis=1) < 0.0] *= -1.0
+        arclength = numpy.concatenate([ [ 0.0 ],
+                                        numpy.cumsum(lengths[lengths > 0.0]) ])
+        return cls(game, numpy.column_stack([ arclength, points, tangents ]))
+
+    @classmethod
+    def from_branches(cls, game, branches, max_lambda=None, tol=1.0e-6):
+        """
+        Build the correspondence of 'game' through several branches,
+        each given by its successive points as for from_points().  The
+        parts of each branch which retrace an earlier one, with
+        probabilities within 'tol' of it at the same lambda, are dropped.
+        Points beyond 'max_lambda' or below zero, where traces overshoot
+        their ends, are only kept next to new points.
+        """
+        merged = None
+        for points in branches:
+            points = numpy.array(points, dtype=float)
+            new = points[:, -1] >= 0.0
+            if max_lambda is not None:
+                new &= points[:, -1] <= max_lambda
+            if merged is not None:
+                new &= numpy.array([ not merged._covers(p, tol) for p in points ])
+            # Keep each run of new points, joined to the points adjacent
+            # to it, so no gap is left where the branch leaves another
+            edges = numpy.diff(numpy.concatenate([ [ 0 ], new.astype(int), [ 0 ] ]))
+            for (start, stop) in zip(numpy.nonzero(edges == 1)[0],
+                                     numpy.nonzero(edges == -1)[0]):
+                try:
+                    part = cls.from_points(game, points[max(start-1, 0):stop+1])
+                except ValueError:
+                    continue
+                if merged is None:
+                    merged = part
+                else:
+                    merged = cls(game, numpy.vstack([ merged.data, part.data ]))
+        if merged is None:
+            raise ValueError("a correspondence requires at least two points")
+        return merged
+
+    @classmethod
+    def load(cls, file, game=None, mmap_mode=None):
+        """
+        Load a correspondence saved by save() from 'file'.  If 'game' is
+        not given, only probabilities_at() can be used, and interpolated
+        points are not corrected.  'mmap_mode' is passed to numpy.load(),
+        so that the file can be memory-mapped rather than read.
+        """
+        return cls(game, numpy.load(file, mmap_mode=mmap_mode))
+
+    def save(self, file):
+        """Save the correspondence to 'file' in the .npy format."""
+        numpy.save(file, numpy.asarray(self.data))
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    @property
+    def lambdas(self):
+        """The values of lambda at the stored points."""
+        return self.data[:, self.n+1]
+
+    @property
+    def branches(self):
+        """The branches stored, each as a QRECorrespondence."""
+        starts = list(numpy.nonzero(self.data[:, 0] == 0.0)[0]) + [ len(self) ]
+        return [ QRECorrespondence(self.game, self.data[a:b])
+                 for (a, b) in zip(starts[:-1], starts[1:]) ]
+
+    def _segments(self, lam):
+        # Returns the indices of all segments on which a branch passes
+        # through 'lam'.  Segments joining the end of one branch to the
+        # start of the next are excluded.
+        lambdas = numpy.asarray(self.lambdas)
+        found = (((lambdas[:-1] - lam) * (lambdas[1:] - lam) <= 0.0) &
+                 (numpy.asarray(self.data[1:, 0]) > 0.0))
+        # A stored point at 'lam' lies on the segments either side of it
+        found[1:] &= ~(found[:-1] & (lambdas[1:-1] == lam))
+        return numpy.nonzero(found)[0]
+
+    def _segment(self, lam):
+        # Returns the index of the first segment on which the branch
+        # passes through 'lam'
+        lambdas = self.lambdas
+        if self._monotone:
+            if lam < lambdas[0] or lam > lambdas[-1]:
+                raise ValueError("lambda %f is outside the traced branch" % lam)
+            return min(max(numpy.searchsorted(lambdas, lam) - 1, 0),
+                       len(lambdas) - 2)
+        crossing = self._segments(lam)
+        if len(crossing) == 0:
+            raise ValueError("lambda %f is outside the traced branch" % lam)
+        return crossing[0]
+
+    def _covers(self, point, tol):
+        # Returns whether 'point' is within 'tol' of a stored branch
+        # at the same lambda, once both are moved onto the correspondence
+        try:
+            with numpy.errstate(over='ignore', invalid='ignore'):
+                point, converged = _solve_at_lambda(self._equations, point)
+            # A point which cannot be moved onto the correspondence is
+            # not compared with the stored branches
+            if not converged or not numpy.all(numpy.isfinite(point)):
+                return False
+            for k in self._segments(point[-1]):
+                other = self._point_at(point[-1], k)
+                if numpy.abs(numpy.exp(other[:-1]) -
+                             numpy.exp(point[:-1])).max() < tol:
+                    return True
+        except numpy.linalg.LinAlgError:
+            pass
+        return False
+
+    def _point_at(self, lam, k=None):
+        if k is None:
+            k = self._segment(lam)
+        n = self.n
+        rows = numpy.asarray(self.data[k:k+2])
+        p0, p1 = rows[0, 1:n+2], rows[1, 1:n+2]
+        t0, t1 = rows[0, n+2:], rows[1, n+2:]
+
+        # Find the parameter u at which the Hermite cubic reaches 'lam',
+        # by false position, halving the value kept at the end which
+        # is not moved (the Illinois method) so both ends converge
+        lo, hi = 0.0, 1.0
+        f_lo, f_hi = p0[-1] - lam, p1[-1] - lam
+        u = f_lo / (f_lo - f_hi) if f_lo != f_hi else 0.5
+        side = 0
+        for it in xrange(100):
+            point = pctrace.hermite(p0, p1, t0, t1, u)
+            f = point[-1] - lam
+            if abs(f) < 1.0e-14 or hi - lo < 1.0e-15:
+                break
+            if (f < 0.0) == (f_lo < 0.0):
+                lo, f_lo = u, f
+                if side == -1:
+                    f_hi *= 0.5
+                side = -1
+            else:
+                hi, f_hi = u, f
+                if side == 1:
+                    f_lo *= 0.5
+                side = 1
+            u = (lo * f_hi - hi * f_lo) / (f_hi - f_lo)
+        point[-1] = lam
+
+        if self._equations is not None:
+            # The Newton steps may not converge, for instance where the
+            # branch is nearly vertical; the interpolated point is then
+            # returned as it is
+            try:
+                with numpy.errstate(over='ignore', invalid='ignore'):
+                    corrected, converged = _solve_at_lambda(self._equations,
+                                                            point)
+            except numpy.linalg.LinAlgError:
+                converged = False
+            if converged and numpy.all(numpy.isfinite(corrected)):
+                point = corrected
+        return point
+
+    def probabilities_at(self, lam):
+        """
+        Returns the probabilities of the strategies in the QRE at 'lam',
+        as an array, on the first part of a branch through 'lam'.
+        """
+        return numpy.exp(self._point_at(lam)[:-1])
+
+    def at_lambda(self, lam):
+        """
+        Returns the LogitQRE at 'lam', on the first part of a branch
+        through 'lam'.
+        """
+        if self.game is None:
+            raise ValueError("the game is required to construct profiles")
+        return LogitQRE(lam, self.game.mixed_strategy_profile(point=self.probabilities_at(lam)))
+
+    def all_at_lambda(self, lam):
+        """
+        Returns the list of LogitQRE at 'lam', one for each part of each
+        branch through 'lam', in the order in which they are stored.
+        """
+        if self.game is None:
+            raise ValueError("the game is required to construct profiles")
+        return [ LogitQRE(lam, self.game.mixed_strategy_profile(point=numpy.exp(self._point_at(lam, k)[:-1])))
+                 for k in self._segments(lam) ]
+
+
 class StrategicQREPathTracer(object):
     """
     Compute the principal branch of the logit QRE correspondence of 'game'.
+    Symmetric games use the equations for symmetric QRE; other games
+    are traced over the strategies of all players.
     """
     def __init__(self):
         self.h_start = 0.03
         self.max_decel = 1.1
-    
+        self.seed_lambda = 100.0
+
     def trace_strategic_path(self, game, max_lambda=1000000.0, callback=None):
         points = [ ]
         def on_step(game, points, p, callback):
@@ -125,25 +704,70 @@ class StrategicQREPathTracer(object):
             points.append(qre)
             if callback:  callback(qre)
 
-        if game.is_symmetric:
-            p = game.mixed_strategy_profile()
-
-            try:
-                pctrace.trace_path([ math.log(x) for x in p.profile ],
-                                   0.0, max_lambda,
-                                   lambda x: sym_compute_lhs(game, x),
-                                   lambda x: sym_compute_jac(game, x),
-                                   hStart=self.h_start,
-                                   maxDecel=self.max_decel,
-                                   callback=lambda p: on_step(game, points, p, callback),
-                                   crit=None,
-                                   maxIter=100)
-            except KeyboardInterrupt:
-                pass
-
-            return points
+        equations, start = _logit_equations(game)
+        try:
+            pctrace.trace_path(start, 0.0, max_lambda,
+                               equations.lhs,
+                               equations.jac,
+                               hStart=self.h_start,
+                               maxDecel=self.max_decel,
+                               callback=lambda p: on_step(game, points, p, callback),
+                               crit=None,
+                               maxIter=100)
+        except KeyboardInterrupt:
+            pass
+
+        return points
+
+    def trace_correspondence(self, game, max_lambda=1000000.0,
+                             profiles=(), random_starts=0, workers=None,
+                             seed=None):
+        """
+        Trace the principal branch up to 'max_lambda' once, returning
+        it as a QRECorrespondence.
+
+        Other branches are found by also tracing through the QRE near
+        each of the mixed strategy 'profiles', such as Nash equilibria
+        found by the solvers in gambit.nash, at lambda = seed_lambda,
+        and through QRE found from 'random_starts' random interior
+        profiles, at random lambda up to seed_lambda.  The random
+        profiles are drawn using 'seed'.  Each branch is traced in both
+        directions from its seed, in a pool of 'workers' processes (by
+        default, one per CPU), and the parts of branches traced more
+        than once are only kept the first time, with the principal
+        branch first.
+        """
+        equations, start = _logit_equations(game)
+        seeds = [ numpy.append(start, 0.0) ]
+        seed_lambda = min(self.seed_lambda, 0.5 * max_lambda)
+        for profile in profiles:
+            probs = numpy.array([ profile[i] for i in xrange(len(profile)) ],
+                                dtype=float)
+            seeds.append(_logit_response(equations, probs, seed_lambda))
+        rng = numpy.random.RandomState(seed)
+        offsets = equations.offsets
+        for i in xrange(random_starts):
+            probs = numpy.concatenate([ rng.dirichlet(numpy.ones(last-first))
+                                        for (first, last) in zip(offsets[:-1],
+                                                                 offsets[1:]) ])
+            lam = math.exp(rng.uniform(0.0, math.log(seed_lambda)))
+            seeds.append(_logit_response(equations, probs, lam))
+
+        tasks = [ (equations, point, max_lambda, self.h_start, self.max_decel)
+                  for point in seeds ]
+        if len(tasks) == 1 or workers == 1:
+            branches = map(_trace_branch, tasks)
         else:
-            raise NotImplementedError
+            pool = multiprocessing.Pool(workers)
+            try:
+                branches = pool.map(_trace_branch, tasks, 1)
+            finally:
+                pool.close()
+                pool.join()
+        return QRECorrespondence.from_branches(game,
+                                               [ b for b in branches
+                                                 if b is not None ],
+                                               max_lambda=max_lambda)
 
     def compute_at_lambda(self, game, lam, callback=None):
         if callback is not None:
@@ -152,21 +776,16 @@ class StrategicQREPathTracer(object):
         else:
             on_step = None
 
-        if game.is_symmetric:
-            p = game.mixed_strategy_profile()
-
-            point = pctrace.trace_path([ math.log(x) for x in p.profile ],
-                                       0.0, 1000000.0,
-                                       lambda x: sym_compute_lhs(game, x),
-                                       lambda x: sym_compute_jac(game, x),
-                                       crit=lambda x,t: x[-1] - lam,
-                                       callback=on_step,
-                                       maxIter=100)
+        equations, start = _logit_equations(game)
+        point = pctrace.trace_path(start, 0.0, 1000000.0,
+                                   equations.lhs,
+                                   equations.jac,
+                                   crit=lambda x,t: x[-1] - lam,
+                                   callback=on_step,
+                                   maxIter=100)
 
-            return LogitQRE(point[-1],
-                            game.mixed_strategy_profile(point=[math.exp(x) for x in point[:-1]]))
-        else:
-            raise NotImplementedError
+        return LogitQRE(point[-1],
+                        game.mixed_strategy_profile(point=[math.exp(x) for x in point[:-1]]))
 
     def compute_max_like(self, game, data):
         log_like = lambda data, profile: \
@@ -174,23 +793,69 @@ class StrategicQREPathTracer(object):
         diff_log_like = lambda data, point, tangent: \
                         sum([ x*y for (x, y) in zip(data, tangent[:-1]) ])
 
-        if game.is_symmetric:
-            p = game.mixed_strategy_profile()
+        equations, start = _logit_equations(game)
+        point = pctrace.trace_path(start, 0.0, 1000000.0,
+                                   equations.lhs,
+                                   equations.jac,
+                                   hStart=1.0,
+                                   crit=lambda x,t: diff_log_like(data,x,t),
+                                   maxIter=100)
 
-            point = pctrace.trace_path([ math.log(x) for x in p.profile ],
-                                       0.0, 1000000.0,
-                                       lambda x: sym_compute_lhs(game, x),
-                                       lambda x: sym_compute_jac(game, x),
-                                       hStart=1.0,
-                                       crit=lambda x,t: diff_log_like(data,x,t),
-                                       maxIter=100)
+        qre = LogitQRE(point[-1],
+                       game.mixed_strategy_profile(point=[math.exp(x) for x in point[:-1]]))
+        qre.logL = log_like(data, qre)
+        return qre
 
+    def compute_max_like_batch(self, game, datasets, max_lambda=1000000.0,
+                               workers=None):
+        """
+        Find the logit QRE on the principal branch which maximizes the
+        likelihood of each of 'datasets', each giving the number of
+        observations of each strategy.
+
+        The branch is traced once, up to 'max_lambda', and each point
+        found is kept as a checkpoint.  The log-likelihoods of all
+        datasets at all checkpoints are computed together, and the
+        maximizer for each dataset is then refined along the branch
+        between the checkpoints adjacent to its best one.  The
+        refinements are carried out in a pool of 'workers' processes
+        (by default, one per CPU).
+
+        Returns a list of LogitQRE, one per dataset, each with the
+        attribute logL giving the log-likelihood of the dataset.
+        """
+        equations, start = _logit_equations(game)
+        checkpoints = [ ]
+        pctrace.trace_path(start, 0.0, max_lambda,
+                           equations.lhs,
+                           equations.jac,
+                           hStart=self.h_start,
+                           maxDecel=self.max_decel,
+                           callback=lambda p: checkpoints.append(numpy.array(p)),
+                           maxIter=100)
+        checkpoints = numpy.array(checkpoints)
+        data = numpy.array(datasets, dtype=float)
+        best = numpy.dot(data, checkpoints[:, :-1].transpose()).argmax(axis=1)
+
+        tasks = [ (equations, checkpoints[max(k-1, 0):k+2], counts)
+                  for (k, counts) in zip(best, data) ]
+        if len(tasks) <= 1 or workers == 1:
+            points = map(_refine_fit, tasks)
+        else:
+            pool = multiprocessing.Pool(workers)
+            try:
+                points = pool.map(_refine_fit, tasks, 1)
+            finally:
+                pool.close()
+                pool.join()
+
+        results = [ ]
+        for (point, counts) in zip(points, data):
             qre = LogitQRE(point[-1],
                            game.mixed_strategy_profile(point=[math.exp(x) for x in point[:-1]]))
-            qre.logL = log_like(data, qre)
-            return qre
-        else:
-            raise NotImplementedError
+            qre.logL = numpy.dot(counts, point[:-1])
+            results.append(qre)
+        return results
 
     def compute_fit_sshist(self, game, data, callback=None):
         """
@@ -202,22 +867,18 @@ class StrategicQREPathTracer(object):
             return 2.0 * sum([ (math.exp(p)-d) * t * math.exp(p)
                                for (p, t, d) in zip(point, tangent, data) ])
 
-        if game.is_symmetric:
-            p = game.mixed_strategy_profile()
-            point = pctrace.trace_path([ math.log(x) for x in p.profile ],
-                                       0.0, 1000000.0,
-                                       lambda x: sym_compute_lhs(game, x),
-                                       lambda x: sym_compute_jac(game, x),
-                                       hStart=1.0,
-                                       crit=lambda x,t: diff_dist(data,x,t),
-                                       maxIter=100,
-                                       callback=callback)
+        equations, start = _logit_equations(game)
+        point = pctrace.trace_path(start, 0.0, 1000000.0,
+                                   equations.lhs,
+                                   equations.jac,
+                                   hStart=1.0,
+                                   crit=lambda x,t: diff_dist(data,x,t),
+                                   maxIter=100,
+                                   callback=callback)
 
-            qre = LogitQRE(point[-1],
-                           game.mixed_strategy_profile(point=[math.exp(x) for x in point[:-1]]))
-            return qre
-        else:
-            raise NotImplementedError
+        qre = LogitQRE(point[-1],
+                       game.mixed_strategy_profile(point=[math.exp(x) for x in point[:-1]]))
+        return qre
 
 
     def compute_criterion(self, game, f):
@@ -228,22 +889,17 @@ class StrategicQREPathTracer(object):
             """
             return f(LogitQRE(x[-1],
                               game.mixed_strategy_profile(point=[math.exp(z) for z in x[:-1]])))
-            
-        if game.is_symmetric:
-            p = game.mixed_strategy_profile()
-
-            point = pctrace.trace_path([ math.log(x) for x in p.profile ],
-                                       0.0, 1000000.0,
-                                       lambda x: sym_compute_lhs(game, x),
-                                       lambda x: sym_compute_jac(game, x),
-                                       hStart=1.0,
-                                       crit=criterion_wrap,
-                                       maxIter=100)
-
-            return LogitQRE(point[-1],
-                            game.mixed_strategy_profile(point=[math.exp(x) for x in point[:-1]]))
-        else:
-            raise NotImplementedError
+
+        equations, start = _logit_equations(game)
+        point = pctrace.trace_path(start, 0.0, 1000000.0,
+                                   equations.lhs,
+                                   equations.jac,
+                                   hStart=1.0,
+                                   crit=criterion_wrap,
+                                   maxIter=100)
+
+        return LogitQRE(point[-1],
+                        game.mixed_strategy_profile(point=[math.exp(x) for x in point[:-1]]))
         
 
 from nash import ExternalSolver
@@ -1,4 +1,6 @@
 import gambit
+import fractions
+import decimal
 import nose.tools
 
 
@@ -81,3 +83,59 @@ class TestGambitNfgFile(object):
         nose.tools.assert_equal(str(e.exception),
                                 "line 1:73: Not enough players for number of strategy entries")
 
+
+
+class TestGambitBinaryFile(object):
+    def setUp(self):
+        self.efg = gambit.Game.read_game("../../../../contrib/games/e02.efg")
+        self.nfg = gambit.Game.read_game("../../../../contrib/games/e02.nfg")
+
+    def tearDown(self):
+        pass
+
+    def test_binary_roundtrip_efg(self):
+        data = self.efg.write(format='binary')
+        game = gambit.Game.parse_game(data)
+        assert game.is_tree
+        nose.tools.assert_equal(game.write(), self.efg.write())
+
+    def test_binary_roundtrip_nfg(self):
+        data = self.nfg.write(format='binary')
+        game = gambit.Game.parse_game(data)
+        assert not game.is_tree
+        nose.tools.assert_equal(game.write(), self.nfg.write())
+
+    def test_binary_truncated(self):
+        data = self.efg.write(format='binary')
+        with nose.tools.assert_raises(IOError) as e:
+            gambit.Game.parse_game(data[:-3])
+        nose.tools.assert_equal(str(e.exception),
+                                "Unexpected end of binary game data")
+
+    def _roundtrip_payoffs(self, payoffs):
+        game = gambit.Game.new_table([2, 2])
+        for (outcome, payoff) in zip(game.outcomes, payoffs):
+            outcome[0] = payoff
+            outcome[1] = -payoff
+        copy = gambit.Game.parse_game(game.write(format='binary'))
+        for (outcome, payoff) in zip(copy.outcomes, payoffs):
+            nose.tools.assert_equal(fractions.Fraction(str(outcome[0])),
+                                    fractions.Fraction(str(payoff)))
+            nose.tools.assert_equal(fractions.Fraction(str(outcome[1])),
+                                    -fractions.Fraction(str(payoff)))
+
+    def test_binary_roundtrip_large(self):
+        self._roundtrip_payoffs([ 2**31-1, -2**31, 2**32, -2**40 ])
+        self._roundtrip_payoffs([ fractions.Fraction(1, 2**31-1),
+                                  fractions.Fraction(2**40, 3),
+                                  fractions.Fraction(7, 2**32),
+                                  10**30 ])
+
+    def test_binary_roundtrip_float(self):
+        self._roundtrip_payoffs([ 0.1, 2.5, -1e-7, 1e20 ])
+
+    def test_binary_roundtrip_decimal(self):
+        self._roundtrip_payoffs([ decimal.Decimal('0.123456789012'),
+                                  decimal.Decimal('-2.5'),
+                                  decimal.Decimal('1'),
+                                  decimal.Decimal('0.001') ])
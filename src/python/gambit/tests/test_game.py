@@ -1,5 +1,7 @@
 import gambit
+import decimal
 import fractions
+import numpy
 import nose.tools
 from nose.tools import assert_raises
 from gambit.lib.error import UndefinedOperationError
@@ -160,3 +162,179 @@ class TestGambitGame(object):
         s = g.players[0].strategies[0]
         g.root.append_move(g.players[0], 2)
         s.number
+
+    def test_game_from_arrays_integer(self):
+        "Test creating a strategic game from integer payoff arrays"
+        m = numpy.array([ [ 8, 2 ], [ 10, 5 ] ])
+        game = gambit.Game.from_arrays(m, numpy.transpose(m))
+        assert game[1,0][0] == 10
+        assert game[1,0][1] == 2
+        assert game[0,1][0] == 2
+        assert game[0,1][1] == 10
+
+    def test_game_from_arrays_float(self):
+        "Test creating a strategic game from floating-point payoff arrays"
+        m = numpy.array([ [ 0.5, 2.25 ], [ 1.0, -3.5 ] ])
+        game = gambit.Game.from_arrays(m, -m)
+        assert float(game[0,1][0]) == 2.25
+        assert float(game[1,1][1]) == 3.5
+
+    def test_game_from_arrays_rational(self):
+        "Test creating a strategic game from arrays of rational payoffs"
+        m = numpy.array([ [ fractions.Fraction(1,3), 2 ],
+                          [ fractions.Fraction(10**30, 7), 5 ] ],
+                        dtype=object)
+        game = gambit.Game.from_arrays(m, m)
+        assert game[0,0][0] == fractions.Fraction(1,3)
+        assert game[1,0][1] == fractions.Fraction(10**30, 7)
+
+    def test_game_from_arrays_wide_integer(self):
+        "Test creating a strategic game from integers wider than 32 bits"
+        m = numpy.array([ [ 2**40, -2**35 ], [ 2**31-1, 2**32 ] ],
+                        dtype=numpy.int64)
+        game = gambit.Game.from_arrays(m, -m)
+        assert game[0,0][0] == 2**40
+        assert game[0,1][1] == 2**35
+        assert game[1,0][0] == 2**31-1
+        assert game[1,1][1] == -2**32
+        u = numpy.array([ [ 2**64-1, 0 ], [ 2**63, 1 ] ], dtype=numpy.uint64)
+        game = gambit.Game.from_arrays(u, u)
+        assert game[0,0][0] == 2**64-1
+        assert game[1,0][1] == 2**63
+        assert game[1,1][0] == 1
+
+    def test_game_from_arrays_float_text(self):
+        "Test that floating-point payoffs are stored as their shortest text"
+        m = numpy.array([ [ 0.1, 1.0/3 ], [ 1e-300, -2.5e20 ] ])
+        game = gambit.Game.from_arrays(m, m)
+        for (i, j) in [ (0,0), (0,1), (1,0), (1,1) ]:
+            assert fractions.Fraction(str(game[i,j][0])) == \
+                   fractions.Fraction(repr(m[i,j]))
+        assert "{ \"\" 0.1, 0.1 }" in game.write()
+        assert game.payoff_tensor(0, dtype=object)[0,0] == \
+               fractions.Fraction(1, 10)
+        copy = gambit.Game.parse_game(game.write())
+        assert fractions.Fraction(str(copy[0,0][0])) == \
+               fractions.Fraction(1, 10)
+
+    def test_game_from_arrays_non_finite(self):
+        "Test that infinite and NaN payoffs are rejected"
+        m = numpy.array([ [ 0.0, 1.0 ], [ 2.0, 3.0 ] ])
+        for value in [ float('nan'), float('inf'), float('-inf') ]:
+            bad = m.copy()
+            bad[1,0] = value
+            assert_raises(ValueError, gambit.Game.from_arrays, bad, m)
+        bad = numpy.array([ [ 0, decimal.Decimal('NaN') ], [ 2, 3 ] ],
+                          dtype=object)
+        assert_raises(ValueError, gambit.Game.from_arrays, m, bad)
+
+    def test_game_from_arrays_three_players(self):
+        "Test creating a three-player strategic game from payoff arrays"
+        arrays = [ numpy.arange(24).reshape((2,3,4)) * (pl+1)
+                   for pl in xrange(3) ]
+        game = gambit.Game.from_arrays(*arrays)
+        for pl in xrange(3):
+            assert game[1,2,3][pl] == arrays[pl][1,2,3]
+            assert game[0,1,2][pl] == arrays[pl][0,1,2]
+
+    def test_game_payoff_tensor(self):
+        "Test reading the payoffs of a player as an array"
+        arrays = [ numpy.arange(24).reshape((2,3,4)) * (pl+1)
+                   for pl in xrange(3) ]
+        game = gambit.Game.from_arrays(*arrays)
+        for pl in xrange(3):
+            assert (game.payoff_tensor(pl) == arrays[pl]).all()
+        tensors = game.payoff_tensors(dtype=object)
+        assert tensors[1][1,2,3] == fractions.Fraction(46)
+
+    def test_game_payoff_tensor_changed(self):
+        "Test that the payoff tensor reflects changes to the payoffs"
+        m = numpy.array([ [ 8, 2 ], [ 10, 5 ] ])
+        game = gambit.Game.from_arrays(m, numpy.transpose(m))
+        assert game.payoff_tensor(game.players[1])[1,0] == 2.0
+        game[1,0][1] = 100
+        assert game.payoff_tensor(game.players[1])[1,0] == 100.0
+
+    def test_game_payoff_tensor_cache(self):
+        "Test that a cached payoff tensor is read-only and reused"
+        m = numpy.array([ [ 8, 2 ], [ 10, 5 ] ])
+        game = gambit.Game.from_arrays(m, numpy.transpose(m))
+        t = game.payoff_tensor(1, cache=True)
+        assert (t == numpy.transpose(m)).all()
+        assert game.payoff_tensor(1, cache=True) is t
+        assert game.payoff_tensor(1) is not t
+        assert game.payoff_tensor(1, dtype=object, cache=True) is not t
+        assert_raises(ValueError, t.__setitem__, (0, 0), 1.0)
+        assert game.payoff_tensors(cache=True)[1] is t
+
+    def test_game_payoff_tensor_cache_stale(self):
+        "Test that a cached payoff tensor is not returned once payoffs change"
+        m = numpy.array([ [ 8, 2 ], [ 10, 5 ] ])
+        game = gambit.Game.from_arrays(m, numpy.transpose(m))
+        t = game.payoff_tensor(1, cache=True)
+        # Through an outcome, reached via another object for the game
+        game.outcomes[0].game.outcomes[1][1] = 100
+        t = game.payoff_tensor(1, cache=True)
+        assert t[1,0] == 100.0
+        game.outcomes.set_payoffs([ (1, (0, 50)) ])
+        t = game.payoff_tensor(1, cache=True)
+        assert t[1,0] == 50.0
+        assert game.payoff_tensor(1, dtype=object, cache=True)[1,0] == 50
+        game.outcomes[1].delete()
+        t = game.payoff_tensor(1, cache=True)
+        assert t[1,0] == 0.0
+        game.players[0].strategies.add("new")
+        t = game.payoff_tensor(1, cache=True)
+        assert t.shape == (3, 2)
+        # Loading the payoffs of another game leaves those of this one,
+        # but the tensors are still computed again
+        gambit.Game.from_arrays(m, m)
+        assert game.payoff_tensor(1, cache=True) is not t
+        assert (game.payoff_tensor(1, cache=True) == t).all()
+
+    def test_game_payoff_tensor_tree(self):
+        "Test reading the payoff tensor of an extensive game"
+        t = self.extensive_game.payoff_tensor(0)
+        assert t.shape == tuple(len(p.strategies)
+                                for p in self.extensive_game.players)
+        # Tensors of extensive games are not cached
+        t = self.extensive_game.payoff_tensor(0, cache=True)
+        assert t.flags.writeable
+        assert self.extensive_game.payoff_tensor(0, cache=True) is not t
+
+    def test_game_strategy_values_batch(self):
+        "Test computing strategy values for a batch of profiles"
+        game = gambit.Game.from_arrays(numpy.array([ [ 1, 2 ], [ 3, 4 ] ]),
+                                       numpy.array([ [ 5, 6 ], [ 7, 8 ] ]))
+        profiles = numpy.array([ [ 0.5, 0.5, 0.5, 0.5 ],
+                                 [ 1.0, 0.0, 0.25, 0.75 ] ])
+        values = game.strategy_values_batch(profiles)
+        assert values.shape == (2, 4)
+        assert (values[0] == numpy.array([ 1.5, 3.5, 6.0, 7.0 ])).all()
+        assert (values[1] == numpy.array([ 1.75, 3.75, 5.0, 6.0 ])).all()
+        assert_raises(ValueError, game.strategy_values_batch,
+                      numpy.zeros((2, 3)))
+
+    def test_game_fingerprint(self):
+        "Test that fingerprints depend on payoffs but not on labels"
+        m = numpy.array([ [ 8, 2 ], [ 10, 5 ] ])
+        game = gambit.Game.from_arrays(m, numpy.transpose(m))
+        copy = gambit.Game.from_arrays(m, numpy.transpose(m))
+        copy.title = "A copy"
+        copy.players[0].strategies[0].label = "Cooperate"
+        assert game.fingerprint() == copy.fingerprint()
+        assert hash(game) != hash(copy)
+        copy[0,0][0] = 9
+        assert game.fingerprint() != copy.fingerprint()
+        assert self.extensive_game.fingerprint() == \
+               gambit.Game.read_game("test_games/basic_extensive_game.efg").fingerprint()
+
+    def test_game_fingerprint_invariant(self):
+        "Test that invariant fingerprints ignore the order of strategies and players"
+        m = numpy.array([ [ 8, 2, 0 ], [ 10, 5, 1 ] ])
+        game = gambit.Game.from_arrays(m, -m)
+        swapped = gambit.Game.from_arrays(numpy.transpose(-m), numpy.transpose(m))
+        permuted = gambit.Game.from_arrays(m[::-1], -m[::-1])
+        assert game.fingerprint() != permuted.fingerprint()
+        assert game.fingerprint(invariant=True) == permuted.fingerprint(invariant=True)
+        assert game.fingerprint(invariant=True) == swapped.fingerprint(invariant=True)
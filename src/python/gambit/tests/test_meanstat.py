@@ -0,0 +1,185 @@
+import gambit
+import gambit.games.meanstat
+import gambit.games.contest
+import gambit.games.public
+import fractions
+import itertools
+import numpy
+
+
+def _direct_sum_dist(K, prob):
+    # Returns the distribution of the sum of K choices from 'prob',
+    # convolving it in one choice at a time
+    dist = numpy.ones(1)
+    for i in xrange(K):
+        dist = numpy.convolve(dist, prob)
+    return dist
+
+
+class TestGambitSumDistribution(object):
+    def setUp(self):
+        self.rng = numpy.random.RandomState(0)
+
+    def test_sum_dist(self):
+        "Test the distribution of a sum of choices against direct convolution"
+        prob = self.rng.dirichlet(numpy.ones(5))
+        for K in xrange(8):
+            dist = gambit.games.meanstat.sum_dist(K, prob)
+            assert dist.shape == (4*K+1,)
+            assert numpy.abs(dist - _direct_sum_dist(K, prob)).max() < 1.0e-15
+
+    def test_sum_dist_fft(self):
+        "Test the distribution of a sum of many choices against direct convolution"
+        prob = self.rng.dirichlet(numpy.ones(100))
+        for K in (1, 2, 3, 6):
+            dist = gambit.games.meanstat.sum_dist(K, prob)
+            assert (dist >= 0.0).all()
+            assert abs(dist.sum() - 1.0) < 1.0e-12
+            assert numpy.abs(dist - _direct_sum_dist(K, prob)).max() < 1.0e-15
+
+    def test_sum_dist_exact(self):
+        "Test the distribution of a sum of choices with exact probabilities"
+        prob = numpy.array([ fractions.Fraction(1, 2), fractions.Fraction(1, 3),
+                             fractions.Fraction(1, 6) ], dtype=object)
+        dist = gambit.games.meanstat.sum_dist(5, prob)
+        expected = numpy.array([ 1 ], dtype=object)
+        for i in xrange(5):
+            expected = numpy.convolve(expected, prob)
+        assert list(dist) == list(expected)
+        assert sum(dist) == 1
+        assert list(gambit.games.meanstat.sum_dist(2, [ 1, 1 ])) == [ 1.0, 2.0, 1.0 ]
+
+    def test_others_dist(self):
+        "Test the distribution of the sum of the other players' choices"
+        game = gambit.games.contest.TullockGame(4, 0, 6, 1, 10, 5)
+        profile = game.mixed_strategy_profile()
+        profile.profile = list(self.rng.dirichlet(numpy.ones(7)))
+        dist = profile.others_dist(3)
+        assert numpy.abs(dist - _direct_sum_dist(3, profile.profile)).max() < 1.0e-15
+        assert profile.others_dist(3) is dist
+        # Changing the profile discards the distributions computed for it
+        profile[0], profile[1] = profile[1], profile[0]
+        assert numpy.abs(profile.others_dist(3) -
+                         _direct_sum_dist(3, profile.profile)).max() < 1.0e-15
+
+
+class TestGambitMeanStatisticPayoffs(object):
+    def setUp(self):
+        self.games = [ gambit.games.contest.TullockGame(3, 0, 4, 1, 10, 5),
+                       gambit.games.contest.TullockGame(4, 1, 9, 2, 20, 10,
+                                                        cost=lambda e: 0.5*e*e),
+                       gambit.games.contest.GeneralTullockGame(0, 5, 1, 10, 5,
+                                                               r=0.0),
+                       gambit.games.contest.GeneralTullockGame(0, 5, 1, 10, 5,
+                                                               r=2.0),
+                       gambit.games.public.CobbDouglasVCGame(3, 0, 8, 2, 10, 0.3),
+                       gambit.games.public.QuadraticVCGame(4, 0, 6, 1, 10, 2, 0.5) ]
+
+    def tearDown(self):
+        del self.games
+
+    def _assert_close(self, values, expected):
+        expected = numpy.array(expected, dtype=float)
+        assert values.dtype == float and values.shape == expected.shape
+        assert (numpy.abs(values - expected) <=
+                1.0e-13 * numpy.maximum(1.0, numpy.abs(expected))).all()
+
+    def test_payoff_kernel(self):
+        "Test the table of payoffs by own choice and statistic"
+        for game in self.games:
+            self._assert_close(game.payoff_kernel,
+                               [ [ float(game.payoff(c, s))
+                                   for s in game.statistics ]
+                                 for c in game.choices ])
+            assert game.payoff_kernel is game.payoff_kernel
+
+    def test_payoff_kernel_deriv(self):
+        "Test the table of payoffs used in computing derivatives"
+        for game in self.games:
+            self._assert_close(game.payoff_kernel_deriv,
+                               [ [ float(game.payoff(c, s + game.choices[0]))
+                                   for s in game.statistics ]
+                                 for c in game.choices ])
+
+    def test_payoff_array(self):
+        "Test evaluating the payoffs over arrays against the scalar payoff"
+        for game in self.games:
+            own = numpy.array(game.choices)
+            others = numpy.array(game.statistics)
+            expected = [ [ float(game.payoff(int(c), int(s))) for s in others ]
+                         for c in own ]
+            own, others = own[:, numpy.newaxis], others[numpy.newaxis, :]
+            self._assert_close(game.payoff_array(own, others), expected)
+            # The default implementation calls payoff() for each entry
+            default = gambit.games.meanstat.MeanStatisticGame.payoff_array
+            self._assert_close(default(game, own, others), expected)
+            own, others = own[:, 0], others[0]
+            self._assert_close(game.payoff_array(own, others[0]),
+                               [ row[0] for row in expected ])
+
+
+class TestGambitMeanStatisticTable(object):
+    def setUp(self):
+        self.games = [ gambit.games.contest.TullockGame(3, 0, 4, 1, 10, 5),
+                       gambit.games.contest.TullockGame(3, 1, 9, 2, 20, 10),
+                       gambit.games.public.QuadraticVCGame(2, 0, 6, 2, 10, 2, 0.5) ]
+
+    def tearDown(self):
+        del self.games
+
+    def _pure_profile(self, table, key):
+        # Returns the mixed strategy profile on 'table' in which the
+        # players choose the strategies indexed by 'key'
+        profile = table.mixed_strategy_profile()
+        for (player, st) in zip(table.players, key):
+            for (i, strategy) in enumerate(player.strategies):
+                profile[strategy] = 1.0 if i == st else 0.0
+        return profile
+
+    def test_to_table(self):
+        "Test the payoffs of the strategic-form table of the game"
+        for game in self.games:
+            table = game.to_table()
+            assert table.title == game.title
+            assert len(table.players) == game.N
+            for player in table.players:
+                assert [ s.label for s in player.strategies ] == game.labels
+            for key in itertools.product(range(len(game.choices)),
+                                         repeat=game.N):
+                for pl in xrange(game.N):
+                    assert fractions.Fraction(str(table[key][pl])) == \
+                           fractions.Fraction(str(game[key][pl]))
+
+    def test_to_table_compact(self):
+        "Test the payoffs of the action graph game equivalent to the game"
+        for game in self.games:
+            kernel = numpy.array([ [ game.payoff(c, s) for s in game.statistics ]
+                                   for c in game.choices ])
+            text = game._agg_text(kernel)
+            assert text.startswith("#AGG\n")
+            assert gambit.Game.parse_game(text).write() == \
+                   game.to_table(compact=True).write()
+            table = game.to_table(compact=True)
+            assert len(table.players) == game.N
+            for player in table.players:
+                assert len(player.strategies) == len(game.choices)
+            for key in itertools.product(range(len(game.choices)),
+                                         repeat=game.N):
+                profile = self._pure_profile(table, key)
+                for pl in xrange(game.N):
+                    assert abs(profile.payoff(table.players[pl]) -
+                               float(game[key][pl])) < 1.0e-12
+
+    def test_to_table_compact_mixed(self):
+        "Test the payoffs of mixed profiles in both tables of the game"
+        rng = numpy.random.RandomState(0)
+        for game in self.games:
+            full = game.to_table()
+            compact = game.to_table(compact=True)
+            probs = numpy.concatenate([ rng.dirichlet(numpy.ones(len(game.choices)))
+                                        for pl in xrange(game.N) ])
+            p = full.mixed_strategy_profile(point=probs, rational=False)
+            q = compact.mixed_strategy_profile(point=probs, rational=False)
+            for pl in xrange(game.N):
+                assert abs(p.payoff(full.players[pl]) -
+                           q.payoff(compact.players[pl])) < 1.0e-12
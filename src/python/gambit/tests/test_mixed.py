@@ -1,5 +1,6 @@
 import gambit
 import fractions
+import numpy
 from nose.tools import assert_raises
 from gambit.lib.error import UndefinedOperationError
 
@@ -116,3 +117,37 @@ class TestGambitMixedStrategyGame(object):
         assert_raises(UndefinedOperationError, self.profile_double.as_behavior)
         assert_raises(UndefinedOperationError, self.profile_rational.as_behavior)
 
+
+    def test_profile_from_point(self):
+        "Test creating a profile from an array of probabilities"
+        point = numpy.array([ 0.25, 0.75, 0.5, 0.5 ])
+        profile = self.game.mixed_strategy_profile(point=point)
+        assert list(profile) == [ 0.25, 0.75, 0.5, 0.5 ]
+        profile = self.game.mixed_strategy_profile(rational=True,
+                                                   point=[ fractions.Fraction(1,4),
+                                                           fractions.Fraction(3,4),
+                                                           fractions.Fraction(1,2),
+                                                           fractions.Fraction(1,2) ])
+        assert profile[0] == fractions.Fraction(1,4)
+        assert_raises(ValueError, self.game.mixed_strategy_profile,
+                      point=[ 0.5, 0.5 ])
+
+    def test_profile_as_array(self):
+        "Test reading the probabilities of a profile as an array"
+        a = self.profile_double.as_array()
+        assert (a == numpy.array([ 0.5, 0.5, 0.5, 0.5 ])).all()
+        a[0] = 1.0
+        assert self.profile_double[0] == 0.5
+
+    def test_profile_buffer(self):
+        "Test that the buffer of a profile shares its probabilities"
+        view = numpy.asarray(self.profile_double)
+        view[0] = 1.0
+        assert self.profile_double[0] == 1.0
+
+    def test_profile_strategy_values_array(self):
+        "Test reading the values of all strategies as an array"
+        game = gambit.Game.from_arrays(numpy.array([ [ 1, 2 ], [ 3, 4 ] ]),
+                                       numpy.array([ [ 5, 6 ], [ 7, 8 ] ]))
+        values = game.mixed_strategy_profile().strategy_values_array()
+        assert (values == numpy.array([ 1.5, 3.5, 6.0, 7.0 ])).all()
@@ -0,0 +1,438 @@
+import gambit
+import gambit.nash
+import fractions
+import numpy
+import os
+import pipes
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+
+
+class TestGambitNativeSolvers(object):
+    def setUp(self):
+        self.nfg = gambit.Game.read_game("../../../../contrib/games/e02.nfg")
+        self.efg = gambit.Game.read_game("../../../../contrib/games/e02.efg")
+
+    def tearDown(self):
+        del self.nfg
+        del self.efg
+
+    def test_solve_profiles_on_game(self):
+        "Test that equilibria are returned as profiles on the game solved"
+        solver = gambit.lib.libgambit.EnumMixedStrategySolverRational()
+        eqa = solver.solve(self.nfg)
+        assert len(eqa) == 2
+        for eqm in eqa:
+            assert eqm.game == self.nfg
+            assert eqm.liap_value() == 0
+        eqa = gambit.lib.libgambit.LCPBehaviorSolverRational().solve(self.efg)
+        assert eqa[0].game == self.efg
+        assert eqa[0][self.efg.infosets[1].actions[0]] == fractions.Fraction(1,2)
+
+    def test_solve_threads(self):
+        "Test solving copies of a game in several threads at once"
+        def solve(i):
+            game = gambit.Game.read_game("../../../../contrib/games/e02.nfg")
+            solver = gambit.lib.libgambit.EnumMixedStrategySolverRational()
+            return [ [ list(eqm) for eqm in solver.solve(game) ]
+                     for k in xrange(50) ]
+        pool = ThreadPool(4)
+        try:
+            results = pool.map(solve, xrange(4))
+        finally:
+            pool.close()
+            pool.join()
+        expected = [ list(eqm) for eqm in
+                     gambit.lib.libgambit.EnumMixedStrategySolverRational().solve(self.nfg) ]
+        for result in results:
+            assert result == [ expected ] * 50
+
+    def test_solve_iter(self):
+        "Test streaming equilibria from a native solver"
+        solver = gambit.lib.libgambit.EnumMixedStrategySolverRational()
+        eqa = list(solver.solve_iter(self.nfg))
+        assert [ list(eqm) for eqm in eqa ] == \
+               [ list(eqm) for eqm in solver.solve(self.nfg) ]
+        for eqm in eqa:
+            assert eqm.game == self.nfg
+        eqa = list(gambit.lib.libgambit.LCPBehaviorSolverDouble().solve_iter(self.efg))
+        assert len(eqa) == 1
+        assert eqa[0].game == self.efg
+
+    def test_solve_iter_close(self):
+        "Test stopping a native solver by closing its stream"
+        solver = gambit.lib.libgambit.EnumMixedStrategySolverRational()
+        stream = solver.solve_iter(self.nfg, buffer=1)
+        first = next(stream)
+        stream.close()
+        assert first.game == self.nfg
+        assert len(solver.solve(self.nfg)) == 2
+
+
+# A stand-in for a command-line tool, which reads the game and reports
+# the same equilibrium of e02.nfg 'count' times, 'delay' seconds apart,
+# then waits for 'wait' seconds before exiting
+_FAKE_TOOL = """
+import sys, time
+sys.stdin.read()
+for i in range(%(count)d):
+    sys.stdout.write("NE,1,0,0,1,0\\n")
+    sys.stdout.flush()
+    time.sleep(%(delay)f)
+time.sleep(%(wait)f)
+"""
+
+class FakeExternalSolver(gambit.nash.ExternalSolver):
+    def __init__(self, count, delay=0.0, wait=0.0, start=0.0):
+        self.script = _FAKE_TOOL % { "count": count, "delay": delay,
+                                     "wait": wait }
+        # Time to wait before starting the program when streaming
+        self.start = start
+
+    def solve(self, game, rational=True, streaming=False):
+        if streaming:
+            time.sleep(self.start)
+        command_line = " ".join(pipes.quote(arg) for arg in
+                                [ sys.executable, "-c", self.script ])
+        return self._parse_output(self.launch(command_line, game),
+                                  game, rational, streaming=streaming)
+
+
+class TestGambitExternalSolvers(object):
+    def setUp(self):
+        self.game = gambit.Game.read_game("../../../../contrib/games/e02.nfg")
+
+    def tearDown(self):
+        del self.game
+
+    def test_external_solve(self):
+        "Test reading the equilibria reported by an external program"
+        result = FakeExternalSolver(3).solve(self.game)
+        assert isinstance(result, gambit.nash.SolveResult)
+        assert result.status == "complete"
+        assert len(result) == 3
+        assert list(result[0]) == [ 1, 0, 0, 1, 0 ]
+        assert result[0].game == self.game
+
+    def test_external_max_equilibria(self):
+        "Test stopping an external program once it has reported enough equilibria"
+        solver = FakeExternalSolver(5, wait=60.0)
+        solver.max_equilibria = 2
+        start = time.time()
+        result = solver.solve(self.game)
+        assert time.time() - start < 30.0
+        assert result.status == "max_equilibria"
+        assert len(result) == 2
+
+    def test_external_time_limit(self):
+        "Test stopping an external program on reaching the time limit"
+        solver = FakeExternalSolver(1, wait=60.0)
+        solver.time_limit = 1.0
+        start = time.time()
+        result = solver.solve(self.game)
+        assert time.time() - start < 30.0
+        assert result.status == "time_limit"
+        assert len(result) == 1
+
+    def test_external_solve_iter(self):
+        "Test streaming equilibria as an external program reports them"
+        solver = FakeExternalSolver(2, delay=60.0)
+        start = time.time()
+        stream = solver.solve_iter(self.game)
+        first = next(stream)
+        stream.close()
+        assert time.time() - start < 30.0
+        assert list(first) == [ 1, 0, 0, 1, 0 ]
+        assert first.game == self.game
+        assert len(list(FakeExternalSolver(3).solve_iter(self.game))) == 3
+
+    def test_external_solve_many(self):
+        "Test running an external program on several games at once"
+        games = [ gambit.Game.read_game("../../../../contrib/games/e02.nfg")
+                  for i in xrange(4) ]
+        solver = FakeExternalSolver(1, wait=1.5)
+        try:
+            start = time.time()
+            results = solver.solve_many(games, workers=4, rational=False)
+            assert time.time() - start < 5.0
+            assert len(results) == len(games)
+            for (game, result) in zip(games, results):
+                assert result.status == "complete"
+                assert result[0].game == game
+                assert list(result[0]) == [ 1.0, 0.0, 0.0, 1.0, 0.0 ]
+                assert isinstance(result[0][0], float)
+        finally:
+            solver.close()
+
+    def test_external_solve_many_streaming(self):
+        "Test solving many games while streaming the equilibria of another"
+        solver = FakeExternalSolver(2, start=2.0)
+        streamed = [ ]
+        thread = threading.Thread(target=lambda: streamed.extend(
+            solver.solve_iter(self.game)))
+        thread.start()
+        try:
+            time.sleep(0.5)
+            results = solver.solve_many([ self.game ] * 3, workers=2)
+        finally:
+            thread.join()
+            solver.close()
+        for result in results:
+            assert isinstance(result, gambit.nash.SolveResult)
+            assert result.status == "complete" and len(result) == 2
+        assert len(streamed) == 2
+
+    def test_external_solve_many_pool(self):
+        "Test that the worker threads are kept between calls until closed"
+        solver = FakeExternalSolver(2)
+        assert len(solver.solve_many([ self.game ] * 3, workers=2)) == 3
+        pool = solver._pool
+        assert pool is not None
+        assert [ len(r) for r in solver.solve_many([ self.game ] * 2,
+                                                   workers=2) ] == [ 2, 2 ]
+        assert solver._pool is pool
+        solver.solve_many([ self.game ], workers=3)
+        assert solver._pool is not pool and solver._pool_size == 3
+        solver.close()
+        assert solver._pool is None
+        solver.close()
+        assert solver.solve_many([ ], workers=1) == [ ]
+        solver.close()
+
+
+class TestGambitSolveLimits(object):
+    def setUp(self):
+        self.game = gambit.Game.read_game("../../../../contrib/games/e02.nfg")
+
+    def tearDown(self):
+        del self.game
+
+    def test_time_limit_in_process(self):
+        "Test solving with a time limit in a separate process"
+        result = gambit.nash.enummixed_solve(self.game, time_limit=60.0)
+        assert result.status == "complete"
+        assert [ list(eqm) for eqm in result ] == \
+               [ list(eqm) for eqm in gambit.nash.enummixed_solve(self.game) ]
+        assert result[0].game == self.game
+
+    def test_time_limit_in_process_float(self):
+        "Test solving a game with floating-point payoffs in a separate process"
+        game = gambit.Game.from_arrays(numpy.array([ [ 0.5, 2.25 ], [ 1.0, -3.5 ] ]),
+                                       numpy.array([ [ 1.5, 0.1 ], [ 0.3, 2.0 ] ]))
+        result = gambit.nash.lcp_solve(game, rational=False, time_limit=60.0)
+        assert result.status == "complete"
+        expected = gambit.nash.lcp_solve(game, rational=False)
+        assert len(result) == len(expected) == 1
+        assert numpy.abs(numpy.array(list(result[0])) -
+                         numpy.array(list(expected[0]))).max() < 1.0e-12
+
+    def test_time_limit_extensive(self):
+        "Test solving an extensive game with a time limit in a separate process"
+        efg = gambit.Game.read_game("../../../../contrib/games/e02.efg")
+        result = gambit.nash.lcp_solve(efg, time_limit=60.0)
+        assert result.status == "complete"
+        assert len(result) == 1
+        assert result[0].game == efg
+        assert list(result[0]) == list(gambit.nash.lcp_solve(efg)[0])
+
+    def test_time_limit_error(self):
+        "Test that an error in solving in a separate process is raised"
+        game = gambit.Game.new_table([ 2, 2, 2 ])
+        try:
+            gambit.nash.enummixed_solve(game, time_limit=60.0)
+            assert False
+        except RuntimeError:
+            pass
+
+    def test_max_equilibria(self):
+        "Test stopping a native solver after some equilibria"
+        expected = gambit.nash.enummixed_solve(self.game)
+        result = gambit.nash.enummixed_solve(self.game, max_equilibria=1)
+        assert result.status == "max_equilibria"
+        assert [ list(eqm) for eqm in result ] == [ list(expected[0]) ]
+        assert result[0].game == self.game
+        result = gambit.nash.enummixed_solve(self.game, max_equilibria=5)
+        assert result.status == "complete"
+        assert len(result) == 2
+        result = gambit.nash.enumpure_solve(self.game, max_equilibria=1)
+        assert result.status == "max_equilibria"
+        assert len(result) == 1
+
+    def test_max_equilibria_in_process(self):
+        "Test stopping a native solver in a separate process after some equilibria"
+        result = gambit.nash.enummixed_solve(self.game, time_limit=60.0,
+                                             max_equilibria=1)
+        assert result.status == "max_equilibria"
+        assert len(result) == 1
+
+    def test_time_limit_expired(self):
+        "Test stopping a native solver on reaching the time limit"
+        rng = numpy.random.RandomState(0)
+        game = gambit.Game.from_arrays(rng.randint(0, 100, (14, 14)),
+                                       rng.randint(0, 100, (14, 14)))
+        start = time.time()
+        result = gambit.nash.enummixed_solve(game, time_limit=0.5)
+        assert time.time() - start < 30.0
+        assert result.status == "time_limit"
+
+
+class _ExitOnUnpickle(object):
+    # An argument which makes the process receiving it exit at once
+    def __reduce__(self):
+        return (os._exit, (3,))
+
+
+class TestGambitSolveBatch(object):
+    def setUp(self):
+        self.filename = "../../../../contrib/games/e02.nfg"
+        self.game = gambit.Game.read_game(self.filename)
+        self.float_game = gambit.Game.from_arrays(
+            numpy.array([ [ 0.5, 2.25 ], [ 1.0, -3.5 ] ]),
+            numpy.array([ [ 1.5, 0.1 ], [ 0.3, 2.0 ] ]))
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        del self.game
+        del self.float_game
+        shutil.rmtree(self.directory)
+
+    def test_solve_batch(self):
+        "Test solving a list of games and files in worker processes"
+        results = dict(gambit.nash.solve_batch([ self.game, self.filename,
+                                                 self.float_game ],
+                                               method="lcp", workers=2,
+                                               rational=False))
+        assert sorted(results.keys()) == [ 0, 1, 2 ]
+        expected = gambit.nash.lcp_solve(self.game, rational=False)
+        for index in (0, 1):
+            assert results[index].status == "complete"
+            assert [ list(eqm) for eqm in results[index] ] == \
+                   [ list(eqm) for eqm in expected ]
+        assert results[0][0].game == self.game
+        expected = gambit.nash.lcp_solve(self.float_game, rational=False)
+        assert len(results[2]) == len(expected) == 1
+        assert numpy.abs(numpy.array(list(results[2][0])) -
+                         numpy.array(list(expected[0]))).max() < 1.0e-12
+
+    def test_solve_batch_rational(self):
+        "Test solving games in worker processes with exact arithmetic"
+        efg = gambit.Game.read_game("../../../../contrib/games/e02.efg")
+        results = dict(gambit.nash.solve_batch([ self.game, efg ],
+                                               method="lcp", workers=2))
+        expected = gambit.nash.lcp_solve(self.game)
+        assert [ list(eqm) for eqm in results[0] ] == \
+               [ list(eqm) for eqm in expected ]
+        assert isinstance(results[0][0][0], fractions.Fraction)
+        expected = gambit.nash.lcp_solve(efg)
+        assert len(results[1]) == len(expected) == 1
+        assert results[1][0].game == efg
+        assert list(results[1][0]) == list(expected[0])
+        assert results[1][0][efg.infosets[1].actions[0]] == fractions.Fraction(1,2)
+
+    def test_solve_batch_method(self):
+        "Test that an unknown method is rejected before any game is solved"
+        try:
+            next(gambit.nash.solve_batch([ self.game ], method="simpdiv"))
+            assert False
+        except ValueError:
+            pass
+
+    def test_solve_batch_close(self):
+        "Test taking the first game solved, and abandoning the others"
+        rng = numpy.random.RandomState(0)
+        game = gambit.Game.from_arrays(rng.randint(0, 100, (18, 18)),
+                                       rng.randint(0, 100, (18, 18)))
+        start = time.time()
+        results = gambit.nash.solve_batch([ game, self.game ],
+                                          method="enummixed", workers=2)
+        index, result = next(results)
+        results.close()
+        assert time.time() - start < 30.0
+        assert index == 1
+        assert len(result) == 2
+
+    def test_solve_batch_error(self):
+        "Test reporting a game which cannot be read as the exception raised"
+        results = dict(gambit.nash.solve_batch([ "nonexistent.nfg",
+                                                 self.game ],
+                                               method="enummixed", workers=1))
+        assert isinstance(results[0], IOError)
+        assert len(results[1]) == 2
+
+    def test_solve_batch_worker_exit(self):
+        "Test reporting a game whose worker process exits, and continuing"
+        results = dict(gambit.nash.solve_batch([ self.game ],
+                                               method="enumpure",
+                                               exit=_ExitOnUnpickle()))
+        assert isinstance(results[0], RuntimeError)
+        results = dict(gambit.nash.solve_batch([ self.game, self.game ],
+                                               method="enumpure", workers=1))
+        assert len(results[0]) == len(results[1]) == 1
+
+    def test_solve_batch_timeout(self):
+        "Test abandoning a game which is not solved within the timeout"
+        rng = numpy.random.RandomState(0)
+        game = gambit.Game.from_arrays(rng.randint(0, 100, (14, 14)),
+                                       rng.randint(0, 100, (14, 14)))
+        start = time.time()
+        results = dict(gambit.nash.solve_batch([ game, self.game ],
+                                               method="enummixed",
+                                               workers=1, timeout=0.5))
+        assert time.time() - start < 30.0
+        assert isinstance(results[0], gambit.nash.SolveTimeoutError)
+        assert len(results[1]) == 2
+
+    def test_solve_batch_time_limit(self):
+        "Test solving a list of games with a time limit for each"
+        rng = numpy.random.RandomState(0)
+        game = gambit.Game.from_arrays(rng.randint(0, 100, (14, 14)),
+                                       rng.randint(0, 100, (14, 14)))
+        results = dict(gambit.nash.solve_batch([ game, self.game ],
+                                               method="enummixed",
+                                               workers=1, time_limit=0.5))
+        assert results[0].status == "time_limit"
+        assert results[1].status == "complete"
+        assert len(results[1]) == 2
+
+    def test_solve_batch_cache(self):
+        "Test storing the equilibria found in a cache, and reusing them"
+        cache = gambit.nash.EquilibriumCache(self.directory)
+        results = dict(gambit.nash.solve_batch([ self.filename,
+                                                 self.float_game ],
+                                               method="lcp", cache=cache,
+                                               rational=False))
+        assert len(cache) == 2
+        stored = cache.get(self.game, "lcp", rational=False)
+        assert [ list(eqm) for eqm in stored ] == \
+               [ list(eqm) for eqm in results[0] ]
+        # An entry in the cache is returned without solving the game
+        profile = self.game.mixed_strategy_profile(rational=False)
+        cache.put(self.game, "lcp", [ profile ], rational=False)
+        results = dict(gambit.nash.solve_batch([ self.game,
+                                                 self.float_game ],
+                                               method="lcp", cache=cache,
+                                               rational=False))
+        assert [ list(eqm) for eqm in results[0] ] == [ list(profile) ]
+        assert results[0][0].game == self.game
+        assert len(results[1]) == 1
+
+    def test_solve_batch_cache_limited(self):
+        "Test that equilibria found under a limit are not stored in the cache"
+        cache = gambit.nash.EquilibriumCache(self.directory)
+        results = dict(gambit.nash.solve_batch([ self.game ],
+                                               method="enummixed",
+                                               cache=cache, max_equilibria=1))
+        assert results[0].status == "max_equilibria"
+        assert len(results[0]) == 1
+        assert len(cache) == 0
+        dict(gambit.nash.solve_batch([ self.game ], method="enummixed",
+                                     cache=cache))
+        results = dict(gambit.nash.solve_batch([ self.game ],
+                                               method="enummixed",
+                                               cache=cache, max_equilibria=1))
+        assert results[0].status == "max_equilibria"
+        assert len(results[0]) == 1
@@ -1,4 +1,6 @@
 import gambit
+import decimal
+import fractions
 from nose.tools import assert_raises
 import warnings
 
@@ -73,3 +75,52 @@ class TestGambitOutcomes(object):
         assert len(self.game.outcomes) == 4
         self.game.outcomes[0].delete()
         assert len(self.game.outcomes) == 3
+
+    def test_setting_payoff_float(self):
+        "Test setting a payoff from a floating-point value"
+        self.game.outcomes[0][0] = 2.5
+        assert self.game.outcomes[0][0] == 2.5
+
+    def test_setting_payoff_large_rational(self):
+        "Test setting a payoff which does not fit in a C long"
+        self.game.outcomes[0][0] = fractions.Fraction(10**30, 3)
+        assert self.game.outcomes[0][0] == fractions.Fraction(10**30, 3)
+
+    def test_setting_payoff_wide_integer(self):
+        "Test setting payoffs which do not fit in 32 bits"
+        for value in [ 2**31-1, -2**31, 2**32, -2**32, 2**40, 2**63 ]:
+            self.game.outcomes[0][0] = value
+            assert self.game.outcomes[0][0] == value
+
+    def test_setting_payoff_wide_rational(self):
+        "Test setting rational payoffs which do not fit in 32 bits"
+        for value in [ fractions.Fraction(2**40, 3),
+                       fractions.Fraction(-7, 2**32),
+                       fractions.Fraction(2**31-1, 2**31) ]:
+            self.game.outcomes[0][0] = value
+            assert self.game.outcomes[0][0] == value
+
+    def test_setting_payoff_non_numeric(self):
+        "Test to ensure setting a non-numeric payoff raises an error"
+        assert_raises(TypeError, self.game.outcomes[0].__setitem__, 0, "1")
+
+    def test_setting_payoff_non_finite(self):
+        "Test to ensure setting an infinite or NaN payoff raises an error"
+        for value in [ float('inf'), float('-inf'), float('nan'),
+                       decimal.Decimal('Infinity'), decimal.Decimal('NaN') ]:
+            assert_raises(ValueError, self.game.outcomes[0].__setitem__, 0, value)
+        assert self.game.outcomes[0][0] == 1
+        assert_raises(ValueError, self.game.outcomes.set_payoffs,
+                      [ (0, (7, float('nan'))) ])
+        assert self.game.outcomes[0][0] == 1
+        assert self.game.outcomes[0][1] == 2
+
+    def test_set_payoffs(self):
+        "Test setting the payoffs of several outcomes at once"
+        self.game.outcomes.set_payoffs([ (0, (5, fractions.Fraction(1,2))),
+                                         (self.game.outcomes[3], (-1, 0.25)) ])
+        assert self.game.outcomes[0][0] == 5
+        assert self.game.outcomes[0][1] == fractions.Fraction(1,2)
+        assert self.game.outcomes[3][0] == -1
+        assert self.game.outcomes[3][1] == 0.25
+        assert_raises(ValueError, self.game.outcomes.set_payoffs, [ (0, (1,)) ])
@@ -0,0 +1,112 @@
+import gambit
+import gambit.qre
+import gambit.pctrace
+import gambit.lib.pctrace
+import math
+import numpy
+
+
+class TestGambitPathTracer(object):
+    def setUp(self):
+        self.game = gambit.Game.read_game("../../../../contrib/games/e02.nfg")
+        self.equations, self.start = gambit.qre._logit_equations(self.game)
+
+    def tearDown(self):
+        del self.game
+
+    def _trace(self, trace_path, max_lambda, **kwargs):
+        points = [ ]
+        end = trace_path(self.start, 0.0, max_lambda,
+                         self.equations.lhs, self.equations.jac,
+                         maxIter=100,
+                         callback=lambda p: points.append(numpy.array(p)),
+                         **kwargs)
+        return numpy.array(points), end
+
+    def _dense(self, trace_path, max_lambda, **kwargs):
+        # Returns the points at which the path tracer stops, and the
+        # steps (x0, x1, t0, t1) passed to the dense output callback
+        steps = [ ]
+        points = self._trace(trace_path, max_lambda,
+                             dense=lambda *step: steps.append([ numpy.array(v)
+                                                                for v in step ]),
+                             **kwargs)[0]
+        return points, steps
+
+    def test_compiled_matches_python(self):
+        "Test that the compiled path tracer takes the same steps as the Python one"
+        compiled, end = self._trace(gambit.lib.pctrace.trace_path, 50.0)
+        python, python_end = self._trace(gambit.pctrace.trace_path_python, 50.0)
+        assert compiled.shape == python.shape
+        assert numpy.abs(compiled - python).max() < 1.0e-10
+        assert numpy.abs(end - python_end).max() < 1.0e-10
+        assert end[-1] >= 50.0
+
+    def test_compiled_matches_python_crit(self):
+        "Test that both path tracers find the same zero of a criterion"
+        crit = lambda x, t: x[-1] - 2.5
+        compiled = self._trace(gambit.lib.pctrace.trace_path, 1000.0,
+                               crit=crit)[1]
+        python = self._trace(gambit.pctrace.trace_path_python, 1000.0,
+                             crit=crit)[1]
+        assert abs(compiled[-1] - 2.5) < 1.0e-8
+        assert numpy.abs(compiled - python).max() < 1.0e-10
+
+    def test_dense_output(self):
+        "Test interpolating the path between the points of the tracers"
+        for trace_path in (gambit.lib.pctrace.trace_path,
+                           gambit.pctrace.trace_path_python):
+            points, steps = self._dense(trace_path, 50.0)
+            assert len(steps) == len(points) - 1
+            for (k, (x0, x1, t0, t1)) in enumerate(steps):
+                assert (x0 == points[k]).all() and (x1 == points[k+1]).all()
+                assert abs(numpy.dot(t0, t0) - 1.0) < 1.0e-12
+                assert numpy.dot(t0, x1 - x0) > 0.0
+                assert numpy.dot(t1, x1 - x0) > 0.0
+                hermite = gambit.pctrace.hermite
+                assert numpy.abs(hermite(x0, x1, t0, t1, 0.0) - x0).max() < 1.0e-14
+                assert numpy.abs(hermite(x0, x1, t0, t1, 1.0) - x1).max() < 1.0e-14
+                # Points interpolated between the steps are close to the
+                # points on the path at the same lambda
+                for u in (0.25, 0.5, 0.75):
+                    point = hermite(x0, x1, t0, t1, u)
+                    corrected, converged = gambit.qre._solve_at_lambda(self.equations,
+                                                                       point)
+                    assert converged
+                    assert numpy.abs(corrected - point).max() < 1.0e-2
+
+    def test_max_angle(self):
+        "Test limiting the angle through which the path turns in each step"
+        error = [ ]
+        for max_angle in (0.5, 0.1):
+            points, steps = self._dense(gambit.lib.pctrace.trace_path, 50.0,
+                                        maxAngle=max_angle)
+            assert points[-1][-1] >= 50.0
+            worst = 0.0
+            for (x0, x1, t0, t1) in steps:
+                assert math.acos(min(1.0, numpy.dot(t0, t1))) <= max_angle
+                point = gambit.pctrace.hermite(x0, x1, t0, t1, 0.5)
+                corrected = gambit.qre._solve_at_lambda(self.equations, point)[0]
+                worst = max(worst, numpy.abs(corrected - point).max())
+            error.append((len(steps), worst))
+        # Smaller angles take more steps, along which the interpolated
+        # path is more accurate
+        assert error[1][0] > error[0][0]
+        assert error[1][1] < 0.5 * error[0][1]
+        python = self._trace(gambit.pctrace.trace_path_python, 50.0,
+                             maxAngle=0.1)[0]
+        assert numpy.abs(python - points).max() < 1.0e-10
+
+    def test_max_accel(self):
+        "Test limiting the growth of the steplength between steps"
+        for max_accel in (2.0, 1.2):
+            points = self._trace(gambit.lib.pctrace.trace_path, 50.0,
+                                 maxAccel=max_accel)[0]
+            assert points[-1][-1] >= 50.0
+            lengths = numpy.sqrt((numpy.diff(points, axis=0)**2).sum(axis=1))
+            # The steps differ from the steplength by the corrections
+            assert (lengths[1:] / lengths[:-1] <= 1.05 * max_accel).all()
+        assert (lengths[1:] / lengths[:-1] > 1.1).any()
+        python = self._trace(gambit.pctrace.trace_path_python, 50.0,
+                             maxAccel=1.2)[0]
+        assert numpy.abs(python - points).max() < 1.0e-10
@@ -0,0 +1,259 @@
+import gambit
+import gambit.qre
+import gambit.nash
+import gambit.pctrace
+import gambit.games.contest
+import gambit.games.public
+import numpy
+import os
+import pickle
+import shutil
+import tempfile
+import warnings
+
+
+def _logit_residual(game, qre):
+    # Returns the largest difference between the probabilities of the
+    # strategies of the QRE and the logit response to it
+    tensors = game.payoff_tensors()
+    probs = [ numpy.array([ qre[s] for s in player.strategies ])
+              for player in game.players ]
+    residual = 0.0
+    for (pl, tensor) in enumerate(tensors):
+        values = tensor
+        for other in reversed(xrange(len(probs))):
+            if other != pl:
+                values = numpy.tensordot(values, probs[other],
+                                         axes=([ other ], [ 0 ]))
+        response = numpy.exp(qre.lam * (values - values.max()))
+        response /= response.sum()
+        residual = max(residual, numpy.abs(response - probs[pl]).max())
+    return residual
+
+
+class TestGambitQRE(object):
+    def setUp(self):
+        self.game = gambit.Game.from_arrays(numpy.array([ [ 3, 0 ], [ 5, 1 ] ]),
+                                            numpy.array([ [ 2, 4 ], [ 0, 1 ] ]))
+        self.tracer = gambit.qre.StrategicQREPathTracer()
+
+    def tearDown(self):
+        del self.game
+
+    def test_compute_at_lambda(self):
+        "Test computing the logit QRE at a given lambda"
+        qre = self.tracer.compute_at_lambda(self.game, 2.0)
+        assert abs(qre.lam - 2.0) < 1.0e-6
+        assert _logit_residual(self.game, qre) < 1.0e-6
+
+    def test_compute_at_lambda_changed(self):
+        "Test that the QRE reflects changes to the payoffs of the game"
+        self.tracer.compute_at_lambda(self.game, 2.0)
+        self.game[0,0][0] = 10
+        self.game[1,1][1] = -3
+        qre = self.tracer.compute_at_lambda(self.game, 2.0)
+        assert _logit_residual(self.game, qre) < 1.0e-6
+
+    def test_compute_max_like_batch(self):
+        "Test fitting many datasets on one trace against fitting each in turn"
+        game = gambit.Game.read_game("../../../../contrib/games/e02.nfg")
+        datasets = [ [ 10, 5, 3, 7, 8 ], [ 20, 1, 2, 15, 3 ],
+                     [ 30, 0, 0, 29, 1 ] ]
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            # Refined in this process, so that any warnings are caught
+            batch = self.tracer.compute_max_like_batch(game, datasets,
+                                                       workers=1)
+        assert len(caught) == 0
+        assert len(batch) == len(datasets)
+        for (data, qre) in zip(datasets, batch):
+            single = self.tracer.compute_max_like(game, data)
+            assert abs(qre.lam - single.lam) < 1.0e-5
+            assert abs(qre.logL - single.logL) < 1.0e-8
+            for i in xrange(len(data)):
+                assert abs(qre[i] - single[i]) < 1.0e-6
+
+
+    def test_compute_max_like_batch_workers(self):
+        "Test refining the fits in worker processes against refining them in turn"
+        game = gambit.Game.read_game("../../../../contrib/games/e02.nfg")
+        datasets = [ [ 10, 5, 3, 7, 8 ], [ 20, 1, 2, 15, 3 ],
+                     [ 30, 0, 0, 29, 1 ], [ 1, 1, 1, 1, 1 ] ]
+        serial = self.tracer.compute_max_like_batch(game, datasets, workers=1)
+        pooled = self.tracer.compute_max_like_batch(game, datasets, workers=2)
+        for (a, b) in zip(serial, pooled):
+            assert a.lam == b.lam
+            assert a.logL == b.logL
+            assert list(a) == list(b)
+
+
+class TestGambitSymmetricQRE(object):
+    def setUp(self):
+        self.game = gambit.games.contest.TullockGame(3, 0, 4, 1, 10, 5)
+        self.tracer = gambit.qre.StrategicQREPathTracer()
+
+    def tearDown(self):
+        del self.game
+
+    def test_equations_pickle(self):
+        "Test that the equations can be sent to other processes without the game"
+        equations = gambit.qre.SymmetricLogitEquations(self.game)
+        copy = pickle.loads(pickle.dumps(equations, 2))
+        assert copy.game is None
+        point = numpy.append(numpy.log(numpy.ones(5) / 5.0), 2.0)
+        assert (copy.lhs(point) == equations.lhs(point)).all()
+        assert (copy.jac(point) == equations.jac(point)).all()
+
+    def test_equations_match_scalar(self):
+        "Test the vectorized equations against computing them term by term"
+        rng = numpy.random.RandomState(0)
+        for game in (self.game,
+                     gambit.games.public.QuadraticVCGame(4, 0, 6, 1, 10, 2, 0.5)):
+            equations = gambit.qre.SymmetricLogitEquations(game)
+            for i in xrange(5):
+                probs = rng.dirichlet(numpy.ones(len(game.choices)))
+                point = numpy.append(numpy.log(probs), rng.uniform(0.0, 20.0))
+                lhs = gambit.qre.sym_compute_lhs(game, point)
+                jac = gambit.qre.sym_compute_jac(game, point)
+                assert numpy.abs(equations.lhs(point) - lhs).max() <= \
+                       1.0e-14 * max(1.0, numpy.abs(lhs).max())
+                assert numpy.abs(equations.jac(point) - jac).max() <= \
+                       1.0e-14 * max(1.0, numpy.abs(jac).max())
+
+    def test_trace_correspondence_workers(self):
+        "Test tracing the correspondence of a symmetric game in worker processes"
+        serial = self.tracer.trace_correspondence(self.game, max_lambda=10,
+                                                  random_starts=2,
+                                                  workers=1, seed=1)
+        pooled = self.tracer.trace_correspondence(self.game, max_lambda=10,
+                                                  random_starts=2,
+                                                  workers=2, seed=1)
+        assert (pooled.data == serial.data).all()
+        assert abs(pooled.at_lambda(10.0).lam - 10.0) < 1.0e-12
+
+
+class _DivergentEquations(object):
+    # Equations on which Newton steps never converge
+    def __init__(self, equations):
+        self.equations = equations
+
+    def lhs(self, point):
+        return numpy.nan * self.equations.lhs(point)
+
+    def jac(self, point):
+        return self.equations.jac(point)
+
+
+class TestGambitQRECorrespondence(object):
+    def setUp(self):
+        self.game = gambit.Game.read_game("../../../../contrib/games/e02.nfg")
+        self.tracer = gambit.qre.StrategicQREPathTracer()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        del self.game
+        shutil.rmtree(self.directory)
+
+    def _points(self, game, max_lambda):
+        # Returns the points on the principal branch of 'game' at
+        # which the path tracer stops
+        equations, start = gambit.qre._logit_equations(game)
+        points = [ ]
+        gambit.pctrace.trace_path(start, 0.0, max_lambda,
+                                  equations.lhs, equations.jac, maxIter=100,
+                                  callback=lambda p: points.append(numpy.array(p)))
+        return points, equations
+
+    def test_from_points(self):
+        "Test building a correspondence from the points on a branch"
+        points, equations = self._points(self.game, 20.0)
+        qre = gambit.qre.QRECorrespondence.from_points(self.game, points)
+        assert len(qre) == len(points)
+        assert len(qre.branches) == 1
+        assert qre.data[0, 0] == 0.0
+        assert (numpy.diff(qre.data[:, 0]) > 0.0).all()
+        assert (qre.lambdas == numpy.array(points)[:, -1]).all()
+        for row in qre.data:
+            point, tangent = row[1:qre.n+2], row[qre.n+2:]
+            assert abs(numpy.dot(tangent, tangent) - 1.0) < 1.0e-12
+            assert numpy.abs(numpy.dot(equations.jac(point).transpose(),
+                                       tangent)).max() < 1.0e-10
+        # Tangents are oriented in the direction of increasing lambda
+        assert (qre.data[:, -1] > 0.0).all()
+
+    def test_from_branches_retraced(self):
+        "Test that a branch traced twice is only stored once"
+        points = self._points(self.game, 20.0)[0]
+        qre = gambit.qre.QRECorrespondence.from_branches(self.game,
+                                                         [ points,
+                                                           points[::-1] ])
+        assert len(qre.branches) == 1
+        assert (qre.data ==
+                gambit.qre.QRECorrespondence.from_points(self.game,
+                                                         points).data).all()
+
+    def test_interpolation(self):
+        "Test the QRE between the stored points against tracing to them"
+        qre = self.tracer.trace_correspondence(self.game, max_lambda=20.0,
+                                               workers=1)
+        path = os.path.join(self.directory, "e02.npy")
+        qre.save(path)
+        uncorrected = gambit.qre.QRECorrespondence.load(path)
+        lambdas = qre.lambdas
+        for lam in list(0.5 * (lambdas[:-2] + lambdas[1:-1])) + [ 1.0, 3.0 ]:
+            expected = numpy.array(list(self.tracer.compute_at_lambda(self.game,
+                                                                      lam)))
+            assert numpy.abs(qre.probabilities_at(lam) - expected).max() < 1.0e-8
+            assert numpy.abs(uncorrected.probabilities_at(lam) -
+                             expected).max() < 1.0e-3
+            at = qre.at_lambda(lam)
+            assert at.lam == lam
+            assert _logit_residual(self.game, at) < 1.0e-8
+
+    def test_interpolation_not_converged(self):
+        "Test the interpolated QRE is kept when it cannot be corrected"
+        qre = self.tracer.trace_correspondence(self.game, max_lambda=20.0,
+                                               workers=1)
+        uncorrected = gambit.qre.QRECorrespondence(None, qre.data)
+        qre._equations = _DivergentEquations(qre._equations)
+        lambdas = qre.lambdas
+        for lam in list(0.5 * (lambdas[:-2] + lambdas[1:-1])) + [ 1.0, 3.0 ]:
+            probs = qre.probabilities_at(lam)
+            assert numpy.isfinite(probs).all()
+            assert (probs == uncorrected.probabilities_at(lam)).all()
+        # Nor is a point which cannot be corrected taken to lie on it
+        assert not qre._covers(qre.data[1, 1:qre.n+2], 1.0)
+
+    def test_save_load_mmap(self):
+        "Test saving a correspondence, and loading it memory-mapped"
+        qre = self.tracer.trace_correspondence(self.game, max_lambda=20.0,
+                                               workers=1)
+        path = os.path.join(self.directory, "e02.npy")
+        qre.save(path)
+        loaded = gambit.qre.QRECorrespondence.load(path, game=self.game,
+                                                   mmap_mode="r")
+        assert isinstance(loaded.data, numpy.memmap)
+        assert (loaded.data == qre.data).all()
+        assert len(loaded) == len(qre)
+        for lam in (0.0, 0.3, 2.5, 20.0):
+            assert (loaded.probabilities_at(lam) ==
+                    qre.probabilities_at(lam)).all()
+        del loaded
+
+    def test_all_at_lambda(self):
+        "Test finding the QRE on each branch of the correspondence"
+        game = gambit.Game.from_arrays(numpy.array([ [ 3, 0 ], [ 0, 2 ] ]),
+                                       numpy.array([ [ 3, 0 ], [ 0, 2 ] ]))
+        qre = self.tracer.trace_correspondence(game, max_lambda=20.0,
+                                               profiles=gambit.nash.enummixed_solve(game),
+                                               workers=1)
+        assert len(qre.branches) == 2
+        assert len(qre.all_at_lambda(0.5)) == 1
+        found = qre.all_at_lambda(10.0)
+        assert len(found) == 3
+        for at in found:
+            assert at.lam == 10.0
+            assert _logit_residual(game, at) < 1.0e-8
+        first = sorted(at[0] for at in found)
+        assert first[0] < 0.01 and 0.3 < first[1] < 0.5 and first[2] > 0.99
+        assert list(found[0]) == list(qre.at_lambda(10.0))
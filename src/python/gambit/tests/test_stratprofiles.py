@@ -1,9 +1,46 @@
 import gambit
+import gambit.enumeration
 import fractions
+import numpy
 import nose.tools
 from nose.tools import assert_raises
 from gambit.lib.error import UndefinedOperationError
 
+def _uniform_solver(support):
+    # Stands in for solve_support(), returning the profile which is
+    # uniform over each player's strategies in 'support'
+    game = support.game
+    profile = game.mixed_strategy_profile(rational=True)
+    for player in game.players:
+        strategies = [ s for s in player.strategies if s in support ]
+        for strategy in player.strategies:
+            if strategy in strategies:
+                profile[strategy] = fractions.Fraction(1, len(strategies))
+            else:
+                profile[strategy] = fractions.Fraction(0)
+    return [ profile ]
+
+def _failing_solver(support):
+    if len(support) < len(support.game.strategies):
+        raise ValueError("no equilibria for this support")
+    return [ ]
+
+class _StubEnumPolySolver(object):
+    # Stands in for gambit-enumpoly, reporting fixed profiles on the
+    # restriction of the game to the support
+    points = [ ]
+
+    def solve(self, game):
+        assert len(game.strategies) == 3
+        profiles = [ ]
+        for point in self.points:
+            profile = game.mixed_strategy_profile(rational=False)
+            for (i, p) in enumerate(point):
+                profile[i] = p
+            profiles.append(profile)
+        return profiles
+
+
 class TestGambitStrategySupportProfile(object):
     def setUp(self):
         self.game = gambit.Game.read_game("test_games/mixed_strategy.nfg")
@@ -117,3 +154,101 @@ class TestGambitStrategySupportProfile(object):
         "Test removing the last strategy of a player"
         profile = self.support_profile.remove(self.support_profile[3])
         profile = profile.remove(profile[3])
+
+    def test_support_enumerator(self):
+        "Test enumerating the supports with no strictly dominated strategies"
+        supports = list(gambit.lib.libgambit.SupportEnumerator(
+            self.support_profile))
+        s = self.support_profile
+        expected = [ [s[0], s[2], s[3], s[4]], [s[0], s[3], s[4]],
+                     [s[0], s[3]] ]
+        assert len(supports) == len(expected)
+        for (support, strategies) in zip(supports, expected):
+            assert support == gambit.lib.libgambit.StrategySupportProfile(
+                strategies, self.game)
+
+    def test_support_enumerator_undecided(self):
+        "Test enumerating supports removing only some strategies"
+        s = self.support_profile
+        supports = list(gambit.lib.libgambit.SupportEnumerator(s, [s[2]]))
+        expected = [ [s[0], s[2], s[3], s[4]], [s[0], s[3], s[4]] ]
+        assert len(supports) == len(expected)
+        for (support, strategies) in zip(supports, expected):
+            assert support == gambit.lib.libgambit.StrategySupportProfile(
+                strategies, self.game)
+
+    def test_support_enumerator_steal(self):
+        "Test dividing the enumeration of supports between enumerators"
+        supports = list(gambit.lib.libgambit.SupportEnumerator(
+            self.support_profile))
+        search = gambit.lib.libgambit.SupportEnumerator(self.support_profile)
+        support = next(search)
+        found = [ (search.path, support) ]
+        node = search.steal()
+        assert node is not None
+        for support in search:
+            found.append((search.path, support))
+        other = gambit.lib.libgambit.SupportEnumerator(self.support_profile,
+                                                       node=node)
+        for support in other:
+            found.append((other.path, support))
+        found.sort()
+        assert [ support for (path, support) in found ] == supports
+
+
+class TestGambitSupportEnumeration(object):
+    def setUp(self):
+        rng = numpy.random.RandomState(0)
+        self.game = gambit.Game.from_arrays(rng.randint(0, 10, (4, 4)),
+                                            rng.randint(0, 10, (4, 4)))
+        self.enumeration = gambit.enumeration.SupportEnumeration()
+
+    def tearDown(self):
+        del self.game
+        del self.enumeration
+
+    def _results(self, found):
+        return [ (list(support), [ list(eqm) for eqm in equilibria ])
+                 for (support, equilibria) in found ]
+
+    def test_solve_supports_workers(self):
+        "Test the equilibria on each support do not depend on the number of workers"
+        expected = [ (list(support), [ list(eqm) for eqm in
+                                       _uniform_solver(support) ])
+                     for support in self.enumeration.enumerate_supports(self.game) ]
+        assert len(expected) > 1
+        for workers in (1, 2, 4):
+            found = self.enumeration.solve_supports(self.game, workers=workers,
+                                                    solver=_uniform_solver)
+            assert self._results(found) == expected
+            for (support, equilibria) in found:
+                assert support.game == self.game
+                for eqm in equilibria:
+                    assert isinstance(eqm, gambit.nash.NashSolution)
+
+    def test_solve_supports_error(self):
+        "Test an error raised by the solver on a support is raised in the caller"
+        for workers in (1, 2):
+            assert_raises(ValueError, self.enumeration.solve_supports,
+                          self.game, workers=workers, solver=_failing_solver)
+
+    def test_solve_support_restricted(self):
+        "Test the profiles found on the restriction to a support are filtered"
+        game = gambit.Game.read_game("test_games/mixed_strategy.nfg")
+        s = game.strategies
+        support = gambit.lib.libgambit.StrategySupportProfile(
+            [ s[0], s[3], s[4] ], game)
+        # The first is an equilibrium; in the second the third strategy
+        # of the first player does better, and in the third a strategy
+        # in the support is not played
+        _StubEnumPolySolver.points = [ [ 1.0, 0.75, 0.25 ],
+                                       [ 1.0, 0.25, 0.75 ],
+                                       [ 1.0, 1.0, 0.0 ] ]
+        solver = gambit.enumeration.ExternalEnumPolySolver
+        gambit.enumeration.ExternalEnumPolySolver = _StubEnumPolySolver
+        try:
+            equilibria = gambit.enumeration.solve_support(support)
+        finally:
+            gambit.enumeration.ExternalEnumPolySolver = solver
+        assert len(equilibria) == 1
+        assert list(equilibria[0]) == [ 1.0, 0.0, 0.0, 0.75, 0.25 ]
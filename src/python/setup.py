@@ -50,6 +50,9 @@ libgame = Extension("gambit.lib.libgambit",
                     language="c++",
                     include_dirs=[ "../..", "../../library/include", ".." ] )
 
+pctrace = Extension("gambit.lib.pctrace",
+                    sources=[ "gambit/lib/pctrace.pyx" ])
+
 setup(name="gambit",
       version="16.0.0",
       description="Software tools for game theory",
@@ -57,7 +60,7 @@ setup(name="gambit",
       author_email="ted.turocy@gmail.com",
       url="http://www.gambit-project.org",
       packages=['gambit', 'gambit.games', 'gambit.lib'],
-      ext_modules=[libgame],
+      ext_modules=[libgame, pctrace],
       cmdclass = {'build_ext': build_ext},
       entry_points="""
       [console_scripts]